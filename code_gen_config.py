@@ -25,6 +25,17 @@ class Config:
     class MethodName:
         class Table:
             add_to_database = "add_to_database"
+            add_to_database_parallel = "add_to_database_parallel"
+            delete_from_database = "delete_from_database"
+            reserve_ids = "reserve_ids"
+            adopt_keys = "adopt_keys"
+            row_checksum = "row_checksum"
+            replaced_checksum = "replaced_checksum"
+            reconcile = "reconcile"
+            table_checksum = "table_checksum"
+            count_missing_references = "count_missing_references"
+            load_keys = "load_keys"
+            update_references = "update_references"
             constant = "constant"
 
         class Entries:
@@ -33,19 +44,115 @@ class Config:
                 return f"make_{table_name}"
 
             add_all_to_database = "add_all_to_database"
+            add_pending_to_database = "add_pending_to_database"
+            release_ids = "release_ids"
+            clear_pending = "clear_pending"
+            savepoint = "savepoint"
+            rollback_pending = "rollback_pending"
+            pending_keys = "pending_keys"
+            add_committed_keys = "add_committed_keys"
+            drop_committed = "drop_committed"
+            stats = "stats"
+            restore_stats = "restore_stats"
+            table_checksums = "table_checksums"
+            verify_database = "verify_database"
+            verify_references = "verify_references"
 
     class FunctionName:
         connect_to_database = "connect_to_database"
+        create_connection_pool = "create_connection_pool"
+        is_transient_error = "is_transient_error"
+        run_with_retry = "run_with_retry"
+        begin_bulk_session = "begin_bulk_session"
+        end_bulk_session = "end_bulk_session"
         commit_to_database = "commit_to_database"
         close_database = "close_database"
+        partition_objects = "partition_objects"
+        add_partitions_to_database = "add_partitions_to_database"
         inner_operation = "inner"
+        mysql_double_text = "mysql_double_text"
+        mysql_json_text = "mysql_json_text"
+        single_precision = "single_precision"
+
+        @staticmethod
+        def exporter(table_name: str):
+            return f"export_{table_name}"
 
     class VariableName:
+        @staticmethod
+        def bound_operation(function_name: str, index: int):
+            return f"{function_name.upper()}_{index}"
+
         class AddToDatabase:
             object = "o"
             cursor = "cursor"
             statement = "stmt"
             values = "values"
+            index = "i"
+            key = "k"
+
+        class Validation:
+            @staticmethod
+            def enum_values(table_name: str, column_name: str):
+                return f"{table_name}_{column_name}_values".upper()
+
+        class ReserveIds:
+            unassigned = "unassigned"
+            last_id = "last_id"
+            isolation = "isolation"
+
+        class AdoptKeys:
+            keyed = "keyed"
+            natural_keys = "natural_keys"
+
+        class Reconcile:
+            local_chunks = "local_chunks"
+            local_checksums = "local_checksums"
+            remote_checksums = "remote_checksums"
+            chunk = "chunk"
+            local_rows = "local_rows"
+            remote_rows = "remote_rows"
+            missing = "missing"
+            extra = "extra"
+            key = "key"
+
+        class Export:
+            csv_file = "csv_file"
+            csv_writer = "csv_writer"
+            rows = "rows"
+
+        class Retry:
+            transient_errnos = "TRANSIENT_ERRNOS"
+            retry_counters = "RETRY_COUNTERS"
+            attempt = "attempt"
+            result = "result"
+            error = "e"
+            rollback_error = "rollback_error"
+
+        class Checksum:
+            sign = "sign"
+            digits = "digits"
+            exponent = "exponent"
+            point = "point"
+            text = "text"
+
+        class Verify:
+            count = "count"
+            checksum = "checksum"
+            failed = "failed"
+            missing = "missing"
+            keys = "keys"
+
+        class AddPartitions:
+            xid = "xid"
+            index = "index"
+            write_partition = "write_partition"
+            executor = "executor"
+            errors = "errors"
+            end = "end"
+            end_errors = "end_errors"
+            error = "e"
+            failures = "failures"
 
         class ConnectToDataBase:
             host = "host"
@@ -59,18 +166,101 @@ class Config:
             def cache(table_name: str):
                 return f"_{table_name}_cache"
 
+            @staticmethod
+            def pending(table_name: str):
+                return f"_{table_name}_pending"
+
+            @staticmethod
+            def stats(table_name: str):
+                return f"_{table_name}_stats"
+
+            @staticmethod
+            def committed(table_name: str):
+                return f"_{table_name}_committed"
+
+            @staticmethod
+            def reserved(table_name: str):
+                return f"_{table_name}_reserved"
+
+            @staticmethod
+            def replaced(table_name: str):
+                return f"_{table_name}_replaced"
+
+            verify = "_verify"
+
     class ParamName:
         connection = "connection"
         operation_input = "value"
 
         class AddToDatabase:
             objects = "objects"
+            batch_size = "batch_size"
+            connections = "connections"
+            by_range = "by_range"
+            independent_commit = "independent_commit"
+            upsert = "upsert"
+            sort_by_key = "sort_by_key"
+            update_references = "update_references"
+            replaced = "replaced"
+
+        class DeleteFromDatabase:
+            keys = "keys"
+
+        class Verify:
+            baseline = "baseline"
+            verify = "verify"
+
+        class Savepoint:
+            savepoint = "savepoint"
+
+        class Checkpoint:
+            keys = "keys"
+            table_names = "table_names"
+            stats = "stats"
+
+        class BulkSession:
+            settings = "settings"
+
+        class Retry:
+            transaction = "transaction"
+            max_retries = "max_retries"
+            base_delay = "base_delay"
+            max_delay = "max_delay"
+            before_retry = "before_retry"
+
+        class Export:
+            path = "path"
+            where = "where"
+
+        class Reconcile:
+            objects = "objects"
+            chunk_size = "chunk_size"
+            n_chunks = "n_chunks"
+
+        class PartitionObjects:
+            objects = "objects"
+            key = "key"
+            n_partitions = "n_partitions"
+            by_range = "by_range"
+
+        class AddPartitions:
+            add_to_database = "add_to_database"
+            partitions = "partitions"
+            connections = "connections"
+            independent_commit = "independent_commit"
 
         class ConnectToDatabase:
             host = "host"
             user = "user"
             password = "password"
             name = "database"
+            pool = "pool"
+
+        class ConnectionPool:
+            size = "size"
+            pool_name = "pool_name"
+            pool_size = "pool_size"
+            pool_reset_session = "pool_reset_session"
 
     class SqlConnector:
         class Imports:
@@ -85,13 +275,27 @@ class Config:
                 object_name="MySQLConnection",
                 alias="SqlConnection",
             )
+            pool_type = ConfigImport(
+                module="mysql.connector.pooling",
+                object_name="MySQLConnectionPool",
+                alias="SqlConnectionPool",
+            )
 
         class Methods:
             connection_new_cursor = "cursor"
             connection_commit = "commit"
+            connection_rollback = "rollback"
             connection_close = "close"
+            cursor_execute = "execute"
             cursor_execute_many = "executemany"
+            cursor_fetch_all = "fetchall"
+            cursor_fetch_many = "fetchmany"
             cursor_close = "close"
+            pool_get_connection = "get_connection"
+
+    class RetryCounter:
+        retries = "retries"
+        exhausted = "exhausted"
 
     class Message:
         abstract_method_error = "Abstract method"
@@ -108,6 +312,25 @@ class Config:
 
     class Semantic:
         use_primary_key_in_equality = True
+        sort_inserts_by_primary_key = False
 
     class Constant:
         default_hash = 0
+        batch_size = 1000
+        reconcile_chunk_size = 10000
+        reconcile_n_chunks = 1024
+        checksum_separator = "#"
+        csv_delimiter = ";"
+        export_buffer_size = 1 << 20
+        pool_size = 4
+        pool_name = "objects"
+        transient_errnos = (1205, 1213)
+        max_retries = 5
+        retry_base_delay = 0.05
+        retry_max_delay = 5.0
+        bulk_session_variables = ("foreign_key_checks", "unique_checks", "autocommit", "transaction_isolation")
+        bulk_session_values = (0, 0, 0, "READ-COMMITTED")
+        deferred_table_prefix = "deferred_"
+        unlocked_isolation_levels = ("READ-UNCOMMITTED", "READ-COMMITTED")
+        locked_isolation_level = "REPEATABLE-READ"
+        compiled_operations_cache_size = 1024
@@ -1,3 +1,6 @@
+from hashlib import blake2b
+from uuid import UUID
+
 
 def csv_column(column_name: str):
     def inner(kv: dict[str, str]):
@@ -8,3 +11,9 @@ csv_enum_column = csv_column
 
 def csv_no_column(kv: dict[str, str]):
     return None
+
+def csv_hash_key(column_names: list[str]):
+    def inner(kv: dict[str, str]):
+        digest = blake2b("\x1f".join(kv[c] or "" for c in column_names).encode(), digest_size=16).digest()
+        return str(UUID(int=int.from_bytes(digest, "big") & ~(0xF << 76) & ~(0x3 << 62) | (0x8 << 76) | (0x2 << 62)))
+    return inner
@@ -1,11 +1,13 @@
 from __future__ import annotations
 
-from typing import Iterable
+from typing import Iterable, Optional, cast
 from code_gen_config import Config
 from csv_addon.importer_code_gen_config import ImportConfig
-from operations import BASE_OPERATIONS, Operation, OperationChain
-from python_script import BaseEnumPythonType, DictPythonType, NonePythonType, PythonScript, PythonType, PythonVariable, StrPythonType
-from sql_objects import SqlColumn, SqlTable
+from operations import BASE_OPERATIONS, NULLIFY_STR_OP, PARSE_FLOAT_OP, PARSE_INT_OP, PARSE_OPT_FLOAT_OP, \
+    PARSE_OPT_INT_OP, Operation, OperationChain
+from python_script import BaseEnumPythonType, DictPythonType, EnumPythonType, ListPythonType, NonePythonType, PythonScript, PythonType, \
+    PythonVariable, StrPythonType
+from sql_objects import SqlColumn, SqlIntegerType, SqlStringType, SqlTable
 from json import dump, load
 from itertools import chain
 
@@ -17,25 +19,47 @@ def csv_column_impl(script: PythonScript, input: PythonVariable):
 def csv_no_column_impl(script: PythonScript, input: PythonVariable):
     script.add_line(f"return None")
 
+CSV_HASH_KEY_COLUMN_NAMES = PythonVariable(name="column_names", type=ListPythonType(StrPythonType()))
+def csv_hash_key_impl(script: PythonScript, input: PythonVariable):
+    script.imports.add_import(module="hashlib", object="blake2b")
+    script.imports.add_import(module="uuid", object="UUID")
+    digest_var = PythonVariable("digest")
+    script.add_line(f'{digest_var} = blake2b("\\x1f".join({input}[c] or "" for c in {CSV_HASH_KEY_COLUMN_NAMES}).encode(), '
+                    f"digest_size=16).digest()")
+    script.add_line(f"return str(UUID(int=int.from_bytes({digest_var}, \"big\") & ~(0xF << 76) & ~(0x3 << 62) "
+                    f"| (0x8 << 76) | (0x2 << 62)))")
+
 CSV_COLUMN_OP = Operation(
             name="csv_column", 
             impl=csv_column_impl,
             input_type=DictPythonType(StrPythonType(), StrPythonType()), 
             output_type=StrPythonType(),
-            args=[CSV_COLUMN_COLUMN_NAME])
+            args=[CSV_COLUMN_COLUMN_NAME],
+            inline=lambda i, a: f"{i}[{a[0]}]")
 
 CSV_ENUM_COLUMN_OP = Operation(
             name="csv_enum_column", 
             impl=CSV_COLUMN_OP.impl,
             input_type=CSV_COLUMN_OP.get_input_type(), 
             output_type=BaseEnumPythonType(StrPythonType()),
-            args=CSV_COLUMN_OP.args)
+            args=CSV_COLUMN_OP.args,
+            inline=CSV_COLUMN_OP.inline)
 
 CSV_NO_COLUMN_OP = Operation(
             name="csv_no_column", 
             impl=csv_no_column_impl,
             input_type=CSV_COLUMN_OP.get_input_type(),
-            output_type=NonePythonType())
+            output_type=NonePythonType(),
+            inline=lambda i, a: "None")
+
+
+CSV_HASH_KEY_OP = Operation(
+            name="csv_hash_key", 
+            impl=csv_hash_key_impl,
+            input_type=CSV_COLUMN_OP.get_input_type(),
+            output_type=StrPythonType(),
+            primary=True,
+            args=[CSV_HASH_KEY_COLUMN_NAMES])
 
 
 CSV_OPERATIONS = {
@@ -44,6 +68,7 @@ CSV_OPERATIONS = {
         CSV_COLUMN_OP,
         CSV_ENUM_COLUMN_OP,
         CSV_NO_COLUMN_OP, 
+        CSV_HASH_KEY_OP, 
     ), BASE_OPERATIONS.values())
 }
 
@@ -51,10 +76,88 @@ CSV_OPERATIONS = {
 
 
 
+COLUMNAR_CASTS = {
+    PARSE_INT_OP.name: "int64",
+    PARSE_OPT_INT_OP.name: "int64",
+    PARSE_FLOAT_OP.name: "float64",
+    PARSE_OPT_FLOAT_OP.name: "float64",
+}
+
+def split_numeric_chain(op_chain: OperationChain) -> Optional[tuple[str, str, OperationChain]]:
+    '''Field, columnar type and chain without parsing, if the chain starts by parsing a number from a field'''
+    i = 1
+    if len(op_chain) > i and op_chain[i].name == NULLIFY_STR_OP.name:
+        i += 1
+    if len(op_chain) <= i or op_chain[0].name != CSV_COLUMN_OP.name or op_chain[i].name not in COLUMNAR_CASTS:
+        return None
+    return str(op_chain[0].arg_values[0]), COLUMNAR_CASTS[op_chain[i].name], \
+        OperationChain([op_chain[0]] + op_chain[i + 1:])
+
+
+def csv_field_names_of(op_chain: OperationChain) -> list[str]:
+    return list(chain.from_iterable(
+                [str(op.arg_values[0])] if op.name in (CSV_COLUMN_OP.name, CSV_ENUM_COLUMN_OP.name) 
+                else list(str(f_name) for f_name in cast(list[object], op.arg_values[0])) 
+                if op.name == CSV_HASH_KEY_OP.name else [] 
+                for op in op_chain))
+
+
+def is_guaranteed_by(column: SqlColumn, op_chain: OperationChain):
+    '''Values read by csv_enum_column are only those seen when the profile was made, so they guarantee nothing'''
+    last_type = op_chain.last_type()
+    enum_type = last_type.get_raw_type() if last_type.is_optional() else last_type
+    if op_chain[-1].name == CSV_ENUM_COLUMN_OP.name or not isinstance(enum_type, EnumPythonType):
+        return False
+    if not column.make_type().is_super_type(last_type):
+        return False
+    return not isinstance(column.data_type, SqlStringType) or column.data_type.char_limit <= 0 \
+        or all(len(str(v)) <= column.data_type.char_limit for v in last_type.enum_values())
+
+
 class TableGenerationMethod:
-    def __init__(self, table: SqlTable, table_profile: TableProfile, optional: bool = False):
+    def __init__(self, table: SqlTable, table_profile: TableProfile, optional: bool = False, 
+                 limit_policies: Optional[dict[str, str]] = None):
         self.table = table
         self.table_profile = table_profile
+        self.limit_policies = limit_policies if limit_policies is not None else dict()
+        self.converter_name = ImportConfig.FunctionName.row_converter(table.name)
+        for (c_name, policy) in self.limit_policies.items():
+            if policy not in (ImportConfig.LimitPolicy.reject, ImportConfig.LimitPolicy.truncate, 
+                              ImportConfig.LimitPolicy.fail):
+                raise Exception(f"Unknown limit policy {policy} for column {table.name}.{c_name}")
+
+    def limit_policy(self, c_name: str) -> str:
+        return self.limit_policies.get(c_name, ImportConfig.Constant.default_limit_policy)
+
+    def limit_checks(self, column: SqlColumn, op_chain: OperationChain, 
+                     value: PythonVariable) -> list[tuple[str, str, Optional[str]]]:
+        '''Condition, message and truncated value of the checks a value must pass to be accepted by the server'''
+        checks: list[tuple[str, str, Optional[str]]] = list()
+        is_optional = op_chain.last_type().is_optional()
+        if is_optional and not column.make_type().is_optional():
+            checks.append((f"{value} is None", "is null", None))
+        not_none = f"{value} is not None and " if is_optional or column.make_type().is_optional() else ""
+        if isinstance(column.data_type, SqlStringType) and column.data_type.char_limit > 0 \
+                and not is_guaranteed_by(column, op_chain):
+            limit = column.data_type.char_limit
+            checks.append((f"{not_none}len({value}) > {limit}", f"is longer than {limit} characters", 
+                           f"{value}[:{limit}]"))
+        elif isinstance(column.data_type, SqlIntegerType) and column.data_type.value_range() is not None:
+            (low, high) = cast(tuple[int, int], column.data_type.value_range())
+            checks.append((f"{not_none}not {low} <= {value} <= {high}", f"is out of [{low}, {high}]", 
+                           f"min(max({value}, {low}), {high})"))
+        return checks
+
+    def checked_columns(self) -> set[str]:
+        '''Names of the string columns whose length is checked by the row converter'''
+        return set()
+
+    def gen_column_pipelines(self, script: PythonScript) -> None:
+        for (c, op_chain) in self.table_profile.items():
+            op_chain.gen_fused_function(script, ImportConfig.FunctionName.column_pipeline(self.converter_name, c.name))
+
+    def gen_column_value(self, column: SqlColumn, gen_input: str) -> str:
+        return f"{ImportConfig.FunctionName.column_pipeline(self.converter_name, column.name)}({gen_input})"
 
     def check_validity(self) -> None:
         raise Exception("Abstract method")
@@ -84,12 +187,16 @@ class TableGenerationMethod:
     def gen_row_converter_call(self, script: PythonScript, column_references: dict[str, PythonVariable], 
                     entries_param: PythonVariable, row_param: PythonVariable, prefix: str) -> None:
         raise Exception("Abstract method")
+
+    def gen_invalid_column_checks(self, script: PythonScript, row_param: PythonVariable) -> None:
+        raise Exception("Abstract method")
         
 
 
 class NormalCsv(TableGenerationMethod):
-    def __init__(self, table: SqlTable, table_profile: TableProfile, optional: bool = False):
-        super().__init__(table, table_profile, optional)
+    def __init__(self, table: SqlTable, table_profile: TableProfile, optional: bool = False, 
+                 limit_policies: Optional[dict[str, str]] = None):
+        super().__init__(table, table_profile, optional, limit_policies)
 
     def check_validity(self) -> None:
         input_type = DictPythonType(key_type=StrPythonType(), value_type=StrPythonType())
@@ -109,7 +216,8 @@ class NormalCsv(TableGenerationMethod):
         return True
 
     def required_columns(self):
-        return (c for c in self.table.columns.values() if not c.optional and not c.data_type.is_referrence() and c.default is None)
+        return (c for c in self.table.columns.values() if not c.optional and not c.data_type.is_referrence() and c.default is None 
+                and not c.auto_increment)
 
     def optional_columns(self) -> Iterable[SqlColumn]:
         return (c for c in self.table.columns.values() if (c.optional or c.default is not None) and not c.data_type.is_referrence())
@@ -118,14 +226,32 @@ class NormalCsv(TableGenerationMethod):
                                column_references: dict[str, PythonVariable], 
                                entries_param: PythonVariable, row_param: PythonVariable):
         with script.gen_function_decl(
-                        function_name=ImportConfig.FunctionName.row_converter(self.table.name), 
+                        function_name=self.converter_name, 
                         params=[row_param, entries_param] + list(column_references.values())):
             ref_values = list(f"{c.name}={column_references[c.data_type.get_reffered_table_name()]}" 
                         for c in self.table.columns.values() if c.data_type.is_referrence() 
                         and c.data_type.get_reffered_table_name() in column_references)
-            values = list(str(c.name) + "=" + op_chain.gen_operations(imports=script.imports, 
-                        gen_input=row_param.name) 
-                        for (c, op_chain) in self.table_profile.items()) + ref_values
+            values: list[str] = list()
+            for (c, op_chain) in self.table_profile.items():
+                value = self.gen_column_value(c, row_param.name)
+                value_var = PythonVariable(name=ImportConfig.VariableName.checked_value(c.name))
+                checks = self.limit_checks(c, op_chain, value_var)
+                if len(checks) == 0:
+                    values.append(f"{c.name}={value}")
+                    continue
+                script.add_line(f"{value_var} = {value}")
+                policy = self.limit_policy(c.name)
+                for (condition, message, truncated) in checks:
+                    with script.gen_if(condition):
+                        if policy == ImportConfig.LimitPolicy.truncate and truncated is not None:
+                            script.add_line(f"{value_var} = {truncated}")
+                        else:
+                            exception = ImportConfig.ClassName.import_failure \
+                                if policy == ImportConfig.LimitPolicy.fail else "Exception"
+                            script.add_line(f'raise {exception}(f"Value of {self.table.name}.{c.name}: '
+                                            f'{{{value_var}!r}} {message}")')
+                values.append(f"{c.name}={value_var}")
+            values += ref_values
             start = f"return {entries_param}.{Config.MethodName.Entries.entry_maker(self.table.name)}("
             script.add_aligned_line(separator=",", values=values, start=start, end=")")
 
@@ -134,14 +260,37 @@ class NormalCsv(TableGenerationMethod):
                                entries_param: PythonVariable, row_param: PythonVariable, prefix: str) -> None:
         values = list(f"{param}={ImportConfig.VariableName.table_object(t_name)}" for (t_name, param) in column_references.items())
         script.add_aligned_line(separator=",", values=values, 
-                                start=prefix + ImportConfig.FunctionName.row_converter(self.table.name) + 
+                                start=prefix + self.converter_name + 
                                             f"({row_param}, {entries_param}, ",
                                 end=")")
+
+    def gen_invalid_column_checks(self, script: PythonScript, row_param: PythonVariable) -> None:
+        for (c, op_chain) in self.table_profile.items():
+            if len(csv_field_names_of(op_chain)) == 0:
+                # Nothing to blame in the row, and running a generator again would advance its state
+                continue
+            value_var = PythonVariable(name=ImportConfig.VariableName.checked_value(c.name))
+            checks = list(condition for (condition, _, truncated) in self.limit_checks(c, op_chain, value_var) 
+                          if self.limit_policy(c.name) != ImportConfig.LimitPolicy.truncate or truncated is None)
+            with script.gen_try():
+                value = self.gen_column_value(c, row_param.name)
+                script.add_line(f"{value_var} = {value}" if len(checks) > 0 else value)
+            with script.gen_except():
+                script.add_line(f"return {repr(f'{self.table.name}.{c.name}')}")
+            if len(checks) > 0:
+                with script.gen_if(" or ".join(f"({condition})" for condition in checks) if len(checks) > 1 
+                                   else checks[0]):
+                    script.add_line(f"return {repr(f'{self.table.name}.{c.name}')}")
+
+    def checked_columns(self) -> set[str]:
+        return set(c.name for (c, op_chain) in self.table_profile.items() 
+                   if isinstance(c.data_type, SqlStringType) and len(self.limit_checks(c, op_chain, PythonVariable("v"))) > 0)
         
 
 class Constant(TableGenerationMethod):
-    def __init__(self, table: SqlTable, table_profile: TableProfile, optional: bool = False):
-        super().__init__(table, table_profile, optional)
+    def __init__(self, table: SqlTable, table_profile: TableProfile, optional: bool = False, 
+                 limit_policies: Optional[dict[str, str]] = None):
+        super().__init__(table, table_profile, optional, limit_policies)
 
     def check_validity(self) -> None:
         input_type = NonePythonType()
@@ -170,18 +319,40 @@ class Constant(TableGenerationMethod):
                 column_references: dict[str, PythonVariable], entries_param: PythonVariable, 
                 row_param: PythonVariable) -> None:
         t_name = self.table.name
+        constant_var = PythonVariable(name=ImportConfig.VariableName.table_object(t_name))
         with script.gen_function_decl(
-                    function_name=ImportConfig.FunctionName.row_converter(table_name=t_name),
+                    function_name=self.converter_name,
                     params=list()):
-            script.add_line(f"return {Config.ClassName.formater(t_name)}.{Config.MethodName.Table.constant}" + "(" +
-                ', '.join(f'{pk_name}=' + self.table_profile[self.table.columns[pk_name]].gen_operations(script.imports, repr(None)) 
-                for pk_name in self.table.get_primary_column_names()) + ")")
+            script.add_line(f"{constant_var} = {self.gen_constant(script)}")
+            with script.gen_if(self.gen_unknown_key_condition(constant_var)):
+                script.add_line(f'raise Exception(f"Key {{{self.gen_key(constant_var)}!r}} of {t_name} '
+                                'is not in the database")')
+            script.add_line(f"return {constant_var}")
+
+    def gen_constant(self, script: PythonScript) -> str:
+        return f"{Config.ClassName.formater(self.table.name)}.{Config.MethodName.Table.constant}" + "(" + \
+            ', '.join(f'{pk_name}=' + self.gen_column_value(self.table.columns[pk_name], repr(None)) 
+            for pk_name in self.table.get_primary_column_names()) + ")"
+
+    def gen_unknown_key_condition(self, constant: str) -> str:
+        '''Constant rows are not written, so their key must be among the keys preloaded from the database'''
+        known_keys = f"{ImportConfig.VariableName.known_keys}[{repr(self.table.name)}]"
+        return f"{repr(self.table.name)} in {ImportConfig.VariableName.known_keys} " \
+               f"and {self.gen_key(constant)} not in {known_keys}"
+
+    def gen_key(self, constant: str) -> str:
+        return "(" + ", ".join(self.table.columns[pk_name].gen_get_sql_value(f"{constant}.{pk_name}")
+                               for pk_name in self.table.get_primary_column_names()) + ",)"
                     
 
     def gen_row_converter_call(self, script: PythonScript, column_references: dict[str, PythonVariable], 
                 entries_param: PythonVariable, row_param: PythonVariable, prefix: str) -> None:
         t_name = self.table.name
-        script.add_line(f"{prefix}{ImportConfig.FunctionName.row_converter(table_name=t_name)}()")
+        script.add_line(f"{prefix}{self.converter_name}()")
+
+    def gen_invalid_column_checks(self, script: PythonScript, row_param: PythonVariable) -> None:
+        with script.gen_if(self.gen_unknown_key_condition(self.gen_constant(script))):
+            script.add_line(f"return {repr(f'{self.table.name}.' + ', '.join(self.table.get_primary_column_names()))}")
 
 
 METHODS_NAME = {
@@ -212,6 +383,7 @@ M_NAME = "method"
 C_NAMES = "columns"
 OP_NAME = "name"
 OP_PARAMS = "params"
+LIMIT_POLICIES = "limit_policies"
 
 class CsvProfile(list[TableGenerationMethod]):
     def __init__(self, methods: Iterable[TableGenerationMethod]):
@@ -231,6 +403,54 @@ class CsvProfile(list[TableGenerationMethod]):
                         already_gen.add(op.name)
 
 
+    def csv_field_names(self) -> list[str]:
+        '''Names of the CSV fields read by the profile, in order of first use'''
+        return list(dict.fromkeys(f_name for m in self for op_chain in m.table_profile.values() 
+                                  for f_name in csv_field_names_of(op_chain)))
+
+    def trusted_columns(self) -> set[tuple[str, str]]:
+        '''Table and column names whose operation chains can only produce values accepted by the column'''
+        return set((m.table.name, c.name) for m in self for (c, op_chain) in m.table_profile.items() 
+                   if is_guaranteed_by(c, op_chain) or c.name in m.checked_columns())
+
+    def columnar_casts(self) -> dict[str, str]:
+        '''Columnar type of the fields that are only read to be parsed as numbers'''
+        casts: dict[str, Optional[str]] = dict()
+        for m in self:
+            for op_chain in m.table_profile.values():
+                numeric_chain = split_numeric_chain(op_chain)
+                for f_name in csv_field_names_of(op_chain):
+                    cast = numeric_chain[1] if numeric_chain is not None else None
+                    casts[f_name] = cast if casts.get(f_name, cast) == cast else None
+        return {f_name: cast for (f_name, cast) in casts.items() if cast is not None}
+
+    def columnar_required_fields(self) -> list[str]:
+        '''Fields casted by columnar readers whose number parsing does not accept missing values'''
+        casts = self.columnar_casts()
+        return list(dict.fromkeys(str(op_chain[0].arg_values[0]) for m in self 
+                                  for op_chain in m.table_profile.values()
+                                  if split_numeric_chain(op_chain) is not None 
+                                  and str(op_chain[0].arg_values[0]) in casts
+                                  and any(op.name in COLUMNAR_CASTS and not op.get_output_type().is_optional() 
+                                          for op in op_chain)))
+
+    def columnar_profile(self) -> CsvProfile:
+        '''Same profile without number parsing of the fields casted by columnar readers'''
+        casts = self.columnar_casts()
+        methods: list[TableGenerationMethod] = list()
+        for m in self:
+            table_profile: dict[SqlColumn, OperationChain] = dict()
+            for (c, op_chain) in m.table_profile.items():
+                numeric_chain = split_numeric_chain(op_chain)
+                table_profile[c] = numeric_chain[2] if numeric_chain is not None \
+                                                      and numeric_chain[0] in casts else op_chain
+            columnar_method = type(m)(table=m.table, table_profile=TableProfile(table_profile), 
+                                      limit_policies=m.limit_policies)
+            if table_profile != m.table_profile:
+                columnar_method.converter_name = ImportConfig.FunctionName.columnar_row_converter(m.table.name)
+            methods.append(columnar_method)
+        return CsvProfile(methods)
+
     @staticmethod
     def from_json_file(filepath: str, tables: dict[str, SqlTable]):
         with open(file=filepath, mode="r") as f:
@@ -243,7 +463,8 @@ class CsvProfile(list[TableGenerationMethod]):
                             for op in c
                         ])
                         for c_name, c in m[C_NAMES].items()
-                    })
+                    }),
+                    limit_policies=m.get(LIMIT_POLICIES)
                 ) 
             for m in load(f)))
         # profile.check_validity()
@@ -257,4 +478,4 @@ class CsvProfile(list[TableGenerationMethod]):
             dump([{T_NAME: m.table.name, M_NAME: m.name(), C_NAMES:{
                 c.name: [{OP_NAME: op.name, OP_PARAMS: list(op.arg_values)} for op in op_chain] 
                 for (c, op_chain) in m.table_profile.items()
-            }} for m in self], f)
\ No newline at end of file
+            }} | ({LIMIT_POLICIES: m.limit_policies} if len(m.limit_policies) > 0 else {}) for m in self], f)
\ No newline at end of file
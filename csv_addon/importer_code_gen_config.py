@@ -1,18 +1,174 @@
 class ImportConfig:
+    class ClassName:
+        import_failure = "ImportFailure"
+
     class FunctionName:
         import_csv = "import_csv"
+        commit_entries = "commit_entries"
+        write_pending = "write_pending"
+        save_checkpoint = "save_checkpoint"
+        load_checkpoint = "load_checkpoint"
+        save_committed_keys = "save_committed_keys"
+        load_committed_keys = "load_committed_keys"
+        find_invalid_column = "find_invalid_column"
+        row_fingerprint = "row_fingerprint"
+        load_fingerprints = "load_fingerprints"
+        save_fingerprints = "save_fingerprints"
+        snapshot_key = "snapshot_key"
+        partition_snapshot = "partition_snapshot"
+        diff_snapshots = "diff_snapshots"
+        delete_removed_rows = "delete_removed_rows"
+        import_snapshot_diff = "import_snapshot_diff"
+        reconcile_csv = "reconcile_csv"
+        fetch_table_checksums = "fetch_table_checksums"
+        verify_entries = "verify_entries"
+        import_columnar = "import_columnar"
+        read_columnar_rows = "read_columnar_rows"
+        read_columnar_fields = "read_columnar_fields"
+        columnar_text_row = "columnar_text_row"
+        open_csv_file = "open_csv_file"
+        preload_keys = "preload_keys"
+
         @staticmethod
         def row_converter(table_name: str):
             return f"import_{table_name}"
 
+        @staticmethod
+        def columnar_row_converter(table_name: str):
+            return f"import_{table_name}_columnar"
+
+        @staticmethod
+        def column_pipeline(converter_name: str, column_name: str):
+            return f"{converter_name}__{column_name}"
+
     class VariableName:
         csv_path = "csv_path"
         csv_file = "csv_file"
+        csv_reader = "csv_reader"
         csv_row = "csv_row"
+        text_row = "text_row"
         csv_field = "csv_field"
         csv_value = "csv_value"
         entries = "entries"
+        n_rows = "n_rows"
+        committed_bytes = "committed_bytes"
+        checkpoint = "checkpoint"
+        checkpoint_file = "checkpoint_file"
+        resuming = "resuming"
+        line_offset = "line_offset"
+        n_rejected = "n_rejected"
+        reject_file = "reject_file"
+        reject_writer = "reject_writer"
+        error = "e"
+        fingerprint = "fingerprint"
+        fingerprints = "fingerprints"
+        new_fingerprints = "new_fingerprints"
+        fingerprint_file = "fingerprint_file"
+        fingerprint_fields = "FINGERPRINT_FIELDS"
+        field_values = "field_values"
+        data = "data"
+        snapshot_key_fields = "SNAPSHOT_KEY_FIELDS"
+        directory = "directory"
+        bucket_files = "bucket_files"
+        bucket_file = "bucket_file"
+        bucket_writers = "bucket_writers"
+        index = "i"
+        previous_fields = "previous_fields"
+        current_fields = "current_fields"
+        previous_rows = "previous_rows"
+        previous_row = "previous_row"
+        change = "change"
+        removed_rows = "removed_rows"
+        differences = "differences"
+        columnar_casts = "COLUMNAR_CASTS"
+        columnar_extensions = "COLUMNAR_EXTENSIONS"
+        columnar_required = "COLUMNAR_REQUIRED"
+        batches = "batches"
+        batch = "batch"
+        reader = "reader"
+        columns = "columns"
+        column = "column"
+        name = "name"
+        values = "values"
+        baseline = "baseline"
+        settings = "settings"
+        csv_buffer_size = "CSV_BUFFER_SIZE"
+        raw_file = "raw_file"
+        magic = "magic"
+        compressed_file = "compressed_file"
+        known_keys = "KNOWN_KEYS"
+        savepoint = "savepoint"
+        committed_keys = "committed_keys"
+        committed_key_tables = "COMMITTED_KEY_TABLES"
+        committed_keys_size = "committed_keys_size"
+        keys_file = "keys_file"
+        replaying = "replaying"
+
         @staticmethod
         def table_object(table_name: str):
             return table_name
 
+        @staticmethod
+        def checked_value(column_name: str):
+            return f"{column_name}_value"
+
+    class ParamName:
+        commit_every_rows = "commit_every_rows"
+        commit_every_bytes = "commit_every_bytes"
+        checkpoint_path = "checkpoint_path"
+        reject_path = "reject_path"
+        max_reject_rate = "max_reject_rate"
+        fingerprint_path = "fingerprint_path"
+        fingerprint_projected = "fingerprint_projected"
+        projected = "projected"
+        previous_path = "previous_path"
+        current_path = "current_path"
+        prefix = "prefix"
+        n_buckets = "n_buckets"
+        csv_rows = "csv_rows"
+        repair = "repair"
+        verify = "verify"
+        path = "path"
+        batch_size = "batch_size"
+        bulk = "bulk"
+        check_references = "check_references"
+        before_write = "before_write"
+        size = "size"
+
+    class CheckpointKey:
+        offset = "offset"
+        line = "line"
+        n_rows = "n_rows"
+        n_rejected = "n_rejected"
+        reject_offset = "reject_offset"
+        stats = "stats"
+        baseline = "baseline"
+        committed_keys_size = "committed_keys_size"
+
+    class RejectField:
+        line = "reject_line"
+        column = "reject_column"
+        error = "reject_error"
+
+    class LimitPolicy:
+        reject = "reject"
+        truncate = "truncate"
+        fail = "fail"
+
+    class SnapshotChange:
+        added = "added"
+        changed = "changed"
+        removed = "removed"
+
+    class Constant:
+        max_reject_rate = 0.01
+        fingerprint_size = 16
+        field_separator = "\x1f"
+        n_buckets = 256
+        previous_prefix = "previous"
+        current_prefix = "current"
+        columnar_batch_size = 65536
+        parquet_extension = ".parquet"
+        columnar_extensions = (".parquet", ".arrow", ".feather")
+        default_limit_policy = "reject"
+        committed_keys_suffix = ".keys"
@@ -10,11 +10,14 @@ except ModuleNotFoundError:
 from sys import argv
 from collections import defaultdict
 from code_gen_config import Config
-from csv_addon.csv_profile import CsvProfile 
-from objects_generator import generate_entries_commit, generate_objects_code, generate_schema
-from python_script import ClassPythonType, DictPythonType, PythonScript, PythonVariable, StrPythonType
+from csv_addon.csv_profile import CsvProfile, TableGenerationMethod, csv_field_names_of
+from objects_generator import generate_objects_code, generate_schema
+from python_script import AnyPythonType, BoolPythonType, BytesPythonType, CallablePythonType, ClassPythonType, \
+    DictPythonType, FloatPythonType, IntPythonType, ListPythonType, NonePythonType, OptionalPythonType, \
+    PythonScript, PythonVariable, IterablePythonType, SetPythonType, StrPythonType, TuplePythonType
 from csv_addon.importer_code_gen_config import ImportConfig
-from sql_objects import SqlTables, TableClassPythonType
+from csv_addon.util import BZIP2_MAGIC, CSV_BUFFER_SIZE, GZIP_MAGIC, MAGIC_SIZE, XZ_MAGIC, ZSTD_MAGIC
+from sql_objects import SqlTable, SqlTables, TableClassPythonType
 from itertools import chain
 from database import Database, choose_database
 
@@ -37,25 +40,874 @@ def gen_import_loop(script: PythonScript, table_column_refs: dict[str, dict[str,
                     row_param=row_var, prefix=f"{table_object_var} = " if t_name in used_t_names else "")
     
 
+def gen_open_csv_file_function(script: PythonScript):
+    script.imports.add_import(module="bz2", object="BZ2File")
+    script.imports.add_import(module="gzip", object="GzipFile")
+    script.imports.add_import(module="lzma", object="LZMAFile")
+    script.imports.add_import(module="io", object="BufferedReader")
+    script.imports.add_import(module="io", object="TextIOWrapper")
+    buffer_size_var = PythonVariable(name=ImportConfig.VariableName.csv_buffer_size, type=IntPythonType(), 
+                                     initial_litteral=CSV_BUFFER_SIZE)
+    script.globals.add_global(buffer_size_var)
+    path_param = PythonVariable(name=ImportConfig.ParamName.path, type=StrPythonType())
+    raw_file_var = PythonVariable(name=ImportConfig.VariableName.raw_file)
+    magic_var = PythonVariable(name=ImportConfig.VariableName.magic)
+    compressed_file_var = PythonVariable(name=ImportConfig.VariableName.compressed_file, type=AnyPythonType())
+    with script.gen_function_decl(ImportConfig.FunctionName.open_csv_file, params=[path_param], 
+                return_type=ClassPythonType("TextIOWrapper")):
+        with script.gen_with(f'open(file={path_param}, mode="rb")', raw_file_var):
+            script.add_line(f"{magic_var} = {raw_file_var}.read({MAGIC_SIZE})")
+        script.add_line(f"{compressed_file_var}: {compressed_file_var.type.gen_type(script.imports)} = None")
+        for (i, (magic, opener)) in enumerate(((GZIP_MAGIC, "GzipFile"), (XZ_MAGIC, "LZMAFile"), 
+                                              (BZIP2_MAGIC, "BZ2File"))):
+            with (script.gen_if if i == 0 else script.gen_elif)(f"{magic_var}.startswith({repr(magic)})"):
+                script.add_line(f"{compressed_file_var} = {opener}(filename={path_param})")
+        with script.gen_elif(f"{magic_var}.startswith({repr(ZSTD_MAGIC)})"):
+            script.add_line("from zstandard import ZstdDecompressor")
+            script.add_line(f'{compressed_file_var} = ZstdDecompressor().stream_reader(open(file={path_param}, mode="rb"), '
+                            f"closefd=True)")
+        with script.gen_else():
+            script.add_line(f'return open(file={path_param}, mode="r", newline="", buffering={buffer_size_var})')
+        script.add_line(f'return TextIOWrapper(BufferedReader({compressed_file_var}, buffer_size={buffer_size_var}), '
+                        f'newline="")')
+
+
+def gen_commit_entries_function(script: PythonScript, entries_var: PythonVariable, profile: CsvProfile):
+    # Generated and auto-increment keys differ when a batch is replayed, so only keys read from the CSV are kept
+    committed_key_tables_var = PythonVariable(name=ImportConfig.VariableName.committed_key_tables, 
+                                              type=ListPythonType(StrPythonType()), 
+                                              initial_litteral=list(m.table.name for m in profile 
+                                                                    if m.write_to_database() and has_csv_primary_key(m)))
+    script.globals.add_global(committed_key_tables_var)
+    committed_keys_var = PythonVariable(name=ImportConfig.VariableName.committed_keys)
+    connection_var = PythonVariable(name=Config.ParamName.connection)
+    bulk_param = PythonVariable(name=ImportConfig.ParamName.bulk, type=BoolPythonType(), initial_litteral=False)
+    upsert_param = SqlTable.get_upsert_param()
+    sort_by_key_param = SqlTable.get_sort_by_key_param()
+    settings_var = PythonVariable(name=ImportConfig.VariableName.settings)
+    connection_param = SqlTable.get_connection_param(imports=script.imports)
+    before_write_param = PythonVariable(name=ImportConfig.ParamName.before_write, 
+                                        type=OptionalPythonType(CallablePythonType([connection_param.type], 
+                                                                                   NonePythonType())))
+    pool_param = SqlTable.get_pool_param(imports=script.imports)
+    with script.gen_function_decl(ImportConfig.FunctionName.commit_entries, 
+                params=[entries_var, bulk_param, upsert_param, sort_by_key_param, before_write_param, pool_param],
+                return_type=DictPythonType(StrPythonType(), ListPythonType(AnyPythonType()))):
+        # Without foreign key checks, references are verified before the batch is committed
+        with script.gen_function_decl(ImportConfig.FunctionName.write_pending, params=[connection_param]):
+            with script.gen_if(f"{before_write_param} is not None"):
+                script.add_line(f"{before_write_param}({connection_var})")
+            script.add_line(
+                f"{entries_var}.{Config.MethodName.Entries.add_pending_to_database}"
+                f"({Config.ParamName.connection}={connection_var}, {upsert_param}={upsert_param}, "
+                f"{sort_by_key_param}={sort_by_key_param})"
+            )
+            with script.gen_if(bulk_param.name):
+                script.add_line(f"{entries_var}.{Config.MethodName.Entries.verify_references}"
+                                f"({Config.ParamName.connection}={connection_var})")
+        script.add_line(f"{entries_var}.{Config.MethodName.Entries.drop_committed}()")
+        script.add_line(f"{connection_var} = {Config.FunctionName.connect_to_database}({pool_param})")
+        script.add_line(f"{settings_var} = {Config.FunctionName.begin_bulk_session}({connection_var}) "
+                        f"if {bulk_param} else None")
+        with script.gen_try():
+            script.add_line(
+                f"{Config.FunctionName.run_with_retry}({connection_var}, {ImportConfig.FunctionName.write_pending}, "
+                f"{Config.ParamName.Retry.before_retry}={entries_var}.{Config.MethodName.Entries.release_ids})"
+            )
+        with script.gen_finally():
+            with script.gen_if(f"{settings_var} is not None"):
+                script.add_line(f"{Config.FunctionName.end_bulk_session}({connection_var}, {settings_var})")
+            script.add_line(f"{Config.FunctionName.close_database}({connection_var})")
+        # Auto-increment ids are only known once the batch is written
+        script.add_line(f"{committed_keys_var} = {entries_var}.{Config.MethodName.Entries.pending_keys}"
+                        f"({committed_key_tables_var})")
+        script.add_line(f"{entries_var}.{Config.MethodName.Entries.clear_pending}()")
+        script.add_line(f"return {committed_keys_var}")
+
+
+def gen_verification_functions(script: PythonScript, entries_var: PythonVariable):
+    connection_var = PythonVariable(name=Config.ParamName.connection)
+    checksums_type = DictPythonType(StrPythonType(), TuplePythonType([IntPythonType(), IntPythonType()]))
+    baseline_param = PythonVariable(name=ImportConfig.VariableName.baseline, type=checksums_type)
+    pool_param = SqlTable.get_pool_param(imports=script.imports)
+    for (function_name, params, line) in (
+                (ImportConfig.FunctionName.fetch_table_checksums, [entries_var],
+                 f"return {entries_var}.{Config.MethodName.Entries.table_checksums}({connection_var}={connection_var})"),
+                (ImportConfig.FunctionName.verify_entries, [entries_var, baseline_param],
+                 f"{entries_var}.{Config.MethodName.Entries.verify_database}({connection_var}={connection_var}, "
+                 f"{Config.ParamName.Verify.baseline}={baseline_param})")):
+        with script.gen_function_decl(function_name, params=params + [pool_param]):
+            script.add_line(f"{connection_var} = {Config.FunctionName.connect_to_database}({pool_param})")
+            with script.gen_try():
+                script.add_line(line)
+            with script.gen_finally():
+                script.add_line(f"{Config.FunctionName.close_database}({connection_var})")
+
+
+def gen_preload_keys_function(script: PythonScript, profile: CsvProfile, tables: SqlTables):
+    known_keys_var = PythonVariable(name=ImportConfig.VariableName.known_keys, 
+                                    type=DictPythonType(StrPythonType(), SetPythonType(AnyPythonType())), 
+                                    initial_litteral=dict())
+    script.globals.add_global(known_keys_var)
+    connection_var = PythonVariable(name=Config.ParamName.connection)
+    pool_param = SqlTable.get_pool_param(imports=script.imports)
+    with script.gen_function_decl(ImportConfig.FunctionName.preload_keys, params=[pool_param]):
+        script.add_line(f"{known_keys_var}.clear()")
+        constant_t_names = list(m.table.name for m in profile if not m.write_to_database() 
+                                and tables[m.table.name].primary_constraint is not None)
+        if len(constant_t_names) == 0:
+            return
+        script.add_line(f"{connection_var} = {Config.FunctionName.connect_to_database}({pool_param})")
+        with script.gen_try():
+            for t_name in constant_t_names:
+                script.add_line(f"{known_keys_var}[{repr(t_name)}] = {tables[t_name].class_type.gen_type(script.imports)}"
+                                f".{Config.MethodName.Table.load_keys}({connection_var})")
+        with script.gen_finally():
+            script.add_line(f"{Config.FunctionName.close_database}({connection_var})")
+
+
+def gen_checkpoint_functions(script: PythonScript, entries_var: PythonVariable):
+    script.imports.add_import(module="pickle", object="dump")
+    script.imports.add_import(module="pickle", object="load")
+    script.imports.add_import(module="os", object="replace")
+    checkpoint_path_param = PythonVariable(name=ImportConfig.ParamName.checkpoint_path, 
+                                           type=StrPythonType())
+    checkpoint_param = PythonVariable(name=ImportConfig.VariableName.checkpoint, 
+                                      type=DictPythonType(StrPythonType(), AnyPythonType()))
+    checkpoint_file_var = PythonVariable(name=ImportConfig.VariableName.checkpoint_file)
+    with script.gen_function_decl(ImportConfig.FunctionName.save_checkpoint, 
+                params=[checkpoint_path_param, checkpoint_param]):
+        with script.gen_with(f'open(file={checkpoint_path_param} + ".tmp", mode="wb")', 
+                             checkpoint_file_var):
+            script.add_line(f"dump({checkpoint_param}, {checkpoint_file_var})")
+        script.add_line(f'replace({checkpoint_path_param} + ".tmp", {checkpoint_path_param})')
+
+    with script.gen_function_decl(ImportConfig.FunctionName.load_checkpoint, 
+                params=[checkpoint_path_param], return_type=checkpoint_param.type):
+        with script.gen_with(f'open(file={checkpoint_path_param}, mode="rb")', checkpoint_file_var):
+            script.add_line(f"return load({checkpoint_file_var})")
+
+    # Keys of committed rows are appended to their own file, so that a checkpoint costs one batch
+    size_param = PythonVariable(name=ImportConfig.ParamName.size, type=IntPythonType())
+    keys_param = PythonVariable(name=Config.ParamName.Checkpoint.keys, 
+                                type=DictPythonType(StrPythonType(), ListPythonType(AnyPythonType())))
+    keys_file_var = PythonVariable(name=ImportConfig.VariableName.keys_file)
+    keys_path = f"{checkpoint_path_param} + {repr(ImportConfig.Constant.committed_keys_suffix)}"
+    with script.gen_function_decl(ImportConfig.FunctionName.save_committed_keys, 
+                params=[checkpoint_path_param, size_param, keys_param], return_type=IntPythonType()):
+        with script.gen_with(f'open(file={keys_path}, mode="ab")', keys_file_var):
+            script.add_line(f"{keys_file_var}.truncate({size_param})")
+            script.add_line(f"dump({keys_param}, {keys_file_var})")
+            script.add_line(f"return {keys_file_var}.tell()")
+
+    with script.gen_function_decl(ImportConfig.FunctionName.load_committed_keys, 
+                params=[entries_var, checkpoint_path_param, size_param]):
+        with script.gen_if(f"{size_param} == 0"):
+            script.add_line("return")
+        with script.gen_with(f'open(file={keys_path}, mode="rb")', keys_file_var):
+            with script.gen_while(f"{keys_file_var}.tell() < {size_param}"):
+                script.add_line(f"{entries_var}.{Config.MethodName.Entries.add_committed_keys}"
+                                f"(load({keys_file_var}))")
+
+
+def gen_find_invalid_column_function(script: PythonScript, row_var: PythonVariable, 
+                profile: CsvProfile):
+    with script.gen_function_decl(ImportConfig.FunctionName.find_invalid_column, params=[row_var], 
+                return_type=OptionalPythonType(StrPythonType())):
+        for m in profile:
+            m.gen_invalid_column_checks(script, row_param=row_var)
+        script.add_line("return None")
+
+
+def gen_fingerprint_functions(script: PythonScript, row_var: PythonVariable, profile: CsvProfile):
+    script.imports.add_import(module="hashlib", object="blake2b")
+    script.imports.add_import(module="os.path", object="exists")
+    size = ImportConfig.Constant.fingerprint_size
+    fields_var = PythonVariable(name=ImportConfig.VariableName.fingerprint_fields, 
+                                type=ListPythonType(StrPythonType()), 
+                                initial_litteral=profile.csv_field_names())
+    script.globals.add_global(fields_var)
+    projected_param = PythonVariable(name=ImportConfig.ParamName.projected, type=BoolPythonType())
+    field_values_var = PythonVariable(name=ImportConfig.VariableName.field_values)
+    with script.gen_function_decl(ImportConfig.FunctionName.row_fingerprint, 
+                params=[row_var, projected_param], return_type=BytesPythonType()):
+        script.add_line(f"{field_values_var} = ({row_var}[f] for f in {fields_var}) if {projected_param} "
+                        f"else {row_var}.values()")
+        script.add_line(f"return blake2b({repr(ImportConfig.Constant.field_separator)}"
+                        f".join(map(str, {field_values_var})).encode(), digest_size={size}).digest()")
+
+    fingerprint_path_param = PythonVariable(name=ImportConfig.ParamName.fingerprint_path, 
+                                            type=StrPythonType())
+    fingerprint_file_var = PythonVariable(name=ImportConfig.VariableName.fingerprint_file)
+    data_var = PythonVariable(name=ImportConfig.VariableName.data)
+    with script.gen_function_decl(ImportConfig.FunctionName.load_fingerprints, 
+                params=[fingerprint_path_param], return_type=SetPythonType(BytesPythonType())):
+        with script.gen_if(f"not exists({fingerprint_path_param})"):
+            script.add_line("return set()")
+        with script.gen_with(f'open(file={fingerprint_path_param}, mode="rb")', fingerprint_file_var):
+            script.add_line(f"{data_var} = {fingerprint_file_var}.read()")
+        script.add_line(f"return set({data_var}[i:i + {size}] for i in range(0, len({data_var}) "
+                        f"- len({data_var}) % {size}, {size}))")
+
+    fingerprints_param = PythonVariable(name=ImportConfig.VariableName.fingerprints, 
+                                        type=ListPythonType(BytesPythonType()))
+    with script.gen_function_decl(ImportConfig.FunctionName.save_fingerprints, 
+                params=[fingerprint_path_param, fingerprints_param]):
+        with script.gen_with(f'open(file={fingerprint_path_param}, mode="ab")', fingerprint_file_var):
+            script.add_line(f'{fingerprint_file_var}.write(b"".join({fingerprints_param}))')
+
+
+def gen_commit_with_fingerprints(script: PythonScript, entries_var: PythonVariable, 
+                fingerprint_path_param: PythonVariable, new_fingerprints_var: PythonVariable, 
+                bulk_param: PythonVariable, replaying_var: PythonVariable, upsert: str, 
+                sort_by_key_param: PythonVariable, pool_param: PythonVariable, prefix: str = ""):
+    '''The batch read after a checkpoint may have been committed before a crash, so it is upserted'''
+    script.add_line(f"{prefix}{ImportConfig.FunctionName.commit_entries}({entries_var}, {bulk_param}, "
+                    f"{Config.ParamName.AddToDatabase.upsert}={upsert}, {sort_by_key_param}={sort_by_key_param}, "
+                    f"{pool_param}={pool_param})")
+    script.add_line(f"{replaying_var} = False")
+    with script.gen_if(f"{fingerprint_path_param} is not None"):
+        script.add_line(f"{ImportConfig.FunctionName.save_fingerprints}({fingerprint_path_param}, "
+                        f"{new_fingerprints_var})")
+        script.add_line(f"{new_fingerprints_var}.clear()")
+
+
+def gen_reject_writer(script: PythonScript, reject_file_var: PythonVariable, reject_writer_var: PythonVariable, 
+                fieldnames: str):
+    script.imports.add_import(module="csv", object="DictWriter")
+    reject_fields = [ImportConfig.RejectField.line, ImportConfig.RejectField.column, ImportConfig.RejectField.error]
+    script.add_aligned_line(
+        start=f"{reject_writer_var} = DictWriter(",
+        end=")",
+        separator=",",
+        values=[
+            f"{reject_file_var}",
+            f"fieldnames=[f for f in {fieldnames} or [] if f not in {repr(reject_fields)}] + {repr(reject_fields)}",
+            'delimiter=";"',
+        ],
+    )
+
+
+def gen_reject_row(script: PythonScript, row: str, entries_var: PythonVariable, 
+                savepoint_var: PythonVariable, reject_path_param: PythonVariable, reject_writer_var: PythonVariable, 
+                n_rejected_var: PythonVariable, line: str):
+    '''Except clause of a row import: the row is written to the reject file, or the error is raised'''
+    error_var = PythonVariable(name=ImportConfig.VariableName.error)
+    with script.gen_except(exception_var=error_var):
+        script.add_line(f"{entries_var}.{Config.MethodName.Entries.rollback_pending}({savepoint_var})")
+        with script.gen_if(f"{reject_path_param} is None "
+                           f"or isinstance({error_var}, {ImportConfig.ClassName.import_failure})"):
+            script.add_line("raise")
+        script.add_aligned_line(
+            start=f"{reject_writer_var}.writerow({row} | {{",
+            end="})",
+            separator=",",
+            values=[
+                f"{repr(ImportConfig.RejectField.line)}: {line}",
+                f"{repr(ImportConfig.RejectField.column)}: {ImportConfig.FunctionName.find_invalid_column}({row})",
+                f"{repr(ImportConfig.RejectField.error)}: repr({error_var})",
+            ],
+        )
+        script.add_line(f"{n_rejected_var} += 1")
+
+
+def has_csv_primary_key(m: TableGenerationMethod):
+    op_chains = dict((c.name, op_chain) for (c, op_chain) in m.table_profile.items())
+    return m.table.primary_constraint is not None and all(
+                c_name in op_chains and len(csv_field_names_of(op_chains[c_name])) > 0 
+                for c_name in m.table.get_primary_column_names())
+
+
+def get_deletable_methods(profile: CsvProfile) -> list[TableGenerationMethod]:
+    '''Written tables not referenced by the profile, whose primary key is read from the CSV'''
+    referenced_t_names = set(c.data_type.get_reffered_table_name() for m in profile 
+                             for c in m.table.columns.values() if c.data_type.is_referrence())
+    return list(m for m in profile if m.write_to_database() and m.table.name not in referenced_t_names
+                and has_csv_primary_key(m))
+
+
+NO_SNAPSHOT_KEY_MESSAGE = "No snapshot key: no written table unreferenced by the profile has its primary key " \
+                          "read from the CSV, so removed rows cannot be deleted"
+
+
+def gen_snapshot_diff_functions(script: PythonScript, row_var: PythonVariable, profile: CsvProfile):
+    script.imports.add_import(module="csv", object="DictReader")
+    script.imports.add_import(module="csv", object="DictWriter")
+    script.imports.add_import(module="zlib", object="crc32")
+    script.imports.add_import(module="tempfile", object="TemporaryDirectory")
+    script.imports.add_import(module="os.path", object="join")
+    key_fields = list(dict.fromkeys(f_name for m in get_deletable_methods(profile) 
+                                    for c_name in m.table.get_primary_column_names() 
+                                    for (c, op_chain) in m.table_profile.items() if c.name == c_name
+                                    for f_name in csv_field_names_of(op_chain)))
+    key_fields_var = PythonVariable(name=ImportConfig.VariableName.snapshot_key_fields, 
+                                    type=ListPythonType(StrPythonType()), initial_litteral=key_fields)
+    script.globals.add_global(key_fields_var)
+    separator = repr(ImportConfig.Constant.field_separator)
+    with script.gen_function_decl(ImportConfig.FunctionName.snapshot_key, params=[row_var], 
+                return_type=StrPythonType()):
+        script.add_line(f"return {separator}.join({row_var}[f] for f in {key_fields_var})")
+
+    csv_path_param = PythonVariable(name=ImportConfig.VariableName.csv_path, type=StrPythonType())
+    prefix_param = PythonVariable(name=ImportConfig.ParamName.prefix, type=StrPythonType())
+    n_buckets_param = PythonVariable(name=ImportConfig.ParamName.n_buckets, type=IntPythonType())
+    csv_file_var = PythonVariable(name=ImportConfig.VariableName.csv_file)
+    csv_reader_var = PythonVariable(name=ImportConfig.VariableName.csv_reader)
+    bucket_files_var = PythonVariable(name=ImportConfig.VariableName.bucket_files)
+    bucket_file_var = PythonVariable(name=ImportConfig.VariableName.bucket_file)
+    bucket_writers_var = PythonVariable(name=ImportConfig.VariableName.bucket_writers)
+    index_var = PythonVariable(name=ImportConfig.VariableName.index)
+    with script.gen_function_decl(ImportConfig.FunctionName.partition_snapshot, 
+                params=[csv_path_param, prefix_param, n_buckets_param], 
+                return_type=ListPythonType(StrPythonType())):
+        with script.gen_with(f"{ImportConfig.FunctionName.open_csv_file}({csv_path_param})", csv_file_var):
+            script.add_line(f'{csv_reader_var} = DictReader({csv_file_var}, delimiter=";")')
+            script.add_line(f'{bucket_files_var} = [open(file=f"{{{prefix_param}}}_{{{index_var}}}.csv", mode="w", newline="") '
+                            f'for {index_var} in range({n_buckets_param})]')
+            with script.gen_try():
+                script.add_line(f"{bucket_writers_var} = [DictWriter({bucket_file_var}, fieldnames={csv_reader_var}.fieldnames or [], "
+                                f'delimiter=";") for {bucket_file_var} in {bucket_files_var}]')
+                with script.gen_for(variables=[row_var], iterable=csv_reader_var.name):
+                    script.add_line(f"{bucket_writers_var}[crc32({ImportConfig.FunctionName.snapshot_key}({row_var})"
+                                    f".encode()) % {n_buckets_param}].writerow({row_var})")
+            with script.gen_finally():
+                with script.gen_for(variables=[bucket_file_var], iterable=bucket_files_var.name):
+                    script.add_line(f"{bucket_file_var}.close()")
+            script.add_line(f"return list({csv_reader_var}.fieldnames or [])")
+
+    previous_path_param = PythonVariable(name=ImportConfig.ParamName.previous_path, type=StrPythonType())
+    current_path_param = PythonVariable(name=ImportConfig.ParamName.current_path, type=StrPythonType())
+    n_buckets_default_param = PythonVariable(name=ImportConfig.ParamName.n_buckets, type=IntPythonType(), 
+                                             initial_litteral=ImportConfig.Constant.n_buckets)
+    directory_var = PythonVariable(name=ImportConfig.VariableName.directory)
+    previous_fields_var = PythonVariable(name=ImportConfig.VariableName.previous_fields)
+    current_fields_var = PythonVariable(name=ImportConfig.VariableName.current_fields)
+    previous_rows_var = PythonVariable(name=ImportConfig.VariableName.previous_rows)
+    previous_row_var = PythonVariable(name=ImportConfig.VariableName.previous_row)
+    with script.gen_function_decl(ImportConfig.FunctionName.diff_snapshots, 
+                params=[previous_path_param, current_path_param, n_buckets_default_param],
+                return_type=IterablePythonType(TuplePythonType([StrPythonType(), row_var.type]))):
+        with script.gen_with("TemporaryDirectory()", directory_var):
+            previous_prefix = ImportConfig.Constant.previous_prefix
+            current_prefix = ImportConfig.Constant.current_prefix
+            for (fields_var, path_param, prefix) in ((previous_fields_var, previous_path_param, previous_prefix), 
+                                                     (current_fields_var, current_path_param, current_prefix)):
+                script.add_line(f"{fields_var} = {ImportConfig.FunctionName.partition_snapshot}({path_param}, "
+                                f'join({directory_var}, "{prefix}"), {n_buckets_param})')
+            with script.gen_for(variables=[index_var], iterable=f"range({n_buckets_param})"):
+                with script.gen_with(f'open(file=join({directory_var}, f"{previous_prefix}_{{{index_var}}}.csv"), mode="r", newline="")', 
+                                     bucket_file_var):
+                    script.add_line(f"{previous_rows_var} = {{{ImportConfig.FunctionName.snapshot_key}({row_var}): "
+                                    f"{row_var} for {row_var} in DictReader({bucket_file_var}, "
+                                    f'fieldnames={previous_fields_var}, delimiter=";")}}')
+                with script.gen_with(f'open(file=join({directory_var}, f"{current_prefix}_{{{index_var}}}.csv"), mode="r", newline="")', 
+                                     bucket_file_var):
+                    with script.gen_for(variables=[row_var], iterable=f"DictReader({bucket_file_var}, "
+                                        f'fieldnames={current_fields_var}, delimiter=";")'):
+                        script.add_line(f"{previous_row_var} = {previous_rows_var}.pop("
+                                        f"{ImportConfig.FunctionName.snapshot_key}({row_var}), None)")
+                        with script.gen_if(f"{previous_row_var} is None"):
+                            script.add_line(f"yield {repr(ImportConfig.SnapshotChange.added)}, {row_var}")
+                        with script.gen_elif(f"{previous_row_var} != {row_var}"):
+                            script.add_line(f"yield {repr(ImportConfig.SnapshotChange.changed)}, {row_var}")
+                with script.gen_for(variables=[row_var], iterable=f"{previous_rows_var}.values()"):
+                    script.add_line(f"yield {repr(ImportConfig.SnapshotChange.removed)}, {row_var}")
+
+    csv_rows_param = PythonVariable(name=ImportConfig.ParamName.csv_rows, type=ListPythonType(row_var.type))
+    connection_param = SqlTable.get_connection_param(imports=script.imports)
+    with script.gen_function_decl(ImportConfig.FunctionName.delete_removed_rows, 
+                params=[csv_rows_param, connection_param]):
+        deletable_methods = get_deletable_methods(profile)
+        if len(deletable_methods) == 0:
+            script.add_line(f"raise Exception({repr(NO_SNAPSHOT_KEY_MESSAGE)})")
+        for m in deletable_methods:
+            key_values = list(m.gen_column_value(m.table.columns[c_name], row_var.name) 
+                              for c_name in m.table.get_primary_column_names())
+            key = "(" + ", ".join(key_values) + ("," if len(key_values) == 1 else "") + ")"
+            script.add_aligned_line(
+                start=f"{m.table.class_type.gen_type(imports=script.imports)}"
+                      f".{Config.MethodName.Table.delete_from_database}(",
+                end=")",
+                separator=",",
+                values=[
+                    f"{Config.ParamName.DeleteFromDatabase.keys}=[{key} for {row_var} in {csv_rows_param}]",
+                    f"{connection_param}={connection_param}",
+                ],
+            )
+
+
+def gen_import_snapshot_diff(script: PythonScript, table_object_vars: dict[str, dict[str, PythonVariable]],
+                row_var: PythonVariable, entries_var: PythonVariable, profile: CsvProfile):
+    previous_path_param = PythonVariable(name=ImportConfig.ParamName.previous_path, type=StrPythonType())
+    current_path_param = PythonVariable(name=ImportConfig.ParamName.current_path, type=StrPythonType())
+    n_buckets_param = PythonVariable(name=ImportConfig.ParamName.n_buckets, type=IntPythonType(), 
+                                     initial_litteral=ImportConfig.Constant.n_buckets)
+    reject_path_param = PythonVariable(name=ImportConfig.ParamName.reject_path, 
+                                       type=OptionalPythonType(StrPythonType()))
+    max_reject_rate_param = PythonVariable(name=ImportConfig.ParamName.max_reject_rate, type=FloatPythonType(), 
+                                           initial_litteral=ImportConfig.Constant.max_reject_rate)
+    check_references_param = PythonVariable(name=ImportConfig.ParamName.check_references, type=BoolPythonType(), 
+                                            initial_litteral=True)
+    sort_by_key_param = SqlTable.get_sort_by_key_param()
+    change_var = PythonVariable(name=ImportConfig.VariableName.change)
+    removed_rows_var = PythonVariable(name=ImportConfig.VariableName.removed_rows)
+    n_rows_var = PythonVariable(name=ImportConfig.VariableName.n_rows)
+    n_rejected_var = PythonVariable(name=ImportConfig.VariableName.n_rejected)
+    csv_file_var = PythonVariable(name=ImportConfig.VariableName.csv_file)
+    current_fields_var = PythonVariable(name=ImportConfig.VariableName.current_fields)
+    reject_file_var = PythonVariable(name=ImportConfig.VariableName.reject_file)
+    reject_writer_var = PythonVariable(name=ImportConfig.VariableName.reject_writer)
+    savepoint_var = PythonVariable(name=ImportConfig.VariableName.savepoint)
+    connection_var = PythonVariable(name=Config.ParamName.connection)
+    pool_param = SqlTable.get_pool_param(imports=script.imports)
+    deletable_t_names = set(m.table.name for m in get_deletable_methods(profile))
+    kept_t_names = list(m.table.name for m in profile if m.write_to_database() and m.table.name not in deletable_t_names)
+    with script.gen_function_decl(ImportConfig.FunctionName.import_snapshot_diff, 
+                params=[previous_path_param, current_path_param, n_buckets_param, reject_path_param, 
+                        max_reject_rate_param, check_references_param, sort_by_key_param, pool_param]):
+        if len(deletable_t_names) == 0:
+            script.add_line(f"raise Exception({repr(NO_SNAPSHOT_KEY_MESSAGE)})")
+            return
+        script.imports.add_import(module="os", object="devnull")
+        entries_var.gen_declarartion(script, with_typing=False)
+        script.add_line(f"{removed_rows_var}: list[{row_var.type.gen_type(script.imports)}] = []")
+        for var in (n_rows_var, n_rejected_var):
+            script.add_line(f"{var} = 0")
+        with script.gen_if(check_references_param.name):
+            script.add_line(f"{ImportConfig.FunctionName.preload_keys}({pool_param})")
+        with script.gen_else():
+            script.add_line(f"{ImportConfig.VariableName.known_keys}.clear()")
+        with script.gen_with(f"{ImportConfig.FunctionName.open_csv_file}({current_path_param})", csv_file_var):
+            script.add_line(f'{current_fields_var} = DictReader({csv_file_var}, delimiter=";").fieldnames')
+        with script.gen_with(f"open(file={reject_path_param} if {reject_path_param} is not None else devnull, "
+                             f'mode="w", newline="")', reject_file_var):
+            gen_reject_writer(script, reject_file_var=reject_file_var, reject_writer_var=reject_writer_var, 
+                        fieldnames=current_fields_var.name)
+            script.add_line(f"{reject_writer_var}.writeheader()")
+            with script.gen_for(variables=[change_var, row_var], 
+                        iterable=f"{ImportConfig.FunctionName.diff_snapshots}({previous_path_param}, "
+                                 f"{current_path_param}, {n_buckets_param})"):
+                with script.gen_if(f"{change_var} == {repr(ImportConfig.SnapshotChange.removed)}"):
+                    script.add_line(f"{removed_rows_var}.append({row_var})")
+                    script.add_line("continue")
+                script.add_line(f"{savepoint_var} = {entries_var}.{Config.MethodName.Entries.savepoint}()")
+                with script.gen_try():
+                    gen_import_loop(script, table_object_vars, row_var=row_var, entries_var=entries_var, 
+                                    profile=profile)
+                # Rows come out of the snapshot buckets, so their line in the CSV is unknown
+                gen_reject_row(script, row=row_var.name, entries_var=entries_var, savepoint_var=savepoint_var, 
+                            reject_path_param=reject_path_param, reject_writer_var=reject_writer_var, 
+                            n_rejected_var=n_rejected_var, line="None")
+                script.add_line(f"{n_rows_var} += 1")
+        with script.gen_if(f"{n_rejected_var} > {max_reject_rate_param} * {n_rows_var}"):
+            script.add_line(f'raise Exception(f"{{{n_rejected_var}}} rows out of {{{n_rows_var}}} were rejected '
+                            f'(more than {{{max_reject_rate_param}:.2%}}), nothing is committed")')
+        if len(kept_t_names) > 0:
+            script.imports.add_import(module="sys", object="stderr")
+            with script.gen_if(f"len({removed_rows_var}) > 0"):
+                script.add_line(f'print(f"{{len({removed_rows_var})}} removed rows are only deleted from '
+                                f'{", ".join(sorted(deletable_t_names))}, their rows in {", ".join(kept_t_names)} '
+                                f'are kept", file=stderr)')
+        script.add_aligned_line(
+            start=f"{ImportConfig.FunctionName.commit_entries}(",
+            end=")",
+            separator=",",
+            values=[
+                f"{entries_var}",
+                f"{Config.ParamName.AddToDatabase.upsert}=True",
+                f"{sort_by_key_param}={sort_by_key_param}",
+                f"{ImportConfig.ParamName.before_write}=lambda {connection_var}: "
+                f"{ImportConfig.FunctionName.delete_removed_rows}({removed_rows_var}, {connection_var})",
+                f"{pool_param}={pool_param}",
+            ],
+        )
+
+
+def gen_reconcile_csv(script: PythonScript, table_object_vars: dict[str, dict[str, PythonVariable]],
+                row_var: PythonVariable, entries_var: PythonVariable, profile: CsvProfile, tables: SqlTables):
+    repair_param = PythonVariable(name=ImportConfig.ParamName.repair, type=BoolPythonType(), 
+                                  initial_litteral=False)
+    chunk_size_param = PythonVariable(name=Config.ParamName.Reconcile.chunk_size, type=IntPythonType(), 
+                                      initial_litteral=Config.Constant.reconcile_chunk_size)
+    n_chunks_param = PythonVariable(name=Config.ParamName.Reconcile.n_chunks, type=IntPythonType(), 
+                                    initial_litteral=Config.Constant.reconcile_n_chunks)
+    csv_file_var = PythonVariable(name=ImportConfig.VariableName.csv_file)
+    connection_var = PythonVariable(name=Config.ParamName.connection)
+    differences_var = PythonVariable(name=ImportConfig.VariableName.differences)
+    stable_t_names = set(m.table.name for m in profile if not m.write_to_database() or has_csv_primary_key(m))
+    reconciled_t_names = set(m.table.name for m in profile if m.write_to_database() and has_csv_primary_key(m) 
+                             and m.table.get_reconcile_primary_column() is not None
+                             and all(c.data_type.get_reffered_table_name() in stable_t_names 
+                                     for c in m.table.columns.values() if c.data_type.is_referrence()))
+    ordered_t_names = list(t_name for t_name in tables.get_insertion_graph().sink_to_source_exploration() 
+                           if t_name in reconciled_t_names)
+    pool_param = SqlTable.get_pool_param(imports=script.imports)
+    with script.gen_function_decl(ImportConfig.FunctionName.reconcile_csv, 
+                params=[repair_param, chunk_size_param, n_chunks_param, pool_param]):
+        if len(ordered_t_names) == 0:
+            script.add_line('raise Exception("No reconcilable table: no written table has its primary key read '
+                            'from the CSV with only such tables as references")')
+            return
+        with script.gen_if("len(argv) != 2"):
+            script.add_line('print(f"Usage: {argv[0]} <path_to_csv>")')
+            script.add_line("exit()")
+        entries_var.gen_declarartion(script, with_typing=False)
+        with script.gen_with(f"{ImportConfig.FunctionName.open_csv_file}(argv[1])", csv_file_var):
+            with script.gen_for(variables=[row_var], iterable=f'DictReader({csv_file_var}, delimiter=";")'):
+                gen_import_loop(script, table_object_vars, row_var=row_var, entries_var=entries_var, 
+                                profile=profile)
+        script.imports.add_import(module="typing", object="Any")
+        script.add_line(f"{differences_var}: dict[str, tuple[list[Any], list[Any]]] = {{}}")
+        script.add_line(f"{connection_var} = {Config.FunctionName.connect_to_database}({pool_param})")
+        with script.gen_try():
+            for t_name in ordered_t_names:
+                script.add_aligned_line(
+                    start=f"{differences_var}[{repr(t_name)}] = {tables[t_name].class_type.gen_type(script.imports)}"
+                          f".{Config.MethodName.Table.reconcile}(",
+                    end=")",
+                    separator=",",
+                    values=[
+                        f"{Config.ParamName.Reconcile.objects}={entries_var}."
+                        f"{Config.FieldName.Entries.cache(t_name)}.values()",
+                        f"{connection_var}={connection_var}",
+                        f"{chunk_size_param}={chunk_size_param}",
+                        f"{n_chunks_param}={n_chunks_param}",
+                    ],
+                )
+                script.add_line(f'print(f"{t_name}: {{len({differences_var}[{repr(t_name)}][0])}} rows to write, '
+                                f'{{len({differences_var}[{repr(t_name)}][1])}} rows to delete")')
+            with script.gen_if(repair_param.name):
+                for t_name in ordered_t_names:
+                    script.add_line(f"{tables[t_name].class_type.gen_type(script.imports)}."
+                                    f"{Config.MethodName.Table.add_to_database}({Config.ParamName.AddToDatabase.objects}="
+                                    f"{differences_var}[{repr(t_name)}][0], {connection_var}={connection_var}, "
+                                    f"{Config.ParamName.AddToDatabase.upsert}=True)")
+                for t_name in reversed(ordered_t_names):
+                    script.add_line(f"{tables[t_name].class_type.gen_type(script.imports)}."
+                                    f"{Config.MethodName.Table.delete_from_database}("
+                                    f"{Config.ParamName.DeleteFromDatabase.keys}={differences_var}[{repr(t_name)}][1], "
+                                    f"{connection_var}={connection_var})")
+                script.add_line(f"{Config.FunctionName.commit_to_database}({connection_var})")
+        with script.gen_finally():
+            script.add_line(f"{Config.FunctionName.close_database}({connection_var})")
+
+
+def gen_columnar_functions(script: PythonScript, table_object_vars: dict[str, dict[str, PythonVariable]],
+                row_var: PythonVariable, entries_var: PythonVariable, profile: CsvProfile):
+    columnar_profile = profile.columnar_profile()
+    casts_var = PythonVariable(name=ImportConfig.VariableName.columnar_casts, 
+                               type=DictPythonType(StrPythonType(), StrPythonType()), 
+                               initial_litteral=profile.columnar_casts())
+    script.globals.add_global(casts_var)
+    required_var = PythonVariable(name=ImportConfig.VariableName.columnar_required, 
+                                  type=SetPythonType(StrPythonType()), 
+                                  initial_litteral=set(profile.columnar_required_fields()))
+    script.globals.add_global(required_var)
+    script.imports.add_import(module="typing", object="Any")
+    columnar_row_var = PythonVariable(name=ImportConfig.VariableName.csv_row, 
+                                      type=DictPythonType(StrPythonType(), AnyPythonType()))
+    path_param = PythonVariable(name=ImportConfig.ParamName.path, type=StrPythonType())
+    batch_size_param = PythonVariable(name=ImportConfig.ParamName.batch_size, type=IntPythonType(), 
+                                      initial_litteral=ImportConfig.Constant.columnar_batch_size)
+    batches_var = PythonVariable(name=ImportConfig.VariableName.batches)
+    batch_var = PythonVariable(name=ImportConfig.VariableName.batch)
+    reader_var = PythonVariable(name=ImportConfig.VariableName.reader)
+    columns_var = PythonVariable(name=ImportConfig.VariableName.columns)
+    column_var = PythonVariable(name=ImportConfig.VariableName.column)
+    name_var = PythonVariable(name=ImportConfig.VariableName.name)
+    values_var = PythonVariable(name=ImportConfig.VariableName.values)
+    index_var = PythonVariable(name=ImportConfig.VariableName.index)
+    with script.gen_function_decl(ImportConfig.FunctionName.read_columnar_fields, params=[path_param], 
+                return_type=ListPythonType(StrPythonType())):
+        script.add_line("from pyarrow import ipc, parquet")
+        with script.gen_if(f"{path_param}.endswith({repr(ImportConfig.Constant.parquet_extension)})"):
+            script.add_line(f"return list(parquet.read_schema({path_param}).names)")
+        script.add_line(f"return list(ipc.open_file({path_param}).schema.names)")
+
+    with script.gen_function_decl(ImportConfig.FunctionName.read_columnar_rows, 
+                params=[path_param, batch_size_param], return_type=IterablePythonType(columnar_row_var.type)):
+        script.add_line("from pyarrow import ArrowInvalid, compute, ipc, parquet")
+        with script.gen_if(f"{path_param}.endswith({repr(ImportConfig.Constant.parquet_extension)})"):
+            script.add_line(f"{batches_var} = parquet.ParquetFile({path_param}).iter_batches("
+                            f"{batch_size_param}={batch_size_param})")
+        with script.gen_else():
+            script.add_line(f"{reader_var} = ipc.open_file({path_param})")
+            script.add_line(f"{batches_var} = ({reader_var}.get_batch({index_var}) "
+                            f"for {index_var} in range({reader_var}.num_record_batches))")
+        with script.gen_for(variables=[batch_var], iterable=batches_var.name):
+            script.add_line(f"{columns_var}: list[list[Any]] = []")
+            with script.gen_for(variables=[name_var], iterable=f"{batch_var}.schema.names"):
+                script.add_line(f"{column_var} = {batch_var}.column({name_var})")
+                with script.gen_if(f"{name_var} in {casts_var}"):
+                    with script.gen_try():
+                        script.add_line(f"{column_var} = compute.cast({column_var}, {casts_var}[{name_var}])")
+                    # Left as text, the values of the batch are parsed row by row
+                    with script.gen_except(exception_typename="ArrowInvalid"):
+                        script.add_line(f'{column_var} = compute.cast({column_var}, "string")')
+                with script.gen_else():
+                    script.add_line(f'{column_var} = compute.fill_null(compute.cast({column_var}, "string"), "")')
+                script.add_line(f"{columns_var}.append({column_var}.to_pylist())")
+            with script.gen_for(variables=[values_var], iterable=f"zip(*{columns_var})"):
+                script.add_line(f"yield dict(zip({batch_var}.schema.names, {values_var}))")
+
+    with script.gen_function_decl(ImportConfig.FunctionName.columnar_text_row, params=[columnar_row_var], 
+                return_type=row_var.type):
+        value_var = PythonVariable(name=ImportConfig.VariableName.csv_value)
+        script.add_line(f'return {{{name_var}: "" if {value_var} is None else str({value_var}) '
+                        f"for ({name_var}, {value_var}) in {columnar_row_var}.items()}}")
+
+    for m in columnar_profile:
+        if m.converter_name != ImportConfig.FunctionName.row_converter(m.table.name):
+            m.gen_column_pipelines(script)
+            m.gen_row_converter_decl(script, table_object_vars[m.table.name], entries_param=entries_var, 
+                        row_param=columnar_row_var)
+
+    commit_every_rows_param = PythonVariable(name=ImportConfig.ParamName.commit_every_rows, 
+                                             type=OptionalPythonType(IntPythonType()))
+    reject_path_param = PythonVariable(name=ImportConfig.ParamName.reject_path, 
+                                       type=OptionalPythonType(StrPythonType()))
+    max_reject_rate_param = PythonVariable(name=ImportConfig.ParamName.max_reject_rate, type=FloatPythonType(), 
+                                           initial_litteral=ImportConfig.Constant.max_reject_rate)
+    n_rows_var = PythonVariable(name=ImportConfig.VariableName.n_rows)
+    n_rejected_var = PythonVariable(name=ImportConfig.VariableName.n_rejected)
+    reject_file_var = PythonVariable(name=ImportConfig.VariableName.reject_file)
+    reject_writer_var = PythonVariable(name=ImportConfig.VariableName.reject_writer)
+    savepoint_var = PythonVariable(name=ImportConfig.VariableName.savepoint)
+    text_row_var = PythonVariable(name=ImportConfig.VariableName.text_row, type=row_var.type)
+    sort_by_key_param = SqlTable.get_sort_by_key_param()
+    pool_param = SqlTable.get_pool_param(imports=script.imports)
+    with script.gen_function_decl(ImportConfig.FunctionName.import_columnar, 
+                params=[path_param, commit_every_rows_param, batch_size_param, reject_path_param, 
+                        max_reject_rate_param, sort_by_key_param, pool_param]):
+        script.imports.add_import(module="os", object="devnull")
+        entries_var.gen_declarartion(script, with_typing=False)
+        for var in (n_rows_var, n_rejected_var):
+            script.add_line(f"{var} = 0")
+        with script.gen_with(f"open(file={reject_path_param} if {reject_path_param} is not None else devnull, "
+                             f'mode="w", newline="")', reject_file_var):
+            gen_reject_writer(script, reject_file_var=reject_file_var, reject_writer_var=reject_writer_var, 
+                        fieldnames=f"{ImportConfig.FunctionName.read_columnar_fields}({path_param})")
+            script.add_line(f"{reject_writer_var}.writeheader()")
+            with script.gen_for(variables=[columnar_row_var], iterable=f"{ImportConfig.FunctionName.read_columnar_rows}"
+                                                                       f"({path_param}, {batch_size_param})"):
+                script.add_line(f"{savepoint_var} = {entries_var}.{Config.MethodName.Entries.savepoint}()")
+                with script.gen_try():
+                    # Rows with a value that is not a number are parsed from text, as import_csv would
+                    with script.gen_if(f"all(isinstance({columnar_row_var}[f], (int, float)) or ({columnar_row_var}[f] "
+                                       f"is None and f not in {required_var}) for f in {casts_var})"):
+                        gen_import_loop(script, table_object_vars, row_var=columnar_row_var, entries_var=entries_var, 
+                                        profile=columnar_profile)
+                    with script.gen_else():
+                        script.add_line(f"{text_row_var} = {ImportConfig.FunctionName.columnar_text_row}"
+                                        f"({columnar_row_var})")
+                        gen_import_loop(script, table_object_vars, row_var=text_row_var, entries_var=entries_var, 
+                                        profile=profile)
+                gen_reject_row(script, row=f"{ImportConfig.FunctionName.columnar_text_row}({columnar_row_var})", 
+                            entries_var=entries_var, savepoint_var=savepoint_var, 
+                            reject_path_param=reject_path_param, reject_writer_var=reject_writer_var, 
+                            n_rejected_var=n_rejected_var, line=f"{n_rows_var} + 1")
+                script.add_line(f"{n_rows_var} += 1")
+                with script.gen_if(f"{commit_every_rows_param} is not None "
+                                   f"and {n_rows_var} % {commit_every_rows_param} == 0"):
+                    script.add_line(f"{ImportConfig.FunctionName.commit_entries}({entries_var}, "
+                                    f"{sort_by_key_param}={sort_by_key_param}, {pool_param}={pool_param})")
+        with script.gen_if(f"{n_rejected_var} > {max_reject_rate_param} * {n_rows_var}"):
+            script.add_line(f'raise Exception(f"{{{n_rejected_var}}} rows out of {{{n_rows_var}}} were rejected '
+                            f'(more than {{{max_reject_rate_param}:.2%}}), nothing more is committed")')
+        script.add_line(f"{ImportConfig.FunctionName.commit_entries}({entries_var}, "
+                        f"{sort_by_key_param}={sort_by_key_param}, {pool_param}={pool_param})")
+
+
 def gen_import_main(script: PythonScript, table_object_vars: dict[str, dict[str, PythonVariable]],
                 row_var: PythonVariable, entries_var: PythonVariable, profile: CsvProfile):
-    with script.gen_function_decl(ImportConfig.FunctionName.import_csv):
+    commit_every_rows_param = PythonVariable(name=ImportConfig.ParamName.commit_every_rows, 
+                                             type=OptionalPythonType(IntPythonType()))
+    commit_every_bytes_param = PythonVariable(name=ImportConfig.ParamName.commit_every_bytes, 
+                                              type=OptionalPythonType(IntPythonType()))
+    checkpoint_path_param = PythonVariable(name=ImportConfig.ParamName.checkpoint_path, 
+                                           type=OptionalPythonType(StrPythonType()))
+    reject_path_param = PythonVariable(name=ImportConfig.ParamName.reject_path, 
+                                       type=OptionalPythonType(StrPythonType()))
+    max_reject_rate_param = PythonVariable(name=ImportConfig.ParamName.max_reject_rate, 
+                                           type=FloatPythonType(), 
+                                           initial_litteral=ImportConfig.Constant.max_reject_rate)
+    fingerprint_path_param = PythonVariable(name=ImportConfig.ParamName.fingerprint_path, 
+                                            type=OptionalPythonType(StrPythonType()))
+    fingerprint_projected_param = PythonVariable(name=ImportConfig.ParamName.fingerprint_projected, 
+                                                 type=BoolPythonType(), initial_litteral=False)
+    verify_param = PythonVariable(name=ImportConfig.ParamName.verify, type=BoolPythonType(), 
+                                  initial_litteral=False)
+    bulk_param = PythonVariable(name=ImportConfig.ParamName.bulk, type=BoolPythonType(), initial_litteral=False)
+    check_references_param = PythonVariable(name=ImportConfig.ParamName.check_references, type=BoolPythonType(), 
+                                            initial_litteral=True)
+    sort_by_key_param = SqlTable.get_sort_by_key_param()
+    pool_param = SqlTable.get_pool_param(imports=script.imports)
+    with script.gen_function_decl(ImportConfig.FunctionName.import_csv, 
+                params=[commit_every_rows_param, commit_every_bytes_param, checkpoint_path_param,
+                        reject_path_param, max_reject_rate_param, fingerprint_path_param, 
+                        fingerprint_projected_param, verify_param, bulk_param, check_references_param, 
+                        sort_by_key_param, pool_param]):
         script.imports.add_import(module="sys", object="argv")
+        script.imports.add_import(module="os.path", object="exists")
+        script.imports.add_import(module="os", object="remove")
+        script.imports.add_import(module="os", object="devnull")
         with script.gen_if("len(argv) != 2"):
             script.add_line('print(f"Usage: {argv[0]} <path_to_csv>")')
             script.add_line("exit()")
+        generated_key_t_names = list(m.table.name for m in profile 
+                                     if m.write_to_database() and not has_csv_primary_key(m))
+        unresumable_t_names = list(m.table.name for m in profile if m.table.name in generated_key_t_names 
+                                   and len(m.table.get_natural_constraints()) == 0)
+        if len(unresumable_t_names) > 0:
+            with script.gen_if(f"{checkpoint_path_param} is not None"):
+                script.add_line(f'raise Exception("Cannot resume imports of {", ".join(unresumable_t_names)}: '
+                                f'their keys are not read from the CSV and no unique key finds their committed rows")')
         csv_file_var = PythonVariable(name=ImportConfig.VariableName.csv_file)
-        entries_var.gen_declarartion(script, with_typing=False)
+        csv_reader_var = PythonVariable(name=ImportConfig.VariableName.csv_reader)
+        n_rows_var = PythonVariable(name=ImportConfig.VariableName.n_rows)
+        n_rejected_var = PythonVariable(name=ImportConfig.VariableName.n_rejected)
+        line_offset_var = PythonVariable(name=ImportConfig.VariableName.line_offset)
+        committed_bytes_var = PythonVariable(name=ImportConfig.VariableName.committed_bytes)
+        checkpoint_var = PythonVariable(name=ImportConfig.VariableName.checkpoint)
+        resuming_var = PythonVariable(name=ImportConfig.VariableName.resuming)
+        reject_file_var = PythonVariable(name=ImportConfig.VariableName.reject_file)
+        reject_writer_var = PythonVariable(name=ImportConfig.VariableName.reject_writer)
+        fingerprint_var = PythonVariable(name=ImportConfig.VariableName.fingerprint)
+        fingerprints_var = PythonVariable(name=ImportConfig.VariableName.fingerprints)
+        new_fingerprints_var = PythonVariable(name=ImportConfig.VariableName.new_fingerprints)
+        committed_keys_size_var = PythonVariable(name=ImportConfig.VariableName.committed_keys_size)
+        for var in (n_rows_var, n_rejected_var, line_offset_var, committed_bytes_var, committed_keys_size_var):
+            script.add_line(f"{var} = 0")
+        script.add_line(f"{resuming_var} = {checkpoint_path_param} is not None "
+                        f"and exists({checkpoint_path_param})")
+        replaying_var = PythonVariable(name=ImportConfig.VariableName.replaying)
+        script.add_line(f"{replaying_var} = {resuming_var}")
+        # Rows with generated keys committed before a resume are not cached, their unique keys find them
+        upsert = f"{fingerprint_path_param} is not None or {replaying_var}" \
+                 + (f" or {resuming_var}" if len(generated_key_t_names) > 0 else "")
+        script.add_line(f"{entries_var} = {Config.ClassName.entries}"
+                        f"({Config.ParamName.Verify.verify}={verify_param})")
+        script.add_line(f"{fingerprints_var} = {ImportConfig.FunctionName.load_fingerprints}"
+                        f"({fingerprint_path_param}) if {fingerprint_path_param} is not None else set()")
+        script.add_line(f"{new_fingerprints_var} = []")
+        baseline_var = PythonVariable(name=ImportConfig.VariableName.baseline)
+        script.add_line(f"{baseline_var} = {ImportConfig.FunctionName.fetch_table_checksums}({entries_var}, {pool_param}) "
+                        f"if {verify_param} and not {resuming_var} else None")
+        with script.gen_if(check_references_param.name):
+            script.add_line(f"{ImportConfig.FunctionName.preload_keys}({pool_param})")
+        with script.gen_else():
+            script.add_line(f"{ImportConfig.VariableName.known_keys}.clear()")
 
-        with script.gen_with(f'open(file=argv[1], mode="r")', csv_file_var):
+        with script.gen_with(f"{ImportConfig.FunctionName.open_csv_file}(argv[1])", csv_file_var):
             script.imports.add_import("csv", "DictReader")
-            with script.gen_for(variables=[row_var], iterable=f'DictReader({csv_file_var}, delimiter=";")'):
-                gen_import_loop(script, table_object_vars, row_var=row_var, entries_var=entries_var, 
-                                profile=profile)
-        generate_entries_commit(script, entries_var)
+            script.imports.add_import("csv", "DictWriter")
+            script.add_line(f'{csv_reader_var} = DictReader(iter({csv_file_var}.readline, ""), delimiter=";")')
+            with script.gen_with(f"open(file={reject_path_param} if {reject_path_param} is not None else devnull, "
+                                 f'mode="a" if {resuming_var} else "w", newline="")', reject_file_var):
+                gen_reject_writer(script, reject_file_var=reject_file_var, reject_writer_var=reject_writer_var, 
+                            fieldnames=f"{csv_reader_var}.fieldnames")
+                with script.gen_if(resuming_var.name):
+                    script.add_line(f"{checkpoint_var} = {ImportConfig.FunctionName.load_checkpoint}"
+                                    f"({checkpoint_path_param})")
+                    script.add_line(f"{csv_file_var}.seek({checkpoint_var}"
+                                    f"[{repr(ImportConfig.CheckpointKey.offset)}])")
+                    script.add_line(f"{line_offset_var} = {checkpoint_var}[{repr(ImportConfig.CheckpointKey.line)}] "
+                                    f"- {csv_reader_var}.line_num")
+                    script.add_line(f"{n_rows_var} = {checkpoint_var}[{repr(ImportConfig.CheckpointKey.n_rows)}]")
+                    script.add_line(f"{n_rejected_var} = {checkpoint_var}"
+                                    f"[{repr(ImportConfig.CheckpointKey.n_rejected)}]")
+                    with script.gen_if(f"{reject_path_param} is not None"):
+                        script.add_line(f"{reject_file_var}.truncate({checkpoint_var}"
+                                        f"[{repr(ImportConfig.CheckpointKey.reject_offset)}])")
+                    script.add_line(f"{entries_var}.{Config.MethodName.Entries.restore_stats}"
+                                    f"({checkpoint_var}[{repr(ImportConfig.CheckpointKey.stats)}])")
+                    script.add_line(f"{committed_keys_size_var} = "
+                                    f"{checkpoint_var}[{repr(ImportConfig.CheckpointKey.committed_keys_size)}]")
+                    script.add_line(f"{ImportConfig.FunctionName.load_committed_keys}({entries_var}, "
+                                    f"{checkpoint_path_param}, {committed_keys_size_var})")
+                    script.add_line(f"{baseline_var} = {checkpoint_var}[{repr(ImportConfig.CheckpointKey.baseline)}]")
+                    script.add_line(f"{committed_bytes_var} = {csv_file_var}.buffer.tell()")
+                with script.gen_else():
+                    script.add_line(f"{reject_writer_var}.writeheader()")
+                with script.gen_for(variables=[row_var], iterable=csv_reader_var.name):
+                    with script.gen_if(f"{fingerprint_path_param} is not None"):
+                        script.add_line(f"{fingerprint_var} = {ImportConfig.FunctionName.row_fingerprint}"
+                                        f"({row_var}, {fingerprint_projected_param})")
+                        with script.gen_if(f"{fingerprint_var} in {fingerprints_var}"):
+                            script.add_line("continue")
+                    savepoint_var = PythonVariable(name=ImportConfig.VariableName.savepoint)
+                    script.add_line(f"{savepoint_var} = {entries_var}.{Config.MethodName.Entries.savepoint}()")
+                    with script.gen_try():
+                        gen_import_loop(script, table_object_vars, row_var=row_var, entries_var=entries_var, 
+                                        profile=profile)
+                        with script.gen_if(f"{fingerprint_path_param} is not None"):
+                            script.add_line(f"{fingerprints_var}.add({fingerprint_var})")
+                            script.add_line(f"{new_fingerprints_var}.append({fingerprint_var})")
+                    gen_reject_row(script, row=row_var.name, entries_var=entries_var, savepoint_var=savepoint_var, 
+                                reject_path_param=reject_path_param, reject_writer_var=reject_writer_var, 
+                                n_rejected_var=n_rejected_var, line=f"{line_offset_var} + {csv_reader_var}.line_num")
+                    script.add_line(f"{n_rows_var} += 1")
+                    script.add_aligned_line(
+                        start="if ",
+                        end=":",
+                        separator="or ",
+                        values=[
+                            f"({commit_every_rows_param} is not None "
+                            f"and {n_rows_var} % {commit_every_rows_param} == 0)",
+                            f"({commit_every_bytes_param} is not None "
+                            f"and {csv_file_var}.buffer.tell() - {committed_bytes_var} >= {commit_every_bytes_param})",
+                        ],
+                        newline_after_separator=False,
+                        escape_after_newline=True,
+                    )
+                    script.add_indent()
+                    committed_keys_var = PythonVariable(name=ImportConfig.VariableName.committed_keys)
+                    gen_commit_with_fingerprints(script, entries_var=entries_var, 
+                                fingerprint_path_param=fingerprint_path_param, 
+                                new_fingerprints_var=new_fingerprints_var, bulk_param=bulk_param, 
+                                replaying_var=replaying_var, upsert=upsert, sort_by_key_param=sort_by_key_param, 
+                                pool_param=pool_param, prefix=f"{committed_keys_var} = ")
+                    script.add_line(f"{committed_bytes_var} = {csv_file_var}.buffer.tell()")
+                    with script.gen_if(f"{checkpoint_path_param} is not None"):
+                        script.add_line(f"{reject_file_var}.flush()")
+                        script.add_line(f"{committed_keys_size_var} = {ImportConfig.FunctionName.save_committed_keys}"
+                                        f"({checkpoint_path_param}, {committed_keys_size_var}, {committed_keys_var})")
+                        script.add_aligned_line(
+                            start=f"{ImportConfig.FunctionName.save_checkpoint}({checkpoint_path_param}, {{",
+                            end="})",
+                            separator=",",
+                            values=[
+                                f"{repr(ImportConfig.CheckpointKey.offset)}: {csv_file_var}.tell()",
+                                f"{repr(ImportConfig.CheckpointKey.line)}: {line_offset_var} + {csv_reader_var}.line_num",
+                                f"{repr(ImportConfig.CheckpointKey.n_rows)}: {n_rows_var}",
+                                f"{repr(ImportConfig.CheckpointKey.n_rejected)}: {n_rejected_var}",
+                                f"{repr(ImportConfig.CheckpointKey.reject_offset)}: {reject_file_var}.tell()",
+                                f"{repr(ImportConfig.CheckpointKey.stats)}: "
+                                f"{entries_var}.{Config.MethodName.Entries.stats}()",
+                                f"{repr(ImportConfig.CheckpointKey.committed_keys_size)}: {committed_keys_size_var}",
+                                f"{repr(ImportConfig.CheckpointKey.baseline)}: {baseline_var}",
+                            ],
+                        )
+                    script.remove_indent()
+        with script.gen_if(f"{n_rejected_var} > {max_reject_rate_param} * {n_rows_var}"):
+            script.add_line(f'raise Exception(f"{{{n_rejected_var}}} rows out of {{{n_rows_var}}} were rejected '
+                            f'(more than {{{max_reject_rate_param}:.2%}}), nothing more is committed")')
+        gen_commit_with_fingerprints(script, entries_var=entries_var, 
+                    fingerprint_path_param=fingerprint_path_param, new_fingerprints_var=new_fingerprints_var, 
+                    bulk_param=bulk_param, replaying_var=replaying_var, upsert=upsert, 
+                    sort_by_key_param=sort_by_key_param, pool_param=pool_param)
+        with script.gen_if(f"{baseline_var} is not None"):
+            script.add_line(f"{ImportConfig.FunctionName.verify_entries}({entries_var}, {baseline_var}, {pool_param})")
+        with script.gen_if(f"{checkpoint_path_param} is not None and exists({checkpoint_path_param})"):
+            script.add_line(f"remove({checkpoint_path_param})")
+        keys_path = f"{checkpoint_path_param} + {repr(ImportConfig.Constant.committed_keys_suffix)}"
+        with script.gen_if(f"{checkpoint_path_param} is not None and exists({keys_path})"):
+            script.add_line(f"remove({keys_path})")
 
 def gen_import_functions(script: PythonScript, profile: CsvProfile, tables: SqlTables):
     profile.gen_operations(script)
+    for m in profile:
+        m.gen_column_pipelines(script)
 
     table_object_vars = make_table_object_vars(profile, tables)
     
@@ -63,14 +915,38 @@ def gen_import_functions(script: PythonScript, profile: CsvProfile, tables: SqlT
                                  type=ClassPythonType(Config.ClassName.entries))
     row_var = PythonVariable(name=ImportConfig.VariableName.csv_row, 
                                type=DictPythonType(StrPythonType(), StrPythonType()))
+    with script.gen_class_decl(ClassPythonType(ImportConfig.ClassName.import_failure, 
+                                               parent=ClassPythonType("Exception"))):
+        script.add_line("pass")
     for m in profile:
         m.gen_row_converter_decl(script, table_object_vars[m.table.name], entries_param=entries_var, 
                     row_param=row_var)
+    gen_open_csv_file_function(script)
+    gen_commit_entries_function(script, entries_var=entries_var, profile=profile)
+    gen_preload_keys_function(script, profile=profile, tables=tables)
+    gen_checkpoint_functions(script, entries_var=entries_var)
+    gen_verification_functions(script, entries_var=entries_var)
+    gen_find_invalid_column_function(script, row_var=row_var, profile=profile)
+    gen_fingerprint_functions(script, row_var=row_var, profile=profile)
     gen_import_main(script, entries_var=entries_var, row_var=row_var, profile=profile,
                 table_object_vars=table_object_vars)
 
+    gen_snapshot_diff_functions(script, row_var=row_var, profile=profile)
+    gen_import_snapshot_diff(script, entries_var=entries_var, row_var=row_var, profile=profile,
+                table_object_vars=table_object_vars)
+    gen_reconcile_csv(script, entries_var=entries_var, row_var=row_var, profile=profile,
+                table_object_vars=table_object_vars, tables=tables)
+
+    gen_columnar_functions(script, table_object_vars=table_object_vars, row_var=row_var, 
+                entries_var=entries_var, profile=profile)
+
     with script.gen_if(f'__name__ == "__main__"'):
-        script.add_line(f"{ImportConfig.FunctionName.import_csv}()")
+        with script.gen_if("len(argv) == 3"):
+            script.add_line(f"{ImportConfig.FunctionName.import_snapshot_diff}(argv[1], argv[2])")
+        with script.gen_elif(f"len(argv) == 2 and argv[1].endswith({repr(ImportConfig.Constant.columnar_extensions)})"):
+            script.add_line(f"{ImportConfig.FunctionName.import_columnar}(argv[1])")
+        with script.gen_else():
+            script.add_line(f"{ImportConfig.FunctionName.import_csv}()")
 
 
 def make_table_object_vars(profile: CsvProfile, tables: SqlTables):
@@ -106,7 +982,7 @@ def create_importer(database: Database, profile: CsvProfile):
     tables = generate_schema(database)
     filter_imported_table(profile, tables)
     script = PythonScript()
-    generate_objects_code(script, tables, database)
+    generate_objects_code(script, tables, database, trusted_columns=profile.trusted_columns())
     gen_import_functions(script, profile, tables)
     return script
 
@@ -10,7 +10,7 @@ except ModuleNotFoundError:
     sys.path[0] += "/.."
 
 from csv import DictReader
-from csv_addon.util import find_csv_delimiter
+from csv_addon.util import find_csv_delimiter, open_csv_file
 from database import choose_database
 from typing import Callable, Iterable, Optional, TypeVar, cast
 from operations import CONSTANT_STR_OP, ENUM_CONVERTER_OP, NULLIFY_STR_OP, TO_ASCII_OP, UPPER_STR_OP, Operation, OperationChain
@@ -235,6 +235,19 @@ def set_default_csv_operation_chain(method: NormalCsv, column: SqlColumn, f_name
                             
 
 
+def choose_hash_key_fields(t_name: str, field_name_type: dict[str, DeducedType]):
+    '''CSV fields identifying a row of the table, hashed into its key'''
+    f_names: list[str] = list()
+    while True:
+        done_choice = "Use those fields"
+        choice = this_print_choose(list(f for f in field_name_type if f not in f_names), 
+                    prompt=f"Choose field identifying a {t_name}", 
+                    default=done_choice if len(f_names) > 0 else None)
+        if choice == done_choice:
+            return f_names
+        f_names.append(choice)
+
+
 def create_normal_csv_profile(methods: list[NormalCsv], field_name_type: dict[str, DeducedType]):
     methods_table = {m.table.name: m for m in methods}
     table_req_column_names = {m.table.name: set(c.name for c in m.required_columns()) for m in methods}
@@ -258,7 +271,7 @@ def create_normal_csv_profile(methods: list[NormalCsv], field_name_type: dict[st
         table = methods_table[t_name].table
         primary_column = table.columns[table.get_primary_column_names()[0]]
         generators = list(o for o in CSV_OPERATIONS.values() if o.primary
-            and o.get_input_type().is_super_type(NonePythonType())
+            and (o.get_input_type().is_super_type(NonePythonType()) or o.name == CSV_HASH_KEY_OP.name)
             and primary_column.make_type().is_super_type(o.get_output_type()))
         if len(generators) == 0:
             print(f"Error: no generator available for {t_name}, continuing")
@@ -266,8 +279,11 @@ def create_normal_csv_profile(methods: list[NormalCsv], field_name_type: dict[st
         generator = print_choose(printer=lambda o: o.name, prompt="Choose generator", 
                     items=generators, suffix=get_suffix(), prefix=get_prefix())
         print(f"Using {generator.name} for {t_name}")
-        methods_table[t_name].table_profile[primary_column] = \
-                    OperationChain([CSV_NO_COLUMN_OP.make_instance(), generator.make_instance()])
+        if generator.name == CSV_HASH_KEY_OP.name:
+            chain = OperationChain([generator.make_instance([choose_hash_key_fields(t_name, field_name_type)])])
+        else:
+            chain = OperationChain([CSV_NO_COLUMN_OP.make_instance(), generator.make_instance()])
+        methods_table[t_name].table_profile[primary_column] = chain
         table_req_column_names[t_name].remove(primary_column.name)
 
     # Finding best fields for required columns
@@ -481,9 +497,10 @@ def create_constant_profile(methods: list[Constant]):
 def create_profile(tables: dict[str, SqlTable], table_method_names: dict[str, str], 
             field_name_type: dict[str, DeducedType]):
     def explorer(t_name: str):
+        deferred_columns = tables[t_name].get_deferred_columns()
         for column in tables[t_name].columns.values():
             data_type = column.data_type
-            if isinstance(data_type, SqlReferenceType) and \
+            if isinstance(data_type, SqlReferenceType) and column not in deferred_columns and \
                         (not column.optional or data_type.table.name in table_method_names):
                 yield data_type.table.name
     graph = Graph(nodes=list(tables), explorer=explorer) # type: ignore
@@ -568,7 +585,7 @@ class DeducedType:
 
 
 def get_field_name_type(csv_filepath: str) -> dict[str, DeducedType]:
-    with open(file=csv_filepath, mode="r") as csv_file:
+    with open_csv_file(csv_filepath) as csv_file:
         csv_reader = DictReader(csv_file, delimiter=find_csv_delimiter(csv_filepath))
         if csv_reader.fieldnames is None:
             raise Exception("Invalid File : no header")
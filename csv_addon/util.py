@@ -1,8 +1,44 @@
+from bz2 import BZ2File
+from gzip import GzipFile
+from io import BufferedReader, TextIOWrapper
+from lzma import LZMAFile
+from typing import Any, TextIO
+
+CSV_BUFFER_SIZE = 1 << 20
+GZIP_MAGIC = b"\x1f\x8b"
+XZ_MAGIC = b"\xfd7zXZ\x00"
+BZIP2_MAGIC = b"BZh"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+MAGIC_SIZE = max(len(GZIP_MAGIC), len(XZ_MAGIC), len(BZIP2_MAGIC), len(ZSTD_MAGIC))
+
+
+def open_csv_file(csv_filepath: str) -> TextIO:
+    '''Open a CSV file as text, decompressing gzip, xz, bzip2 or zstd files as a stream'''
+    with open(file=csv_filepath, mode="rb") as raw_file:
+        magic = raw_file.read(MAGIC_SIZE)
+    compressed_file: Any = None
+    if magic.startswith(GZIP_MAGIC):
+        compressed_file = GzipFile(filename=csv_filepath)
+    elif magic.startswith(XZ_MAGIC):
+        compressed_file = LZMAFile(filename=csv_filepath)
+    elif magic.startswith(BZIP2_MAGIC):
+        compressed_file = BZ2File(filename=csv_filepath)
+    elif magic.startswith(ZSTD_MAGIC):
+        try:
+            from zstandard import ZstdDecompressor
+        except ModuleNotFoundError:
+            raise Exception(f"Cannot read {csv_filepath}: zstandard is required for zstd files")
+        compressed_file = ZstdDecompressor().stream_reader(open(file=csv_filepath, mode="rb"), closefd=True)
+    else:
+        return open(file=csv_filepath, mode="r", newline="", buffering=CSV_BUFFER_SIZE)
+    return TextIOWrapper(BufferedReader(compressed_file, buffer_size=CSV_BUFFER_SIZE), newline="")
+
+
 def find_csv_delimiter(csv_filepath: str):
     delimiter = ","
-    with open(file=csv_filepath) as csv_file:
+    with open_csv_file(csv_filepath) as csv_file:
         for line in csv_file:
             if line.count(";") > line.count(","):
                 delimiter = ";"
             break
-    return delimiter
\ No newline at end of file
+    return delimiter
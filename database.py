@@ -1,8 +1,10 @@
 from __future__ import annotations
-from typing import Any
+from typing import Any, Iterator, Optional
 from mysql.connector import connect as sql_connect
 from json import load
 from os import listdir
+from queue import Empty, Queue
+from threading import Lock
 from util.util import print_choose
 
 
@@ -45,39 +47,150 @@ class Database:
     def connect(self):
         return DatabaseConnection(self)
 
+    def create_pool(self, size: int = 4):
+        return DatabasePool(self, size=size)
+
+    def open_connection(self):
+        return sql_connect(host=self.host, password=self.password, user=self.user, database=self.name)
+
+
+class DatabasePool:
+    '''Keep at most size open connections to a database, checked on checkout and reset on return'''
+    def __init__(self, database: Database, size: int = 4, timeout: float = 30):
+        if size < 1:
+            raise Exception(f"Cannot create a pool of {size} connections")
+        self.database = database
+        self.size = size
+        self.timeout = timeout
+        self.__idle: Queue[Any] = Queue(maxsize=size)
+        self.__n_open = 0
+        self.__lock = Lock()
+
+    def connect(self):
+        return DatabaseConnection(self.database, pool=self)
+
+    def acquire(self):
+        try:
+            cnx = self.__idle.get_nowait()
+        except Empty:
+            with self.__lock:
+                can_open = self.__n_open < self.size
+                if can_open:
+                    self.__n_open += 1
+            if can_open:
+                return self.__open()
+            try:
+                cnx = self.__idle.get(timeout=self.timeout)
+            except Empty:
+                raise Exception(f"No connection to {self.database.get_full_name()} available "
+                                f"after {self.timeout}s")
+        try:
+            cnx.ping(reconnect=True, attempts=1)
+            return cnx
+        except Exception:
+            self.__discard(cnx)
+            with self.__lock:
+                self.__n_open += 1
+            return self.__open()
+
+    def release(self, cnx: Any):
+        try:
+            cnx.rollback()
+            cnx.reset_session()
+        except Exception:
+            self.__discard(cnx)
+            return
+        self.__idle.put_nowait(cnx)
+
+    def close(self):
+        while True:
+            try:
+                self.__discard(self.__idle.get_nowait())
+            except Empty:
+                break
+
+    def __open(self):
+        try:
+            return self.database.open_connection()
+        except Exception:
+            with self.__lock:
+                self.__n_open -= 1
+            raise
+
+    def __discard(self, cnx: Any):
+        with self.__lock:
+            self.__n_open -= 1
+        try:
+            cnx.close()
+        except Exception:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exit: Any, value: Any, exc: Any):
+        self.close()
+
 
 class DatabaseConnection:
-    def __init__(self, database: Database):
+    def __init__(self, database: Database, pool: Optional[DatabasePool] = None):
         self.database = database
+        self.pool = pool
         self.__cnx = None
+        self.__cursor = None
 
     def execute(self, request: str, params: list[Any] = list()):
         if self.__cnx is None:
             raise Exception("Cannot execute: connection is not established")
         try:
-            cursor = self.__cnx.cursor()
+            if self.__cursor is None:
+                self.__cursor = self.__cnx.cursor(buffered=True)
+            self.__cursor.execute(request, params)
+            return self.__cursor.fetchall() if self.__cursor.with_rows else []
+        except Exception as e:
+            raise Exception(f"Request '{request} failed : {e}")
+
+    def execute_iter(self, request: str, params: list[Any] = list(), batch_size: int = 1000) -> Iterator[Any]:
+        '''Yield the rows of a request in batches from an unbuffered cursor, without materializing the result'''
+        if self.__cnx is None:
+            raise Exception("Cannot execute: connection is not established")
+        cursor = self.__cnx.cursor(buffered=False)
+        try:
             cursor.execute(request, params)
-            results = list(cursor)
-            cursor.close()
-            return results
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if len(rows) == 0:
+                    break
+                yield from rows
         except Exception as e:
             raise Exception(f"Request '{request} failed : {e}")
+        finally:
+            cursor.close()
 
     def ask_commit(self):
         if not input(f"commit to {self.database.get_full_name()} (y/N) ") == "y":
             raise Exception("No commit")
 
     def __enter__(self):
-        self.__cnx = sql_connect(host=self.database.host, password=self.database.password,
-                                 user=self.database.user, database=self.database.name)
+        if self.pool is not None:
+            self.__cnx = self.pool.acquire()
+        else:
+            self.__cnx = self.database.open_connection()
         return self
 
     def __exit__(self, exit: Any, value: Any, exc: Any):
         if self.__cnx is None:
             raise Exception("Cannot close: connection is not established")
+        if self.__cursor is not None:
+            self.__cursor.close()
+            self.__cursor = None
         if (exit or value or exc) is None:
             print("No errors appened, commiting")
             self.__cnx.commit()
         else:
             print("An error happened", exit, value, exc)
-        self.__cnx.close()
+        if self.pool is not None:
+            self.pool.release(self.__cnx)
+        else:
+            self.__cnx.close()
+        self.__cnx = None
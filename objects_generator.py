@@ -1,6 +1,6 @@
 #!/usr/bin/env python3
 from collections import defaultdict
-from typing import cast
+from typing import Iterator, cast
 from operation_functions import to_ascii, upper_str
 from python_script import PythonScript
 from database import DatabaseConnection, Database
@@ -25,6 +25,7 @@ def get_table_columns(connection: DatabaseConnection):
         "CHARACTER_MAXIMUM_LENGTH",
         "NUMERIC_PRECISION",
         "COLUMN_DEFAULT",
+        "EXTRA",
     ]
     request = (
         "SELECT " + ", ".join(requested_columns) + " "
@@ -32,7 +33,7 @@ def get_table_columns(connection: DatabaseConnection):
         "WHERE TABLE_SCHEMA = %s"
     )
     params = [connection.database.name]
-    results: list[tuple[str, str, str, str, bytes, int, int, bytes]] = connection.execute(
+    results: Iterator[tuple[str, str, str, str, bytes, int, int, bytes, str]] = connection.execute_iter(
         request=request, params=params
     )
     return list(
@@ -49,6 +50,7 @@ def get_table_columns(connection: DatabaseConnection):
                 ),
                 optional=nullable == "YES",
                 default=default,
+                auto_increment="auto_increment" in extra,
             ),
         )
         for (
@@ -60,6 +62,7 @@ def get_table_columns(connection: DatabaseConnection):
             char_limit,
             precision,
             default,
+            extra,
         ) in results
     )
 
@@ -87,7 +90,7 @@ def get_constraints(
 
     params = [connection.database.name, constraint_type]
 
-    results: list[tuple[str, str, str, str, str]] = connection.execute(
+    results: Iterator[tuple[str, str, str, str, str]] = connection.execute_iter(
         request=request, params=params
     )
     raw_constraints: dict[tuple[str, str, str], tuple[list[str], list[str]]] = defaultdict(
@@ -125,6 +128,7 @@ def get_constraints(
 def make_type(
     data_type: str, column_type: bytes, char_limit: int, precision: int, t_name: str
 ) -> SqlType:
+    unsigned = "unsigned" in btos(column_type)
     if data_type == "datetime":
         return SqlDateTimeType()
     elif data_type == "enum":
@@ -137,21 +141,21 @@ def make_type(
     elif data_type == "double":
         return SqlDoubleType(precision=precision)
     elif data_type == "bigint":
-        return SqlIntegerType(precision=precision)
+        return SqlIntegerType(precision=precision, bits=64, unsigned=unsigned)
     elif data_type == "int":
-        return SqlIntegerType(precision=precision)
+        return SqlIntegerType(precision=precision, bits=32, unsigned=unsigned)
     elif data_type == "json":
         return SqlJsonType()
     elif data_type == "longblob":
         return SqlBlobType(char_limit=char_limit)
     elif data_type == "smallint":
-        return SqlIntegerType(precision=precision)
+        return SqlIntegerType(precision=precision, bits=16, unsigned=unsigned)
     elif data_type == "time":
         return SqlTimeType()
     elif data_type == "date":
         return SqlDateType()
     elif data_type == "tinyint":
-        return SqlIntegerType(precision=precision)
+        return SqlIntegerType(precision=precision, bits=8, unsigned=unsigned)
     elif data_type == "varchar":
         return SqlStringType(char_limit=char_limit)
     elif data_type == "text":
@@ -197,43 +201,79 @@ def pretty_print_tables(tables: dict[str, SqlTable]):
         print(3 * "\n", end="")
 
 
+def gen_connection_arguments(script: PythonScript, database: Database):
+    host_var = PythonVariable(
+        name=Config.VariableName.ConnectToDataBase.host,
+        type=StrPythonType(),
+        initial_litteral=database.host,
+    )
+    user_var = PythonVariable(
+        name=Config.VariableName.ConnectToDataBase.user,
+        type=StrPythonType(),
+        initial_litteral=database.user,
+    )
+    password_var = PythonVariable(
+        name=Config.VariableName.ConnectToDataBase.password,
+        type=StrPythonType(),
+        initial_litteral=database.password,
+    )
+    schema_var = PythonVariable(
+        name=Config.VariableName.ConnectToDataBase.name,
+        type=StrPythonType(),
+        initial_litteral=database.name,
+    )
+    host_var.gen_declarartion(script=script, with_typing=False)
+    user_var.gen_declarartion(script=script, with_typing=False)
+    password_var.gen_declarartion(script=script, with_typing=False)
+    schema_var.gen_declarartion(script=script, with_typing=False)
+    return [
+        f"{Config.ParamName.ConnectToDatabase.host}={host_var}",
+        f"{Config.ParamName.ConnectToDatabase.user}={user_var}",
+        f"{Config.ParamName.ConnectToDatabase.password}={password_var}",
+        f"{Config.ParamName.ConnectToDatabase.name}={schema_var}",
+    ]
+
+
+def gen_create_connection_pool_function(script: PythonScript, database: Database):
+    script.imports.add_import_from_config(Config.SqlConnector.Imports.pool_type)
+    size_param = PythonVariable(
+        name=Config.ParamName.ConnectionPool.size,
+        type=IntPythonType(),
+        initial_litteral=Config.Constant.pool_size,
+    )
+    with script.gen_function_decl(
+        function_name=Config.FunctionName.create_connection_pool,
+        params=[size_param],
+        return_type=ClassPythonType(Config.SqlConnector.Imports.pool_type.name()),
+    ):
+        arguments = gen_connection_arguments(script=script, database=database)
+        script.add_aligned_line(
+            start=f"return {Config.SqlConnector.Imports.pool_type.name()}(",
+            end=")",
+            separator=", ",
+            values=[
+                f'{Config.ParamName.ConnectionPool.pool_name}="{Config.Constant.pool_name}"',
+                f"{Config.ParamName.ConnectionPool.pool_size}={size_param}",
+                f"{Config.ParamName.ConnectionPool.pool_reset_session}=True",
+            ]
+            + arguments,
+        )
+
+
 def gen_connect_to_database_function(script: PythonScript, database: Database):
-    with script.gen_function_decl(function_name=Config.FunctionName.connect_to_database):
+    pool_param = SqlTable.get_pool_param(imports=script.imports)
+    with script.gen_function_decl(
+        function_name=Config.FunctionName.connect_to_database, params=[pool_param]
+    ):
         script.imports.add_import_from_config(Config.SqlConnector.Imports.connect_function)
-        host_var = PythonVariable(
-            name=Config.VariableName.ConnectToDataBase.host,
-            type=StrPythonType(),
-            initial_litteral=database.host,
-        )
-        user_var = PythonVariable(
-            name=Config.VariableName.ConnectToDataBase.user,
-            type=StrPythonType(),
-            initial_litteral=database.user,
-        )
-        password_var = PythonVariable(
-            name=Config.VariableName.ConnectToDataBase.password,
-            type=StrPythonType(),
-            initial_litteral=database.password,
-        )
-        schema_var = PythonVariable(
-            name=Config.VariableName.ConnectToDataBase.name,
-            type=StrPythonType(),
-            initial_litteral=database.name,
-        )
-        host_var.gen_declarartion(script=script, with_typing=False)
-        user_var.gen_declarartion(script=script, with_typing=False)
-        password_var.gen_declarartion(script=script, with_typing=False)
-        schema_var.gen_declarartion(script=script, with_typing=False)
+        with script.gen_if(f"{pool_param} is not None"):
+            script.add_line(f"return {pool_param}.{Config.SqlConnector.Methods.pool_get_connection}()")
+        arguments = gen_connection_arguments(script=script, database=database)
         script.add_aligned_line(
             start=f"return {Config.SqlConnector.Imports.connect_function.name()}(",
             end=")",
             separator=", ",
-            values=[
-                f"{Config.ParamName.ConnectToDatabase.host}={host_var}",
-                f"{Config.ParamName.ConnectToDatabase.user}={user_var}",
-                f"{Config.ParamName.ConnectToDatabase.password}={password_var}",
-                f"{Config.ParamName.ConnectToDatabase.name}={schema_var}",
-            ],
+            values=arguments,
         )
 
 
@@ -261,11 +301,387 @@ def gen_close_database_function(script: PythonScript):
         script.add_line(f"{cnx_param}.{Config.SqlConnector.Methods.connection_close}()")
 
 
-def gen_entries_class(script: PythonScript, tables: SqlTables):
+def gen_retry_functions(script: PythonScript):
+    script.imports.add_import(module="random", object="random")
+    script.imports.add_import(module="time", object="sleep")
+    connection_param = SqlTable.get_connection_param(imports=script.imports)
+    transient_errnos_var = PythonVariable(
+        name=Config.VariableName.Retry.transient_errnos,
+        type=SetPythonType(IntPythonType()),
+        initial_litteral=set(Config.Constant.transient_errnos),
+    )
+    retry_counters_var = PythonVariable(
+        name=Config.VariableName.Retry.retry_counters,
+        type=DictPythonType(StrPythonType(), IntPythonType()),
+        initial_litteral={Config.RetryCounter.retries: 0, Config.RetryCounter.exhausted: 0},
+    )
+    script.globals.add_global(transient_errnos_var)
+    script.globals.add_global(retry_counters_var)
+    error_var = PythonVariable(name=Config.VariableName.Retry.error, type=ClassPythonType("Exception"))
+    with script.gen_function_decl(
+        function_name=Config.FunctionName.is_transient_error,
+        params=[error_var],
+        return_type=BoolPythonType(),
+    ):
+        script.add_line(f'return getattr({error_var}, "errno", None) in {transient_errnos_var}')
+
+    transaction_param = PythonVariable(
+        name=Config.ParamName.Retry.transaction,
+        type=CallablePythonType([connection_param.type], AnyPythonType()),
+    )
+    max_retries_param = PythonVariable(
+        name=Config.ParamName.Retry.max_retries,
+        type=IntPythonType(),
+        initial_litteral=Config.Constant.max_retries,
+    )
+    base_delay_param = PythonVariable(
+        name=Config.ParamName.Retry.base_delay,
+        type=FloatPythonType(),
+        initial_litteral=Config.Constant.retry_base_delay,
+    )
+    max_delay_param = PythonVariable(
+        name=Config.ParamName.Retry.max_delay,
+        type=FloatPythonType(),
+        initial_litteral=Config.Constant.retry_max_delay,
+    )
+    before_retry_param = PythonVariable(
+        name=Config.ParamName.Retry.before_retry,
+        type=OptionalPythonType(CallablePythonType([], NonePythonType())),
+    )
+    attempt_var = PythonVariable(name=Config.VariableName.Retry.attempt)
+    result_var = PythonVariable(name=Config.VariableName.Retry.result)
+    rollback_error_var = PythonVariable(name=Config.VariableName.Retry.rollback_error)
+    with script.gen_function_decl(
+        function_name=Config.FunctionName.run_with_retry,
+        params=[connection_param, transaction_param, max_retries_param, base_delay_param, max_delay_param,
+                before_retry_param],
+        return_type=AnyPythonType(),
+    ):
+        script.add_line(f"{attempt_var} = 0")
+        with script.gen_while("True"):
+            with script.gen_try():
+                script.add_line(f"{result_var} = {transaction_param}({connection_param})")
+                script.add_line(f"{Config.FunctionName.commit_to_database}({connection_param})")
+                script.add_line(f"return {result_var}")
+            with script.gen_except(exception_var=error_var):
+                with script.gen_try():
+                    script.add_line(
+                        f"{connection_param}.{Config.SqlConnector.Methods.connection_rollback}()"
+                    )
+                with script.gen_except(exception_var=rollback_error_var):
+                    script.add_line(f"raise {error_var} from {rollback_error_var}")
+                with script.gen_if(f"not {Config.FunctionName.is_transient_error}({error_var})"):
+                    script.add_line("raise")
+                with script.gen_if(f"{attempt_var} >= {max_retries_param}"):
+                    script.add_line(
+                        f"{retry_counters_var}[{repr(Config.RetryCounter.exhausted)}] += 1"
+                    )
+                    script.add_line("raise")
+            script.add_line(f"{attempt_var} += 1")
+            script.add_line(f"{retry_counters_var}[{repr(Config.RetryCounter.retries)}] += 1")
+            with script.gen_if(f"{before_retry_param} is not None"):
+                script.add_line(f"{before_retry_param}()")
+            script.add_line(
+                f"sleep(random() * min({max_delay_param}, {base_delay_param} * 2 ** {attempt_var}))"
+            )
+
+
+def gen_checksum_functions(script: PythonScript):
+    '''Python counterparts of how MySQL prints doubles and JSON documents, used by the row checksums'''
+    script.imports.add_import(module="decimal", object="Decimal")
+    script.imports.add_import(module="json", object="dumps")
+    script.imports.add_import(module="json", object="loads")
+    script.imports.add_import(module="struct", object="pack")
+    script.imports.add_import(module="struct", object="unpack")
+    names = Config.VariableName.Checksum
+    value_param = PythonVariable(name=Config.ParamName.operation_input, type=FloatPythonType())
+    with script.gen_function_decl(
+        function_name=Config.FunctionName.single_precision, params=[value_param], return_type=FloatPythonType()
+    ):
+        script.add_line(f'return unpack("f", pack("f", {value_param}))[0]')
+
+    with script.gen_function_decl(
+        function_name=Config.FunctionName.mysql_double_text, params=[value_param], return_type=StrPythonType()
+    ):
+        script.add_line(
+            f"{names.sign}, {names.digits}, {names.exponent} = Decimal(repr({value_param})).normalize().as_tuple()"
+        )
+        script.add_line(f'{names.digits} = "".join(map(str, {names.digits}))')
+        script.add_line(f"{names.point} = len({names.digits}) + {names.exponent}")
+        with script.gen_if(f"{names.point} < -14 or ({names.point} > 15 and {names.point} >= len({names.digits}))"):
+            script.add_line(
+                f'{names.text} = {names.digits}[0] + ("." + {names.digits}[1:] if len({names.digits}) > 1 else "") '
+                f'+ f"e{{{names.point} - 1}}"'
+            )
+        with script.gen_elif(f"{names.point} <= 0"):
+            script.add_line(f'{names.text} = "0." + "0" * -{names.point} + {names.digits}')
+        with script.gen_elif(f"{names.point} < len({names.digits})"):
+            script.add_line(
+                f'{names.text} = {names.digits}[:{names.point}] + "." + {names.digits}[{names.point}:]'
+            )
+        with script.gen_else():
+            script.add_line(
+                f'{names.text} = {names.digits} + "0" * ({names.point} - len({names.digits})) + ".0"'
+            )
+        script.add_line(f'return ("-" if {names.sign} else "") + {names.text}')
+
+    json_param = PythonVariable(name=Config.ParamName.operation_input, type=AnyPythonType())
+    with script.gen_function_decl(
+        function_name=Config.FunctionName.mysql_json_text, params=[json_param], return_type=StrPythonType()
+    ):
+        with script.gen_if(f"{json_param} is None"):
+            script.add_line('return "null"')
+        with script.gen_if(f"isinstance({json_param}, bool)"):
+            script.add_line(f'return "true" if {json_param} else "false"')
+        with script.gen_if(f"isinstance({json_param}, int) and -(1 << 63) <= {json_param} < (1 << 64)"):
+            script.add_line(f"return str({json_param})")
+        with script.gen_if(f"isinstance({json_param}, (int, float))"):
+            script.add_line(f"return {Config.FunctionName.mysql_double_text}(float({json_param}))")
+        with script.gen_if(f"isinstance({json_param}, str)"):
+            script.add_line(f"return dumps({json_param}, ensure_ascii=False)")
+        with script.gen_if(f"isinstance({json_param}, list)"):
+            script.add_line(
+                f'return "[" + ", ".join({Config.FunctionName.mysql_json_text}(v) for v in {json_param}) + "]"'
+            )
+        script.add_aligned_line(
+            start='return "{" + ", ".join(',
+            end=') + "}"',
+            separator="",
+            values=[
+                f'f"{{dumps(k, ensure_ascii=False)}}: {{{Config.FunctionName.mysql_json_text}(v)}}"',
+                f"for (k, v) in sorted({json_param}.items(), key=lambda i: (len(i[0].encode()), i[0].encode()))",
+            ],
+        )
+
+
+def gen_bulk_session_functions(script: PythonScript, tables: SqlTables):
+    connection_param = SqlTable.get_connection_param(imports=script.imports)
+    variables = Config.Constant.bulk_session_variables
+    values = Config.Constant.bulk_session_values
+    if any(table.get_auto_increment_column() is not None for table in tables.values()):
+        # reserve_ids needs its locked MAX to hold until the commit
+        values = tuple(
+            Config.Constant.locked_isolation_level if v in Config.Constant.unlocked_isolation_levels else v
+            for v in values
+        )
+    settings_param = PythonVariable(
+        name=Config.ParamName.BulkSession.settings,
+        type=TuplePythonType(list(AnyPythonType() for _ in variables)),
+    )
+    cursor_var = PythonVariable(name=Config.VariableName.AddToDatabase.cursor)
+    new_cursor = f"{cursor_var} = {connection_param}.{Config.SqlConnector.Methods.connection_new_cursor}()"
+    close_cursor = f"{cursor_var}.{Config.SqlConnector.Methods.cursor_close}()"
+    with script.gen_function_decl(
+        function_name=Config.FunctionName.begin_bulk_session,
+        params=[connection_param],
+        return_type=settings_param.type,
+    ):
+        script.add_line(new_cursor)
+        script.add_line(
+            f"{cursor_var}.{Config.SqlConnector.Methods.cursor_execute}("
+            f'"SELECT {", ".join(f"@@SESSION.{v}" for v in variables)}")'
+        )
+        script.add_line(
+            f"({settings_param},) = {cursor_var}.{Config.SqlConnector.Methods.cursor_fetch_all}()"
+        )
+        script.add_line(
+            f"{cursor_var}.{Config.SqlConnector.Methods.cursor_execute}("
+            f'"SET SESSION {", ".join(f"{v} = %s" for v in variables)}", '
+            f"{repr(values)})"
+        )
+        script.add_line(close_cursor)
+        script.add_line(f"return tuple({settings_param})")
+
+    with script.gen_function_decl(
+        function_name=Config.FunctionName.end_bulk_session,
+        params=[connection_param, settings_param],
+        return_type=NonePythonType(),
+    ):
+        script.add_line(new_cursor)
+        script.add_line(
+            f"{cursor_var}.{Config.SqlConnector.Methods.cursor_execute}("
+            f'"SET SESSION {", ".join(f"{v} = %s" for v in variables)}", {settings_param})'
+        )
+        script.add_line(close_cursor)
+
+
+def gen_partition_objects_function(script: PythonScript):
+    objects_param = PythonVariable(
+        name=Config.ParamName.PartitionObjects.objects, type=IterablePythonType(AnyPythonType())
+    )
+    key_param = PythonVariable(
+        name=Config.ParamName.PartitionObjects.key,
+        type=CallablePythonType([AnyPythonType()], AnyPythonType()),
+    )
+    n_partitions_param = PythonVariable(
+        name=Config.ParamName.PartitionObjects.n_partitions, type=IntPythonType()
+    )
+    by_range_param = PythonVariable(
+        name=Config.ParamName.PartitionObjects.by_range,
+        type=BoolPythonType(),
+        initial_litteral=False,
+    )
+    partitions_var = PythonVariable(
+        name=Config.ParamName.AddPartitions.partitions,
+        type=ListPythonType(ListPythonType(AnyPythonType())),
+    )
+    index_var = PythonVariable(name=Config.VariableName.AddToDatabase.index)
+    object_var = PythonVariable(name=Config.VariableName.AddToDatabase.object)
+    with script.gen_function_decl(
+        function_name=Config.FunctionName.partition_objects,
+        params=[objects_param, key_param, n_partitions_param, by_range_param],
+        return_type=partitions_var.type,
+    ):
+        with script.gen_if(by_range_param.name):
+            script.add_line(f"{objects_param} = sorted({objects_param}, key={key_param})")
+            script.add_line(f"size = -(-len({objects_param}) // {n_partitions_param})")
+            script.add_line(
+                f"return [{objects_param}[{index_var} * size:({index_var} + 1) * size] "
+                f"for {index_var} in range({n_partitions_param})]"
+            )
+        script.add_line(
+            f"{partitions_var}: {partitions_var.type.gen_type(imports=script.imports)}"
+            f" = [[] for _ in range({n_partitions_param})]"
+        )
+        with script.gen_for(variables=[object_var], iterable=objects_param.name):
+            script.add_line(
+                f"{partitions_var}[hash({key_param}({object_var})) % {n_partitions_param}]"
+                f".append({object_var})"
+            )
+        script.add_line(f"return {partitions_var}")
+
+
+def gen_add_partitions_to_database_function(script: PythonScript):
+    script.imports.add_import(module="concurrent.futures", object="ThreadPoolExecutor")
+    script.imports.add_import(module="uuid", object="uuid4")
+    connection_type = SqlTable.get_connection_param(imports=script.imports).type
+    add_to_database_param = PythonVariable(
+        name=Config.ParamName.AddPartitions.add_to_database,
+        type=CallablePythonType(None, NonePythonType()),
+    )
+    partitions_param = PythonVariable(
+        name=Config.ParamName.AddPartitions.partitions,
+        type=ListPythonType(ListPythonType(AnyPythonType())),
+    )
+    connections_param = PythonVariable(
+        name=Config.ParamName.AddPartitions.connections, type=ListPythonType(connection_type)
+    )
+    independent_commit_param = PythonVariable(
+        name=Config.ParamName.AddPartitions.independent_commit,
+        type=BoolPythonType(),
+        initial_litteral=False,
+    )
+    xid_var = PythonVariable(name=Config.VariableName.AddPartitions.xid)
+    index_var = PythonVariable(name=Config.VariableName.AddPartitions.index, type=IntPythonType())
+    cursor_var = PythonVariable(name=Config.VariableName.AddToDatabase.cursor)
+    executor_var = PythonVariable(name=Config.VariableName.AddPartitions.executor)
+    errors_var = PythonVariable(name=Config.VariableName.AddPartitions.errors)
+    end_var = PythonVariable(name=Config.VariableName.AddPartitions.end)
+    failures_var = PythonVariable(name=Config.VariableName.AddPartitions.failures)
+    end_errors_var = PythonVariable(name=Config.VariableName.AddPartitions.end_errors)
+    error_var = PythonVariable(name=Config.VariableName.AddPartitions.error)
+    connection_var = PythonVariable(name=Config.ParamName.connection)
+    xid_litteral = f"'{{{xid_var}}}', '{{{index_var}}}'"
+    new_cursor = f"{connection_var}.{Config.SqlConnector.Methods.connection_new_cursor}()"
+    execute = f"{cursor_var}.{Config.SqlConnector.Methods.cursor_execute}"
+    close_cursor = f"{cursor_var}.{Config.SqlConnector.Methods.cursor_close}()"
+
+    with script.gen_function_decl(
+        function_name=Config.FunctionName.add_partitions_to_database,
+        params=[add_to_database_param, partitions_param, connections_param, independent_commit_param],
+        return_type=NonePythonType(),
+    ):
+        script.add_line(f"{xid_var} = uuid4().hex")
+
+        with script.gen_function_decl(
+            function_name=Config.VariableName.AddPartitions.write_partition, params=[index_var]
+        ):
+            script.add_line(f"{connection_var} = {connections_param}[{index_var}]")
+            script.add_line(f"{cursor_var} = {new_cursor}")
+            with script.gen_try():
+                with script.gen_if(f"not {independent_commit_param}"):
+                    script.add_line(f'{execute}(f"XA START {xid_litteral}")')
+                with script.gen_try():
+                    script.add_line(
+                        f"{add_to_database_param}({Config.ParamName.AddToDatabase.objects}="
+                        f"{partitions_param}[{index_var}], {Config.ParamName.connection}={connection_var})"
+                    )
+                with script.gen_finally():
+                    with script.gen_if(f"not {independent_commit_param}"):
+                        script.add_line(f'{execute}(f"XA END {xid_litteral}")')
+                with script.gen_if(independent_commit_param.name):
+                    script.add_line(
+                        f"{connection_var}.{Config.SqlConnector.Methods.connection_commit}()"
+                    )
+                with script.gen_else():
+                    script.add_line(f'{execute}(f"XA PREPARE {xid_litteral}")')
+            with script.gen_except():
+                with script.gen_if(independent_commit_param.name):
+                    script.add_line(
+                        f"{connection_var}.{Config.SqlConnector.Methods.connection_rollback}()"
+                    )
+                script.add_line("raise")
+            with script.gen_finally():
+                script.add_line(close_cursor)
+
+        with script.gen_with(
+            f"ThreadPoolExecutor(max_workers=len({connections_param}))", executor_var
+        ):
+            script.add_line(
+                f"{errors_var} = [future.exception() for future in "
+                f"[{executor_var}.submit({Config.VariableName.AddPartitions.write_partition}, {index_var}) "
+                f"for {index_var} in range(len({connections_param}))]]"
+            )
+        # Every prepared branch has to be ended, even after another one failed to: they outlive the session
+        script.add_line(f"{end_errors_var}: list[tuple[int, Exception]] = []")
+        with script.gen_if(f"not {independent_commit_param}"):
+            script.add_line(
+                f'{end_var} = "COMMIT" if all(e is None for e in {errors_var}) else "ROLLBACK"'
+            )
+            with script.gen_for(
+                variables=[index_var, connection_var],
+                iterable=f"enumerate({connections_param})",
+            ):
+                with script.gen_try():
+                    script.add_line(f"{cursor_var} = {new_cursor}")
+                    with script.gen_try():
+                        script.add_line(f'{execute}(f"XA {{{end_var}}} {xid_litteral}")')
+                    with script.gen_finally():
+                        script.add_line(close_cursor)
+                with script.gen_except(exception_var=error_var):
+                    script.add_line(f"{end_errors_var}.append(({index_var}, {error_var}))")
+        script.add_line(
+            f'{failures_var} = [(f"partition {{i}}", e) for (i, e) in enumerate({errors_var}) if e is not None]'
+        )
+        script.add_line(
+            f'{failures_var} += [(f"XA {{{end_var}}} of partition {{i}}", e) for (i, e) in {end_errors_var}]'
+        )
+        with script.gen_if(f"len({failures_var}) == 1"):
+            script.add_line(f"raise {failures_var}[0][1]")
+        with script.gen_elif(f"len({failures_var}) > 1"):
+            script.add_line(
+                f'raise Exception(f"{{len({failures_var})}} partition steps failed: " + "; ".join('
+                f'f"{{p}}: {{e!r}}" for (p, e) in {failures_var})) from {failures_var}[0][1]'
+            )
+
+
+def gen_entries_class(
+    script: PythonScript, tables: SqlTables, trusted_columns: set[tuple[str, str]] = set()
+):
     with script.gen_class_decl(ClassPythonType(Config.ClassName.entries)):
         caches: dict[str, PythonVariable] = dict()
+        pendings: dict[str, PythonVariable] = dict()
+        stats: dict[str, PythonVariable] = dict()
+        committed: dict[str, PythonVariable] = dict()
+        reserved: dict[str, PythonVariable] = dict()
+        replaced: dict[str, PythonVariable] = dict()
 
-        with script.gen_method_decl(method_name="__init__"):
+        verify_param = PythonVariable(
+            name=Config.ParamName.Verify.verify, type=BoolPythonType(), initial_litteral=False
+        )
+        verify_field = PythonField(name=Config.FieldName.Entries.verify, type=BoolPythonType())
+        with script.gen_method_decl(method_name="__init__", params=[verify_param]):
+            script.add_line(f"{verify_field}: {verify_field.type.gen_type(imports=script.imports)} = {verify_param}")
             for table in tables.values():
                 table_cache = PythonField(
                     name=Config.FieldName.Entries.cache(table_name=table.name),
@@ -274,53 +690,296 @@ def gen_entries_class(script: PythonScript, tables: SqlTables):
                 )
                 table_cache.gen_declarartion(script=script)
                 caches[table.name] = table_cache
+                table_pending = PythonField(
+                    name=Config.FieldName.Entries.pending(table_name=table.name),
+                    type=ListPythonType(table.class_type),
+                    initial_litteral=[],
+                )
+                table_pending.gen_declarartion(script=script)
+                pendings[table.name] = table_pending
+                table_stats = PythonField(
+                    name=Config.FieldName.Entries.stats(table_name=table.name),
+                    type=ListPythonType(IntPythonType()),
+                    initial_litteral=[0, 0],
+                )
+                table_stats.gen_declarartion(script=script)
+                stats[table.name] = table_stats
+                if table.primary_constraint is not None:
+                    table_committed = PythonField(
+                        name=Config.FieldName.Entries.committed(table_name=table.name),
+                        type=SetPythonType(TuplePythonType(list(
+                            table.columns[c_name].data_type.key_python_type()
+                            for c_name in table.get_primary_column_names()
+                        ))),
+                        initial_litteral=set(),
+                    )
+                    table_committed.gen_declarartion(script=script)
+                    committed[table.name] = table_committed
+                if table.get_auto_increment_column() is not None:
+                    table_reserved = PythonField(
+                        name=Config.FieldName.Entries.reserved(table_name=table.name),
+                        type=ListPythonType(table.class_type),
+                        initial_litteral=[],
+                    )
+                    table_reserved.gen_declarartion(script=script)
+                    reserved[table.name] = table_reserved
+                if len(table.get_identifying_columns()) > 0:
+                    table_replaced = PythonField(
+                        name=Config.FieldName.Entries.replaced(table_name=table.name),
+                        type=ListPythonType(IntPythonType()),
+                        initial_litteral=[0, 0],
+                    )
+                    table_replaced.gen_declarartion(script=script)
+                    replaced[table.name] = table_replaced
 
         cnx_param = SqlTable.get_connection_param(imports=script.imports)
+        object_var = PythonVariable(name=Config.VariableName.AddToDatabase.object)
+        for (method_name, objects) in (
+            (Config.MethodName.Entries.add_all_to_database, caches),
+            (Config.MethodName.Entries.add_pending_to_database, pendings),
+        ):
+            upsert_param = SqlTable.get_upsert_param()
+            sort_by_key_param = SqlTable.get_sort_by_key_param()
+            with script.gen_method_decl(method_name=method_name, params=[cnx_param, upsert_param, sort_by_key_param]):
+                for (t_name, table_reserved) in reserved.items():
+                    c_name = cast(SqlColumn, tables[t_name].get_auto_increment_column()).name
+                    script.add_line(
+                        f"{table_reserved} = [{object_var} for {object_var} in {objects[t_name]} "
+                        f"if {object_var}.{c_name} is None]"
+                    )
+                deferred_t_names: list[str] = list()
+                for t_name in tables.get_insertion_graph().sink_to_source_exploration():
+                    table = tables[t_name]
+                    extra_args = ""
+                    if len(table.get_deferred_columns()) > 0:
+                        deferred_t_names.append(t_name)
+                        extra_args = f", {Config.ParamName.AddToDatabase.update_references}=False"
+                    if t_name in replaced and objects is pendings:
+                        extra_args += (f", {Config.ParamName.AddToDatabase.replaced}="
+                                       f"{replaced[t_name]} if {verify_field} else None")
+                    script.add_line(
+                        f"{table.class_type.gen_type(imports=script.imports)}."
+                        f"{Config.MethodName.Table.add_to_database}"
+                        f"({Config.ParamName.AddToDatabase.objects}={objects[t_name]}, "
+                        f"{cnx_param}={cnx_param}, {upsert_param}={upsert_param}, "
+                        f"{sort_by_key_param}={sort_by_key_param}{extra_args})"
+                    )
+                for t_name in deferred_t_names:
+                    script.add_line(
+                        f"{tables[t_name].class_type.gen_type(imports=script.imports)}."
+                        f"{Config.MethodName.Table.update_references}"
+                        f"({Config.ParamName.AddToDatabase.objects}={objects[t_name]}, "
+                        f"{cnx_param}={cnx_param})"
+                    )
+
+        # Ids reserved by a rolled back transaction are no longer locked, another writer may take them
+        with script.gen_method_decl(method_name=Config.MethodName.Entries.release_ids):
+            for (t_name, table_reserved) in reserved.items():
+                c_name = cast(SqlColumn, tables[t_name].get_auto_increment_column()).name
+                with script.gen_for(variables=[object_var], iterable=table_reserved.name):
+                    script.add_line(f"{object_var}.{c_name} = None")
+            if len(reserved) == 0:
+                script.add_line("pass")
+
+        # Rows replaced by an upsert were already counted in the baseline
+        with script.gen_method_decl(method_name=Config.MethodName.Entries.clear_pending):
+            for table in tables.values():
+                if table.name in replaced:
+                    script.add_line(
+                        f"{stats[table.name]}[0] += len({pendings[table.name]}) - {replaced[table.name]}[0]"
+                    )
+                    script.add_line(f"{stats[table.name]}[1] ^= {replaced[table.name]}[1]")
+                    script.add_line(f"{replaced[table.name]}[:] = [0, 0]")
+                else:
+                    script.add_line(f"{stats[table.name]}[0] += len({pendings[table.name]})")
+                with script.gen_if(verify_field.name):
+                    with script.gen_for(variables=[object_var], iterable=pendings[table.name].name):
+                        script.add_line(
+                            f"{stats[table.name]}[1] ^= {table.class_type.gen_type(imports=script.imports)}."
+                            f"{Config.MethodName.Table.row_checksum}({object_var})"
+                        )
+                script.add_line(f"{pendings[table.name]}.clear()")
+
+        with script.gen_method_decl(
+            method_name=Config.MethodName.Entries.savepoint, return_type=ListPythonType(IntPythonType())
+        ):
+            script.add_aligned_line(
+                start="return [",
+                end="]",
+                separator=",",
+                values=(f"len({pendings[table.name]})" for table in tables.values()),
+            )
+
+        savepoint_param = PythonVariable(
+            name=Config.ParamName.Savepoint.savepoint, type=ListPythonType(IntPythonType())
+        )
+        with script.gen_method_decl(
+            method_name=Config.MethodName.Entries.rollback_pending, params=[savepoint_param]
+        ):
+            for (i, table) in enumerate(tables.values()):
+                with script.gen_for(
+                    variables=[object_var], iterable=f"{pendings[table.name]}[{savepoint_param}[{i}]:]"
+                ):
+                    script.add_line(f"del {caches[table.name]}[{object_var}]")
+                script.add_line(f"del {pendings[table.name]}[{savepoint_param}[{i}]:]")
+
+        def gen_key(table: SqlTable) -> str:
+            return "(" + ", ".join(
+                table.columns[c_name].gen_get_sql_value(f"{object_var}.{c_name}")
+                for c_name in table.get_primary_column_names()
+            ) + ",)"
+
+        keys_type = DictPythonType(StrPythonType(), ListPythonType(TuplePythonType([AnyPythonType()])))
+        keys_param = PythonVariable(name=Config.ParamName.Checkpoint.keys, type=keys_type)
+        table_names_param = PythonVariable(
+            name=Config.ParamName.Checkpoint.table_names, type=IterablePythonType(StrPythonType())
+        )
+        with script.gen_method_decl(
+            method_name=Config.MethodName.Entries.pending_keys, params=[table_names_param], return_type=keys_type
+        ):
+            script.add_line(f"{keys_param}: {keys_type.gen_type(script.imports)} = {{}}")
+            for t_name in committed:
+                with script.gen_if(f"{repr(t_name)} in {table_names_param}"):
+                    script.add_line(
+                        f"{keys_param}[{repr(t_name)}] = "
+                        f"[{gen_key(tables[t_name])} for {object_var} in {pendings[t_name]}]"
+                    )
+            script.add_line(f"return {keys_param}")
+
+        with script.gen_method_decl(method_name=Config.MethodName.Entries.add_committed_keys, params=[keys_param]):
+            if len(committed) == 0:
+                script.add_line("pass")
+            for (t_name, table_committed) in committed.items():
+                script.add_line(f"{table_committed}.update({keys_param}.get({repr(t_name)}, []))")
+
+        with script.gen_method_decl(method_name=Config.MethodName.Entries.drop_committed):
+            if len(committed) == 0:
+                script.add_line("pass")
+            for (t_name, table_committed) in committed.items():
+                with script.gen_if(f"len({table_committed}) > 0"):
+                    script.add_line(
+                        f"{pendings[t_name]}[:] = [{object_var} for {object_var} in {pendings[t_name]} "
+                        f"if {gen_key(tables[t_name])} not in {table_committed}]"
+                    )
+
+        stats_type = DictPythonType(StrPythonType(), ListPythonType(IntPythonType()))
+        with script.gen_method_decl(method_name=Config.MethodName.Entries.stats, return_type=stats_type):
+            script.add_aligned_line(
+                start="return {",
+                end="}",
+                separator=",",
+                values=(f"{repr(table.name)}: list({stats[table.name]})" for table in tables.values()),
+            )
+
+        stats_param = PythonVariable(name=Config.ParamName.Checkpoint.stats, type=stats_type)
+        with script.gen_method_decl(method_name=Config.MethodName.Entries.restore_stats, params=[stats_param]):
+            for table in tables.values():
+                script.add_line(f"{stats[table.name]}[:] = {stats_param}[{repr(table.name)}]")
+
+        checksums_type = DictPythonType(StrPythonType(), TuplePythonType([IntPythonType(), IntPythonType()]))
+        with script.gen_method_decl(
+            method_name=Config.MethodName.Entries.table_checksums,
+            params=[cnx_param],
+            return_type=checksums_type,
+        ):
+            script.add_aligned_line(
+                start="return {",
+                end="}",
+                separator=",",
+                values=(
+                    f"{repr(table.name)}: {table.class_type.gen_type(imports=script.imports)}."
+                    f"{Config.MethodName.Table.table_checksum}({cnx_param}={cnx_param})"
+                    for table in tables.values()
+                ),
+            )
+
+        baseline_param = PythonVariable(name=Config.ParamName.Verify.baseline, type=checksums_type)
         with script.gen_method_decl(
-            method_name=Config.MethodName.Entries.add_all_to_database, params=[cnx_param]
+            method_name=Config.MethodName.Entries.verify_database, params=[cnx_param, baseline_param]
         ):
+            count_var = PythonVariable(name=Config.VariableName.Verify.count)
+            checksum_var = PythonVariable(name=Config.VariableName.Verify.checksum)
+            failed_var = PythonVariable(name=Config.VariableName.Verify.failed)
+            script.add_line(f"{failed_var}: list[str] = []")
+            for table in tables.values():
+                script.add_line(
+                    f"{count_var}, {checksum_var} = {table.class_type.gen_type(imports=script.imports)}."
+                    f"{Config.MethodName.Table.table_checksum}({cnx_param}={cnx_param})"
+                )
+                with script.gen_if(
+                    f"[{count_var} - {baseline_param}[{repr(table.name)}][0], "
+                    f"{checksum_var} ^ {baseline_param}[{repr(table.name)}][1]] != {stats[table.name]}"
+                ):
+                    script.add_line(f"{failed_var}.append({repr(table.name)})")
+            with script.gen_if(f"len({failed_var}) > 0"):
+                script.add_line(
+                    'raise Exception(f"Written rows do not match the database for tables: '
+                    f'{{\', \'.join({failed_var})}}")'
+                )
 
-            for t_name in tables.get_graph().sink_to_source_exploration():
-                table = tables[t_name]
+        # Checks the pending rows, once written and before they are committed
+        with script.gen_method_decl(
+            method_name=Config.MethodName.Entries.verify_references, params=[cnx_param]
+        ):
+            missing_var = PythonVariable(name=Config.VariableName.Verify.missing)
+            failed_var = PythonVariable(name=Config.VariableName.Verify.failed)
+            script.add_line(f"{failed_var}: list[str] = []")
+            for table in tables.values():
+                if len(table.foreign_constraints) == 0:
+                    continue
+                script.add_line(
+                    f"{missing_var} = {table.class_type.gen_type(imports=script.imports)}."
+                    f"{Config.MethodName.Table.count_missing_references}("
+                    f"{Config.ParamName.AddToDatabase.objects}={pendings[table.name]}, {cnx_param}={cnx_param})"
+                )
+                script.add_line(
+                    f"{failed_var}.extend(f\"{table.name}.{{c_name}}: {{n}}\" "
+                    f"for (c_name, n) in {missing_var}.items() if n > 0)"
+                )
+            with script.gen_if(f"len({failed_var}) > 0"):
                 script.add_line(
-                    f"{table.class_type.gen_type(imports=script.imports)}."
-                    f"{Config.MethodName.Table.add_to_database}"
-                    f"({Config.ParamName.AddToDatabase.objects}={caches[t_name]}, "
-                    f"{cnx_param}={cnx_param})"
+                    'raise Exception(f"Rows reference missing parents: '
+                    f'{{\', \'.join({failed_var})}}")'
                 )
 
         for table in tables.values():
             maker_params = list(table.field_variables())
-            enum_params_type: list[tuple[PythonVariable, PythonType, bool]] = list()
-            for v in maker_params:
+            checks: list[tuple[PythonVariable, str, str]] = list()
+            for v, column in zip(maker_params, table.get_sorted_columns()):
+                is_trusted = (table.name, column.name) in trusted_columns
                 if v.type.is_enum():
-                    enum_params_type.append((v, v.type, v.type.is_optional()))
+                    enum_type = v.type
                     v.type = v.type.enum_raw_type()
-            with script.gen_method_decl(
-                method_name=Config.MethodName.Entries.entry_maker(table.name), params=maker_params
-            ):
-                for (v, enum_type, is_optional) in enum_params_type:
-                    script.add_aligned_line(
-                        separator="and ",
-                        values=list(
-                            f"{v} != {enum_type.gen_litteral(value)}"
-                            for value in enum_type.enum_values()
-                        )
-                        + ([f"{v} is not None"] if is_optional else []),
-                        start="if ",
-                        end=":",
-                        newline_after_separator=False,
-                        escape_after_newline=True,
+                    if is_trusted:
+                        continue
+                    values_var = PythonVariable(
+                        name=Config.VariableName.Validation.enum_values(table.name, column.name),
+                        type=FrozenSetPythonType(v.type),
+                        initial_litteral=list(enum_type.enum_values())
+                        + ([None] if enum_type.is_optional() else []),
                     )
-                    script.add_indent()
-                    invalid_param_insert = "{" + v.name + "}"
+                    script.globals.add_global(values_var)
                     param_values = ", ".join(
-                        enum_type.gen_litteral(v) for v in enum_type.enum_values()
+                        enum_type.gen_litteral(value) for value in enum_type.enum_values()
                     )
-                    script.add_line(
-                        f'raise Exception(f"Value of {v}: {invalid_param_insert} is not in [{param_values}]")'
+                    checks.append((v, f"{v} not in {values_var}", f"is not in [{param_values}]"))
+                elif isinstance(column.data_type, SqlStringType) and column.data_type.char_limit > 0:
+                    if is_trusted:
+                        continue
+                    checks.append(
+                        (
+                            v,
+                            (f"{v} is not None and " if v.type.is_optional() else "")
+                            + f"len({v}) > {column.data_type.char_limit}",
+                            f"is longer than {column.data_type.char_limit} characters",
+                        )
                     )
-                    script.remove_indent()
+            with script.gen_method_decl(
+                method_name=Config.MethodName.Entries.entry_maker(table.name), params=maker_params
+            ):
+                for (v, condition, message) in checks:
+                    with script.gen_if(condition):
+                        script.add_line(f'raise Exception(f"Value of {v}: {{{v}}} {message}")')
                 ct_var = PythonVariable(name=table.name, type=table.class_type)
                 script.add_aligned_line(
                     separator=", ",
@@ -330,19 +989,34 @@ def gen_entries_class(script: PythonScript, tables: SqlTables):
                 )
                 with script.gen_if(f"{ct_var} not in {caches[table.name]}"):
                     script.add_line(f"{caches[table.name]}[{ct_var}] = {ct_var}")
+                    script.add_line(f"{pendings[table.name]}.append({ct_var})")
                 script.add_line(f"return {caches[table.name]}[{ct_var}]")
 
 
-def generate_objects_code(script: PythonScript, tables: SqlTables, database: Database):
+def generate_objects_code(
+    script: PythonScript,
+    tables: SqlTables,
+    database: Database,
+    trusted_columns: set[tuple[str, str]] = set(),
+):
+    '''trusted_columns are (table, column) pairs whose values are already known to be valid'''
+    gen_create_connection_pool_function(script=script, database=database)
     gen_connect_to_database_function(script=script, database=database)
     gen_commit_to_database_function(script=script)
     gen_close_database_function(script=script)
+    gen_retry_functions(script=script)
+    gen_checksum_functions(script=script)
+    gen_bulk_session_functions(script=script, tables=tables)
+    gen_partition_objects_function(script=script)
+    gen_add_partitions_to_database_function(script=script)
 
-    gen_entries_class(script=script, tables=tables)
+    gen_entries_class(script=script, tables=tables, trusted_columns=trusted_columns)
 
     SqlTable.gen_parent_method(script=script)
     for table in tables.values():
         table.generate(script=script)
+    for table in tables.values():
+        table.gen_export(script=script)
     return script
 
 
@@ -350,10 +1024,11 @@ def generate_entries_commit(script: PythonScript, entries_var: PythonVariable):
     script.add_line(f"{Config.ParamName.connection} = {Config.FunctionName.connect_to_database}()")
     with script.gen_try():
         script.add_line(
-            f"{entries_var}.{Config.MethodName.Entries.add_all_to_database}"
-            f"({Config.ParamName.connection}={Config.ParamName.connection})"
+            f"{Config.FunctionName.run_with_retry}({Config.ParamName.connection}, "
+            f"lambda {Config.ParamName.connection}: {entries_var}.{Config.MethodName.Entries.add_all_to_database}"
+            f"({Config.ParamName.connection}={Config.ParamName.connection}), "
+            f"{Config.ParamName.Retry.before_retry}={entries_var}.{Config.MethodName.Entries.release_ids})"
         )
-        script.add_line(f"{Config.FunctionName.commit_to_database}({Config.ParamName.connection})")
     exception_var = PythonVariable(name="e")
     with script.gen_except(exception_var=exception_var):
         script.add_line(f"raise {exception_var}")
@@ -1,6 +1,7 @@
 from typing import Optional
-from uuid import uuid4
-from random import choice
+from uuid import UUID, uuid4
+from random import choice, getrandbits
+from time import time_ns
 
 
 def parse_int(s: str):
@@ -55,6 +56,17 @@ def constant_str(value: str):
 def uuid4_generator(_: None):
     return str(uuid4())
 
+uuid7_state = [0, 0]
+
+def uuid7_generator(_: None):
+    timestamp = max(time_ns() // 1000000, uuid7_state[0])
+    counter = uuid7_state[1] + 1 if timestamp == uuid7_state[0] else 0
+    if counter > 0xFFF:
+        timestamp += 1
+        counter = 0
+    uuid7_state[0], uuid7_state[1] = timestamp, counter
+    return str(UUID(int=(timestamp << 80) | (0x7 << 76) | (counter << 64) | (0x2 << 62) | getrandbits(62)))
+
 def hex_color_generator(_: None):
     return "#" + "".join(choice("0123456789abcdef") for _ in range(6))
 
@@ -1,14 +1,33 @@
+from functools import lru_cache
 from typing import Callable, Iterable, Optional
 from python_script import *
 from util.util import pairs
 
 
+@lru_cache(maxsize=Config.Constant.compiled_operations_cache_size)
+def compile_operation(impl: Callable[[PythonScript, PythonVariable], None], 
+                      arg_litterals: tuple[tuple[str, str], ...]) -> Callable[[object], object]:
+    '''Operation function with its arguments bound, compiled once per operation and argument values'''
+    script = PythonScript()
+    param = PythonVariable(name="i")
+    with script.gen_function_decl(function_name="f", params=[param]):
+        for (a_name, litteral) in arg_litterals:
+            script.add_line(f"{a_name} = {litteral}")
+        impl(script, param)
+    namespace: dict[str, object] = dict()
+    exec(script.get_script(), namespace)
+    return cast(Callable[[object], object], namespace["f"])
+
+
 
 class Operation:
     def __init__(self, name: str,impl: Callable[[PythonScript, PythonVariable], None], 
                     input_type: PythonType, output_type: PythonType, primary: bool = False, 
                     args: list[PythonVariable] = [], 
-                    dynamic_output_type_cb: Optional[Callable[[list[object]], PythonType]] = None):
+                    dynamic_output_type_cb: Optional[Callable[[list[object]], PythonType]] = None, 
+                    inline: Optional[Callable[[str, list[str]], str]] = None):
+        '''inline makes the expression of the operation from the input expression and the argument litterals, 
+        for operations simple enough to be written in place of a call (the input must only be used once)'''
         self.name = name
         self.impl = impl
         self.__input_type = input_type
@@ -16,6 +35,7 @@ class Operation:
         self.primary = primary
         self.args = args
         self.dynamic_output_type_cb = dynamic_output_type_cb
+        self.inline = inline
 
     def get_input_type(self):
         return self.__input_type
@@ -38,9 +58,11 @@ class Operation:
 
 class OperationInstance(Operation):
     def __init__(self, op: Operation, arg_values: list[object], dynamic_output_type: Optional[PythonType] = None) -> None:
-        super().__init__(op.name, op.impl, op.get_input_type(), op.get_output_type(), primary=op.primary, args=op.args)
+        super().__init__(op.name, op.impl, op.get_input_type(), op.get_output_type(), primary=op.primary, args=op.args, 
+                         inline=op.inline)
         self.arg_values = arg_values
         self.dynamic_output_type = dynamic_output_type
+        self.compiled: Optional[Callable[[object], object]] = None
 
     def __str__(self) -> str:
         return self.name + (f"({', '.join(a.type.gen_litteral(v) for (v, a) in zip(self.arg_values, self.args))})" if len(self.arg_values) > 0 else "")
@@ -51,14 +73,10 @@ class OperationInstance(Operation):
     def execute(self, input: object):
         if not self.get_input_type().is_valid_litteral(input):
             raise Exception(f"Cannot exec {self.name} with argument {input}")
-        script = PythonScript()
-        param = PythonVariable(name="i", type=self.get_input_type())
-        with script.gen_function_decl(function_name="f", params=[param]):
-            for (a, v) in zip(self.args, self.arg_values):
-                script.add_line(f"{a} = {a.type.gen_litteral(v)}")
-            self.impl(script, param)
-        exec(script.get_script())
-        return cast(object, eval(f"f({param.type.gen_litteral(input)})"))
+        if self.compiled is None:
+            self.compiled = compile_operation(self.impl, 
+                        tuple((a.name, a.type.gen_litteral(v)) for (a, v) in zip(self.args, self.arg_values)))
+        return self.compiled(input)
 
     def gen_operation_definition(self, script: PythonScript):
         with script.gen_function_decl(function_name=self.name, params=self.args):
@@ -70,9 +88,13 @@ class OperationInstance(Operation):
                 self.impl(script, input_var)
             script.add_line(f"return {Config.FunctionName.inner_operation}")
 
-    def gen_operation(self, gen_input: str):
-        op_args = f"({', '.join(a.type.gen_litteral(v) for (v, a) in zip(self.arg_values, self.args))})"
-        return f"{self.name}{op_args}({gen_input})"
+    def gen_operation_factory(self):
+        return f"{self.name}({', '.join(a.type.gen_litteral(v) for (v, a) in zip(self.arg_values, self.args))})"
+
+    def gen_inline_operation(self, gen_input: str) -> Optional[str]:
+        if self.inline is None:
+            return None
+        return self.inline(gen_input, list(a.type.gen_litteral(v) for (v, a) in zip(self.arg_values, self.args)))
 
 class OperationChain(list[OperationInstance]):
     def __init__(self, operations: Iterable[OperationInstance]) -> None:
@@ -135,10 +157,19 @@ class OperationChain(list[OperationInstance]):
             op.dynamic_output_type = self.get_next_dynamic_type(op)
         super().append(op)
 
-    def gen_operations(self, imports: PythonImports, gen_input: str):
-        for op in self:
-            gen_input = op.gen_operation(gen_input)
-        return gen_input
+    def gen_fused_function(self, script: PythonScript, function_name: str):
+        '''One function applying the whole chain, operations that are not inlined are made once at import'''
+        input_var = PythonVariable(name=Config.ParamName.operation_input, type=self.first_type())
+        gen_input = input_var.name
+        for (i, op) in enumerate(self):
+            inlined = op.gen_inline_operation(gen_input)
+            if inlined is None:
+                bound_operation = Config.VariableName.bound_operation(function_name, i)
+                script.add_line(f"{bound_operation} = {op.gen_operation_factory()}")
+                inlined = f"{bound_operation}({gen_input})"
+            gen_input = inlined
+        with script.gen_function_decl(function_name=function_name, params=[input_var]):
+            script.add_line(f"return {gen_input}")
 
 
 ############# Implementation of operations #############
@@ -194,6 +225,22 @@ def uuid4_generator_impl(script: PythonScript, input: PythonVariable):
     script.imports.add_import(module="uuid", object="uuid4")
     script.add_line("return str(uuid4())")
 
+UUID7_GENERATOR_STATE = PythonVariable(name="uuid7_state", type=ListPythonType(IntPythonType()), initial_litteral=[0, 0])
+def uuid7_generator_impl(script: PythonScript, input: PythonVariable):
+    script.imports.add_import(module="uuid", object="UUID")
+    script.imports.add_import(module="time", object="time_ns")
+    script.imports.add_import(module="random", object="getrandbits")
+    script.globals.add_global(UUID7_GENERATOR_STATE)
+    timestamp_var = PythonVariable("timestamp")
+    counter_var = PythonVariable("counter")
+    script.add_line(f"{timestamp_var} = max(time_ns() // 1000000, {UUID7_GENERATOR_STATE}[0])")
+    script.add_line(f"{counter_var} = {UUID7_GENERATOR_STATE}[1] + 1 if {timestamp_var} == {UUID7_GENERATOR_STATE}[0] else 0")
+    with script.gen_if(f"{counter_var} > 0xFFF"):
+        script.add_line(f"{timestamp_var} += 1")
+        script.add_line(f"{counter_var} = 0")
+    script.add_line(f"{UUID7_GENERATOR_STATE}[0], {UUID7_GENERATOR_STATE}[1] = {timestamp_var}, {counter_var}")
+    script.add_line(f"return str(UUID(int=({timestamp_var} << 80) | (0x7 << 76) | ({counter_var} << 64) | (0x2 << 62) | getrandbits(62)))")
+
 def hex_color_generator_impl(script: PythonScript, input: PythonVariable):
     script.imports.add_import(module="random", object="choice")
     script.add_line('return "#" + "".join(choice("0123456789abcdef") for _ in range(6))')
@@ -229,19 +276,20 @@ def enum_converter_impl(script: PythonScript, input: PythonVariable):
 # continue transitioning to new implementation (was doing thing with global variables)
 # then stop returning new script on new scope
 
-UPPER_STR_OP = Operation("upper_str", upper_str_impl, input_type=StrPythonType(), output_type=StrPythonType())
-LOWER_STR_OP = Operation("lower_str", lower_str_impl, input_type=StrPythonType(), output_type=StrPythonType())
+UPPER_STR_OP = Operation("upper_str", upper_str_impl, input_type=StrPythonType(), output_type=StrPythonType(), inline=lambda i, a: f"{i}.upper()")
+LOWER_STR_OP = Operation("lower_str", lower_str_impl, input_type=StrPythonType(), output_type=StrPythonType(), inline=lambda i, a: f"{i}.lower()")
 REMOVE_SPACE_STR_OP = Operation("remove_space", remove_space_impl, input_type=StrPythonType(), output_type=StrPythonType())
 NULLIFY_STR_OP = Operation("nullify_str", nullify_str_impl, input_type=StrPythonType(), output_type=OptionalPythonType(StrPythonType()))
-CONSTANT_STR_OP = Operation("constant_str", constant_str_impl, input_type=NonePythonType(), output_type=StrPythonType(), args=[CONSTANT_STR_VALUE], dynamic_output_type_cb=lambda l: EnumPythonType(StrPythonType(), l))
+CONSTANT_STR_OP = Operation("constant_str", constant_str_impl, input_type=NonePythonType(), output_type=StrPythonType(), args=[CONSTANT_STR_VALUE], dynamic_output_type_cb=lambda l: EnumPythonType(StrPythonType(), l), inline=lambda i, a: a[0])
 TO_ASCII_OP = Operation("to_ascii", to_ascii_impl, input_type=StrPythonType(), output_type=StrPythonType())
-STRINGIFY_FLOAT_OP = Operation("stringify_float", stringify_float_impl, input_type=FloatPythonType(), output_type=StrPythonType())
-PARSE_FLOAT_OP = Operation("parse_float", parse_float_impl, input_type=StrPythonType(), output_type=FloatPythonType())
+STRINGIFY_FLOAT_OP = Operation("stringify_float", stringify_float_impl, input_type=FloatPythonType(), output_type=StrPythonType(), inline=lambda i, a: f"str({i})")
+PARSE_FLOAT_OP = Operation("parse_float", parse_float_impl, input_type=StrPythonType(), output_type=FloatPythonType(), inline=lambda i, a: f"float({i})")
 PARSE_OPT_FLOAT_OP = Operation("parse_opt_float", parse_opt_float_impl, input_type=OptionalPythonType(StrPythonType()), output_type=OptionalPythonType(FloatPythonType()))
-STRINGIFY_INT_OP = Operation("stringify_int", stringify_int_impl, input_type=IntPythonType(), output_type=StrPythonType())
-PARSE_INT_OP = Operation("parse_int", parse_int_impl, input_type=StrPythonType(), output_type=IntPythonType())
+STRINGIFY_INT_OP = Operation("stringify_int", stringify_int_impl, input_type=IntPythonType(), output_type=StrPythonType(), inline=lambda i, a: f"str({i})")
+PARSE_INT_OP = Operation("parse_int", parse_int_impl, input_type=StrPythonType(), output_type=IntPythonType(), inline=lambda i, a: f"int({i})")
 PARSE_OPT_INT_OP = Operation("parse_opt_int", parse_opt_int_impl, input_type=OptionalPythonType(StrPythonType()), output_type=OptionalPythonType(IntPythonType()))
 UUID4_GENERATOR = Operation("uuid4_generator", uuid4_generator_impl, input_type=NonePythonType(), output_type=StrPythonType(), primary=True)
+UUID7_GENERATOR = Operation("uuid7_generator", uuid7_generator_impl, input_type=NonePythonType(), output_type=StrPythonType(), primary=True)
 HEX_COLOR_GENERATOR = Operation("hex_color_generator", hex_color_generator_impl, input_type=NonePythonType(), output_type=StrPythonType())
 ENUM_CONVERTER_OP = Operation("enum_converter", enum_converter_impl, input_type=BaseEnumPythonType(StrPythonType()), output_type=BaseEnumPythonType(StrPythonType()), args=[ENUM_CONVERTER_ENUM_ASSO], dynamic_output_type_cb=lambda l: EnumPythonType(StrPythonType(), list(cast(dict[str, str], l[0]).values())))
 
@@ -261,6 +309,7 @@ BASE_OPERATIONS = {
         PARSE_INT_OP, 
         PARSE_OPT_INT_OP,
         UUID4_GENERATOR,
+        UUID7_GENERATOR,
         HEX_COLOR_GENERATOR,
         ENUM_CONVERTER_OP,
     )
@@ -140,6 +140,10 @@ class PythonScript:
         self.add_line(f"except {exception_typename}{f' as {exception_var}' if exception_var is not None else ''}:")
         return PythonScope(self)
 
+    def gen_finally(self):
+        self.add_line(f"finally:")
+        return PythonScope(self)
+
     def gen_with(self, expression: str, variable: PythonVariable):
         self.add_line(f"with {expression} as {variable}:")
         return PythonScope(self)
@@ -149,6 +153,10 @@ class PythonScript:
         self.add_line(f"for {vars} in {iterable}:")
         return PythonScope(self)
 
+    def gen_while(self, condition: str):
+        self.add_line(f"while {condition}:")
+        return PythonScope(self)
+
 def make_on_close_empty_lines(n_empty_lines: int):
     def inner(script: PythonScript):
         script.empty_lines(n_empty_lines=n_empty_lines)
@@ -446,6 +454,27 @@ class IntPythonType(PythonType):
         return int(s)
 
 
+class BoolPythonType(PythonType):
+    def __init__(self) -> None:
+        super().__init__()
+
+    def gen_type(self, imports: Optional[PythonImports] = None) -> str:
+        return "bool"
+
+    def gen_litteral(self, value: object, imports: Optional[PythonImports] = None) -> str:
+        if not isinstance(value, bool):
+            self.litteral_conversion_error(value)
+        return super().gen_litteral(value, imports)
+
+    def default_literal(self) -> bool:
+        return False
+
+    def litteral_from_str(self, s: str) -> bool:
+        if s not in ("True", "False"):
+            raise Exception(f"Cannot parse {s} to bool")
+        return s == "True"
+
+
 class FloatPythonType(PythonType):
     def __init__(self) -> None:
         super().__init__()
@@ -641,6 +670,28 @@ class AnyPythonType(PythonType):
     def is_super_type(self, o: PythonType) -> bool:
         return True
 
+class CallablePythonType(PythonType):
+    def __init__(self, param_types: Optional[list[PythonType]] = None,
+                return_type: Optional[PythonType] = None) -> None:
+        super().__init__()
+        self.__param_types = param_types
+        self.__return_type = return_type if return_type is not None else AnyPythonType()
+
+    def gen_type(self, imports: Optional[PythonImports] = None) -> str:
+        if imports is not None:
+            imports.add_import(module="typing", object="Callable")
+        params = "..." if self.__param_types is None else \
+                    f"[{', '.join(t.gen_type(imports=imports) for t in self.__param_types)}]"
+        return f"Callable[{params}, {self.__return_type.gen_type(imports=imports)}]"
+
+    def __eq__(self, o: object) -> bool:
+        return isinstance(o, type(self)) and self.__param_types == o.__param_types \
+            and self.__return_type == o.__return_type
+
+    def __hash__(self) -> int:
+        return super().__hash__() + hash(self.__return_type)
+
+
 class IterablePythonType(PythonType):
     def __init__(self, inner_type: PythonType) -> None:
         super().__init__()
@@ -672,10 +723,10 @@ class ListPythonType(IterablePythonType):
         return f"list[{self.get_raw_type().gen_type(imports=imports)}]"
 
     def gen_litteral(self, value: object, imports: Optional[PythonImports] = None) -> str:
-        value = cast(Iterable[object], object)
+        value = cast(Iterable[object], value)
         if not isinstance(value, Iterable):
             self.litteral_conversion_error(value, expected_type="Iterable")
-        return repr(list(self.get_raw_type().gen_litteral(v, imports) for v in value))
+        return "[" + ", ".join(self.get_raw_type().gen_litteral(v, imports) for v in value) + "]"
 
     def default_literal(self) -> list[object]:
         return []
@@ -684,6 +735,74 @@ class ListPythonType(IterablePythonType):
         raise NotImplementedError()
 
 
+class SetPythonType(IterablePythonType):
+    def __init__(self, inner_type: PythonType) -> None:
+        super().__init__(inner_type=inner_type)
+
+    def gen_type(self, imports: Optional[PythonImports] = None) -> str:
+        return f"set[{self.get_raw_type().gen_type(imports=imports)}]"
+
+    def gen_litteral(self, value: object, imports: Optional[PythonImports] = None) -> str:
+        value = cast(Iterable[object], value)
+        if not isinstance(value, Iterable):
+            self.litteral_conversion_error(value, expected_type="Iterable")
+        values = list(value)
+        if len(values) == 0:
+            return "set()"
+        return "{" + ", ".join(self.get_raw_type().gen_litteral(v, imports) for v in values) + "}"
+
+    def default_literal(self) -> set[object]:
+        return set()
+
+    def litteral_from_str(self, s: str) -> set[object]:
+        values = literal_eval(s)
+        if not isinstance(values, (set, frozenset, list, tuple)) \
+           or not all(self.get_raw_type().is_valid_litteral(v) for v in values):
+            raise Exception(f"Cannot parse {s} to {self.gen_type()}")
+        return set(values)
+
+
+class FrozenSetPythonType(SetPythonType):
+    def __init__(self, inner_type: PythonType) -> None:
+        super().__init__(inner_type=inner_type)
+
+    def gen_type(self, imports: Optional[PythonImports] = None) -> str:
+        return f"frozenset[{self.get_raw_type().gen_type(imports=imports)}]"
+
+    def gen_litteral(self, value: object, imports: Optional[PythonImports] = None) -> str:
+        return f"frozenset({super().gen_litteral(value, imports)})"
+
+    def default_literal(self) -> frozenset[object]:
+        return frozenset()
+
+    def litteral_from_str(self, s: str) -> frozenset[object]:
+        return frozenset(super().litteral_from_str(s))
+
+
+class TuplePythonType(PythonType):
+    def __init__(self, inner_types: list[PythonType]) -> None:
+        super().__init__()
+        self.__inner_types = inner_types
+
+    def gen_type(self, imports: Optional[PythonImports] = None) -> str:
+        return f"tuple[{', '.join(t.gen_type(imports=imports) for t in self.__inner_types)}]"
+
+    def gen_litteral(self, value: object, imports: Optional[PythonImports] = None) -> str:
+        value = cast(tuple[object, ...], value)
+        if not isinstance(value, tuple) or len(value) != len(self.__inner_types):
+            self.litteral_conversion_error(value, expected_type=f"tuple of size {len(self.__inner_types)}")
+        return "(" + "".join(t.gen_litteral(v, imports) + ", " for (t, v) in zip(self.__inner_types, value)) + ")"
+
+    def default_literal(self) -> tuple[object, ...]:
+        return tuple(t.default_literal() for t in self.__inner_types)
+
+    def __eq__(self, o: object) -> bool:
+        return isinstance(o, type(self)) and self.__inner_types == o.__inner_types
+
+    def __hash__(self) -> int:
+        return super().__hash__() + sum(hash(t) for t in self.__inner_types)
+
+
 class DictPythonType(IterablePythonType):
     def __init__(self, key_type: PythonType, value_type: PythonType) -> None:
         super().__init__(key_type)
@@ -5,6 +5,7 @@ from python_script import *
 from util.graph import Graph
 from util.util import btos, extract_delimiter
 from datetime import datetime
+from itertools import chain
 from code_gen_config import Config
 
 
@@ -21,7 +22,9 @@ class SqlTable:
         self.columns: dict[str, SqlColumn] = dict()
         self.unique_constraints: list[SqlUniqueConstraint] = list()
         self.primary_constraint: Optional[SqlPrimaryConstraint] = None
+        self.foreign_constraints: list[SqlForeignConstraint] = list()
         self.class_type = TableClassPythonType(table=self)
+        self.version = 0
 
     def __repr__(self):
         return f"SqlTable({self.name}, columns: {list(self.columns.values())})"
@@ -30,6 +33,7 @@ class SqlTable:
         if column.name in self.columns:
             raise Exception(f"Column {column} already added in {self}")
         self.columns[column.name] = column
+        self.version += 1
 
     def get_column(self, column_name: str):
         if column_name not in self.columns:
@@ -42,9 +46,11 @@ class SqlTable:
     def remove_column(self, column_name: str):
         self.get_column(column_name=column_name)
         del self.columns[column_name]
+        self.version += 1
 
     def add_unique_constraint(self, unique_constraint: SqlUniqueConstraint):
         self.unique_constraints.append(unique_constraint)
+        self.version += 1
 
     def is_unique(self, column_names: list[str]):
         return any(
@@ -58,6 +64,7 @@ class SqlTable:
                 f"{self.name} already has a primary constraint ({self.primary_constraint}), cannot add another one ({primary_constraint})"
             )
         self.primary_constraint = primary_constraint
+        self.version += 1
 
     def get_primary_column_names(self):
         if self.primary_constraint is None:
@@ -74,6 +81,44 @@ class SqlTable:
             return False
         return column_name in self.primary_constraint.column_names
 
+    def can_sort_inserts(self):
+        '''Rows can be reordered by primary key unless a row may reference another row of the same table'''
+        deferred_columns = self.get_deferred_columns()
+        return self.primary_constraint is not None and not any(
+            c.data_type.is_referrence() and c.data_type.get_reffered_table_name() == self.name
+            and c not in deferred_columns
+            for c in self.columns.values()
+        )
+
+    def get_referenced_tables(self) -> list[SqlTable]:
+        return list(chain.from_iterable(
+            [cast(SqlReferenceType, c.data_type).table] + cast(SqlReferenceType, c.data_type).sub_references
+            for c in self.columns.values() if c.data_type.is_referrence()
+        ))
+
+    def is_referenced_by(self, table: SqlTable):
+        '''True if this table can be reached by following the references of table'''
+        explored: set[str] = set()
+        to_explore = [table]
+        while len(to_explore) > 0:
+            current = to_explore.pop()
+            if current.name == self.name:
+                return True
+            if current.name not in explored:
+                explored.add(current.name)
+                to_explore.extend(current.get_referenced_tables())
+        return False
+
+    def get_deferred_columns(self) -> list[SqlColumn]:
+        '''Nullable references inside a reference cycle, inserted as NULL and set by primary key once the rows are written'''
+        if self.primary_constraint is None:
+            return []
+        return list(
+            c for c in self.columns.values()
+            if c.data_type.is_referrence() and c.optional
+            and self.is_referenced_by(cast(SqlReferenceType, c.data_type).table)
+        )
+
     def is_in_unique(self, column_name: str):
         return any(column_name in c.column_names for c in self.unique_constraints)
 
@@ -81,6 +126,8 @@ class SqlTable:
         self, foreign_constraint: SqlForeignConstraint, referred_table: SqlTable
     ):
         assert referred_table.name == foreign_constraint.referenced_table_name
+        if all(fc is not foreign_constraint for fc in self.foreign_constraints):
+            self.foreign_constraints.append(foreign_constraint)
         for (column_name, referred_column_name) in zip(
             foreign_constraint.column_names, foreign_constraint.referenced_column_names
         ):
@@ -104,9 +151,9 @@ class SqlTable:
             referred_is_primary = column_ref_table.is_primary(column_names=[referred_column_name])
             if referred_is_primary or referred_is_referrence:
                 if not column.data_type.is_referrence() and not isinstance(
-                    column.data_type, SqlStringType
+                    column.data_type, (SqlStringType, SqlIntegerType)
                 ):
-                    raise Exception("Reference to primary key other than String not supported")
+                    raise Exception("Reference to primary key other than String or Integer not supported")
                 sub_references: list[SqlTable] = list()
                 if column.data_type.is_referrence():
                     sub_references.extend(cast(SqlReferenceType, column.data_type).sub_references)
@@ -117,6 +164,7 @@ class SqlTable:
                 column.data_type = SqlReferenceType(
                     table=column_ref_table, column=refered_column, sub_references=sub_references
                 )
+                self.version += 1
                 return True
         return False
 
@@ -140,6 +188,8 @@ class SqlTable:
 
     def get_sorted_columns(self):
         def column_order(column: SqlColumn):
+            if column.auto_increment:
+                return 2
             if self.is_in_primary(column_name=column.name):
                 return 0
             if column.default is not None:
@@ -153,11 +203,22 @@ class SqlTable:
         return sorted(self.columns.values(), key=column_order)
 
     def get_all_unique_constraints(self):
-        constraints = self.unique_constraints
-        if self.primary_constraint is not None and Config.Semantic.use_primary_key_in_equality:
+        constraints = list(self.unique_constraints)
+        if (
+            self.primary_constraint is not None
+            and Config.Semantic.use_primary_key_in_equality
+            and self.get_auto_increment_column() is None
+        ):
             constraints.append(self.primary_constraint)
         return constraints
 
+    def get_auto_increment_column(self):
+        '''The primary column whose values are assigned at write time, if any'''
+        if self.primary_constraint is None or len(self.primary_constraint.column_names) != 1:
+            return None
+        primary_column = self.get_column(self.primary_constraint.column_names[0])
+        return primary_column if primary_column.auto_increment else None
+
     def get_common_columns_in_constraints(self, constraints: Iterable[SqlUniqueConstraint]):
         common_column_names_in_constraints = set(self.columns.keys())
         all_column_names = set(self.columns.keys())
@@ -233,17 +294,53 @@ class SqlTable:
         ):
             values_var = PythonVariable(name=Config.VariableName.AddToDatabase.values)
             object_var = PythonVariable(name=Config.VariableName.AddToDatabase.object)
+            deferred_columns = self.get_deferred_columns()
+            adopts_keys = len(self.get_natural_constraints()) > 0
+            identifying_columns = self.get_identifying_columns()
+            if (adopts_keys or self.get_auto_increment_column() is not None or len(deferred_columns) > 0 
+                    or len(identifying_columns) > 0):
+                script.add_line(f"{objects_param} = list({objects_param})")
+            if adopts_keys:
+                with script.gen_if(SqlTable.get_upsert_param().name):
+                    script.add_line(
+                        f"{self.class_type.gen_type(imports=script.imports)}."
+                        f"{Config.MethodName.Table.adopt_keys}({objects_param}, {connection_param}, "
+                        f"{Config.ParamName.AddToDatabase.batch_size})"
+                    )
+            if self.get_auto_increment_column() is not None:
+                script.add_line(
+                    f"{self.class_type.gen_type(imports=script.imports)}."
+                    f"{Config.MethodName.Table.reserve_ids}({objects_param}, {connection_param})"
+                )
+            if len(identifying_columns) > 0:
+                replaced_param = SqlTable.get_replaced_param()
+                with script.gen_if(f"{SqlTable.get_upsert_param()} and {replaced_param} is not None"):
+                    script.add_line(
+                        f"{replaced_param}[:] = {self.class_type.gen_type(imports=script.imports)}."
+                        f"{Config.MethodName.Table.replaced_checksum}({objects_param}, {connection_param}, "
+                        f"{Config.ParamName.AddToDatabase.batch_size})"
+                    )
             script.add_aligned_line(
                 start=f"{values_var} = list([",
                 separator=",",
                 values=(
-                    c.gen_get_sql_value(column_var_name=f"{object_var}.{c.name}")
+                    "None" if c in deferred_columns
+                    else c.gen_get_sql_value(column_var_name=f"{object_var}.{c.name}")
                     for c in self.columns.values()
                 ),
                 end=f"] for {object_var} in {objects_param})",
             )
             with script.gen_if(f"len({values_var}) == 0"):
                 script.add_line("return")
+            if self.can_sort_inserts():
+                column_indexes = list(self.columns)
+                key_var = PythonVariable(name=Config.VariableName.AddToDatabase.key)
+                key_values = ", ".join(
+                    f"{key_var}[{column_indexes.index(c_name)}]"
+                    for c_name in self.get_primary_column_names()
+                )
+                with script.gen_if(SqlTable.get_sort_by_key_param().name):
+                    script.add_line(f"{values_var}.sort(key=lambda {key_var}: ({key_values},))")
             statement_var = PythonVariable(name=Config.VariableName.AddToDatabase.statement)
             stmt_marker = "%s"
             start_assign = f"{statement_var} = "
@@ -262,16 +359,706 @@ class SqlTable:
                 escape_after_newline=True,
             )
 
+            update_c_names = list(
+                c_name for c_name in self.columns if not self.is_in_primary(c_name)
+            ) or list(self.columns)
+            with script.gen_if(SqlTable.get_upsert_param().name):
+                script.add_line(
+                    f'{statement_var} += " ON DUPLICATE KEY UPDATE '
+                    + ", ".join(f"{c_name} = VALUES({c_name})" for c_name in update_c_names)
+                    + '"'
+                )
+            SqlTable.gen_execute_batches(
+                script=script,
+                connection_param=connection_param,
+                statement_var=statement_var,
+                values_var=values_var,
+            )
+            if len(deferred_columns) > 0:
+                with script.gen_if(SqlTable.get_update_references_param().name):
+                    script.add_line(
+                        f"{self.class_type.gen_type(imports=script.imports)}."
+                        f"{Config.MethodName.Table.update_references}"
+                        f"({objects_param}, {connection_param}, {SqlTable.get_batch_size_param()})"
+                    )
+
+    def gen_update_references(self, script: PythonScript):
+        deferred_columns = self.get_deferred_columns()
+        if len(deferred_columns) == 0:
+            return
+        objects_param = PythonVariable(
+            name=Config.ParamName.AddToDatabase.objects, type=IterablePythonType(self.class_type)
+        )
+        connection_param = SqlTable.get_connection_param(imports=script.imports)
+        with script.gen_static_method_decl(
+            method_name=Config.MethodName.Table.update_references,
+            params=[objects_param, connection_param, SqlTable.get_batch_size_param()],
+            return_type=NonePythonType(),
+        ):
+            values_var = PythonVariable(name=Config.VariableName.AddToDatabase.values)
+            object_var = PythonVariable(name=Config.VariableName.AddToDatabase.object)
             cursor_var = PythonVariable(name=Config.VariableName.AddToDatabase.cursor)
+            statement_var = PythonVariable(name=Config.VariableName.AddToDatabase.statement)
+            primary_columns = list(self.get_column(c_name) for c_name in self.get_primary_column_names())
+            key_columns = primary_columns + deferred_columns
+            deferred_table = Config.Constant.deferred_table_prefix + self.name
+            c_names = ", ".join(c.name for c in key_columns)
+            script.add_aligned_line(
+                start=f"{values_var} = list([",
+                separator=",",
+                values=(
+                    c.gen_get_sql_value(column_var_name=f"{object_var}.{c.name}") for c in key_columns
+                ),
+                end=f"] for {object_var} in {objects_param} if "
+                + " or ".join(f"{object_var}.{c.name} is not None" for c in deferred_columns)
+                + ")",
+            )
+            with script.gen_if(f"len({values_var}) == 0"):
+                script.add_line("return")
             script.add_line(
-                f"{cursor_var} = {connection_param}"
-                f".{Config.SqlConnector.Methods.connection_new_cursor}()"
+                f"{cursor_var} = {connection_param}.{Config.SqlConnector.Methods.connection_new_cursor}()"
             )
             script.add_line(
-                f"{cursor_var}.{Config.SqlConnector.Methods.cursor_execute_many}"
-                f"({statement_var}, {values_var})"
+                f"{cursor_var}.{Config.SqlConnector.Methods.cursor_execute}("
+                f'"CREATE TEMPORARY TABLE {deferred_table} '
+                f"(PRIMARY KEY ({', '.join(c.name for c in primary_columns)})) "
+                f'SELECT {c_names} FROM {self.name} WHERE FALSE")'
+            )
+            with script.gen_try():
+                script.add_line(
+                    f'{statement_var} = "INSERT INTO {deferred_table} ({c_names}) '
+                    f'VALUES ({", ".join("%s" for _ in key_columns)})"'
+                )
+                index_var = PythonVariable(name=Config.VariableName.AddToDatabase.index)
+                batch_size_param = SqlTable.get_batch_size_param()
+                with script.gen_for(
+                    variables=[index_var], iterable=f"range(0, len({values_var}), {batch_size_param})"
+                ):
+                    script.add_line(
+                        f"{cursor_var}.{Config.SqlConnector.Methods.cursor_execute_many}"
+                        f"({statement_var}, {values_var}[{index_var}:{index_var} + {batch_size_param}])"
+                    )
+                script.add_line(
+                    f"{cursor_var}.{Config.SqlConnector.Methods.cursor_execute}("
+                    f'"UPDATE {self.name} AS t JOIN {deferred_table} AS d '
+                    f"USING ({', '.join(c.name for c in primary_columns)}) "
+                    f"SET {', '.join(f't.{c.name} = d.{c.name}' for c in deferred_columns)}\")"
+                )
+            with script.gen_finally():
+                script.add_line(
+                    f"{cursor_var}.{Config.SqlConnector.Methods.cursor_execute}"
+                    f'("DROP TEMPORARY TABLE {deferred_table}")'
+                )
+                script.add_line(f"{cursor_var}.{Config.SqlConnector.Methods.cursor_close}()")
+
+    def gen_reserve_ids(self, script: PythonScript):
+        '''The locked MAX only keeps concurrent inserts away under REPEATABLE READ or SERIALIZABLE, so weaker isolation levels (as set by bulk sessions) are refused'''
+        auto_increment_column = self.get_auto_increment_column()
+        if auto_increment_column is None:
+            return
+        objects_param = PythonVariable(
+            name=Config.ParamName.AddToDatabase.objects, type=ListPythonType(self.class_type)
+        )
+        connection_param = SqlTable.get_connection_param(imports=script.imports)
+        with script.gen_static_method_decl(
+            method_name=Config.MethodName.Table.reserve_ids,
+            params=[objects_param, connection_param],
+            return_type=NonePythonType(),
+        ):
+            object_var = PythonVariable(name=Config.VariableName.AddToDatabase.object)
+            unassigned_var = PythonVariable(name=Config.VariableName.ReserveIds.unassigned)
+            last_id_var = PythonVariable(name=Config.VariableName.ReserveIds.last_id)
+            isolation_var = PythonVariable(name=Config.VariableName.ReserveIds.isolation)
+            cursor_var = PythonVariable(name=Config.VariableName.AddToDatabase.cursor)
+            index_var = PythonVariable(name=Config.VariableName.AddToDatabase.index)
+            c_name = auto_increment_column.name
+            script.add_line(
+                f"{unassigned_var} = [{object_var} for {object_var} in {objects_param} "
+                f"if {object_var}.{c_name} is None]"
+            )
+            with script.gen_if(f"len({unassigned_var}) == 0"):
+                script.add_line("return")
+            script.add_line(
+                f"{cursor_var} = {connection_param}.{Config.SqlConnector.Methods.connection_new_cursor}()"
+            )
+            script.add_line(
+                f"{cursor_var}.{Config.SqlConnector.Methods.cursor_execute}("
+                f'"SELECT COALESCE(MAX({c_name}), 0), @@transaction_isolation FROM {self.name} FOR UPDATE")'
+            )
+            script.add_line(
+                f"(({last_id_var}, {isolation_var}),) = "
+                f"{cursor_var}.{Config.SqlConnector.Methods.cursor_fetch_all}()"
             )
             script.add_line(f"{cursor_var}.{Config.SqlConnector.Methods.cursor_close}()")
+            with script.gen_if(f"{isolation_var} in {Config.Constant.unlocked_isolation_levels}"):
+                script.add_line(
+                    f'raise Exception(f"Cannot reserve ids of {self.name} under {{{isolation_var}}}: '
+                    'concurrent inserts could take the same ids, assign them or use REPEATABLE READ")'
+                )
+            with script.gen_for(
+                variables=[index_var, object_var], iterable=f"enumerate({unassigned_var})"
+            ):
+                script.add_line(f"{object_var}.{c_name} = int({last_id_var}) + 1 + {index_var}")
+
+    def get_natural_constraints(self):
+        '''Unique constraints without primary columns, by which upserted rows find the key of the row they update'''
+        if self.primary_constraint is None:
+            return []
+        primary_c_names = set(self.get_primary_column_names())
+        if any(self.columns[c_name].data_type.is_referrence() for c_name in primary_c_names):
+            return []
+        if len(primary_c_names.intersection(
+                self.get_common_columns_in_constraints(self.get_all_unique_constraints()))) > 0:
+            # Changing the key would change the hash of cached objects
+            return []
+        return list(u for u in self.unique_constraints if len(primary_c_names.intersection(u.column_names)) == 0)
+
+    def gen_adopt_keys(self, script: PythonScript):
+        '''An upsert updates the existing row of a unique key and keeps its primary key, which the objects (and
+        the rows referencing them) have to use instead of a reserved or generated one'''
+        natural_constraints = self.get_natural_constraints()
+        if len(natural_constraints) == 0:
+            return
+        objects_param = PythonVariable(
+            name=Config.ParamName.AddToDatabase.objects, type=ListPythonType(self.class_type)
+        )
+        connection_param = SqlTable.get_connection_param(imports=script.imports)
+        batch_size_param = SqlTable.get_batch_size_param()
+        with script.gen_static_method_decl(
+            method_name=Config.MethodName.Table.adopt_keys,
+            params=[objects_param, connection_param, batch_size_param],
+            return_type=NonePythonType(),
+        ):
+            object_var = PythonVariable(name=Config.VariableName.AddToDatabase.object)
+            cursor_var = PythonVariable(name=Config.VariableName.AddToDatabase.cursor)
+            index_var = PythonVariable(name=Config.VariableName.AddToDatabase.index)
+            key_var = PythonVariable(name=Config.VariableName.AddToDatabase.key)
+            keyed_var = PythonVariable(name=Config.VariableName.AdoptKeys.keyed)
+            natural_keys_var = PythonVariable(name=Config.VariableName.AdoptKeys.natural_keys)
+            primary_columns = list(self.columns[c_name] for c_name in self.get_primary_column_names())
+            script.add_line(
+                f"{cursor_var} = {connection_param}.{Config.SqlConnector.Methods.connection_new_cursor}()"
+            )
+            for constraint in natural_constraints:
+                unique_columns = list(self.columns[c_name] for c_name in constraint.column_names)
+                script.add_aligned_line(
+                    start=f"{keyed_var} = {{(",
+                    end=f",): {object_var} for {object_var} in {objects_param}}}",
+                    separator=", ",
+                    values=(c.gen_get_sql_value(f"{object_var}.{c.name}") for c in unique_columns),
+                )
+                script.add_line(f"{natural_keys_var} = [{key_var} for {key_var} in {keyed_var} if None not in {key_var}]")
+                with script.gen_for(
+                    variables=[index_var], iterable=f"range(0, len({natural_keys_var}), {batch_size_param})"
+                ):
+                    selected = ", ".join(c.data_type.gen_key_sql_value(c.name) for c in primary_columns + unique_columns)
+                    row_marker = f"({', '.join('%s' for _ in unique_columns)})"
+                    script.add_line(
+                        f"{cursor_var}.{Config.SqlConnector.Methods.cursor_execute}("
+                        f'"SELECT {selected} FROM {self.name} WHERE ({", ".join(constraint.column_names)}) IN (" '
+                        f'+ ", ".join([{repr(row_marker)}] * len({natural_keys_var}[{index_var}:{index_var} + {batch_size_param}])) + ")", '
+                        f"[v for {key_var} in {natural_keys_var}[{index_var}:{index_var} + {batch_size_param}] for v in {key_var}])"
+                    )
+                    row_vars = list(f"{Config.VariableName.AddToDatabase.key}{i}" 
+                                    for i in range(len(primary_columns) + len(unique_columns)))
+                    unique_key = ", ".join(
+                        c.data_type.gen_from_key_value(v) 
+                        for (c, v) in zip(unique_columns, row_vars[len(primary_columns):])
+                    )
+                    with script.gen_for(
+                        variables=[PythonVariable(name=f"({', '.join(row_vars)},)")],
+                        iterable=f"{cursor_var}.{Config.SqlConnector.Methods.cursor_fetch_all}()",
+                    ):
+                        script.add_line(f"{object_var} = {keyed_var}.get(({unique_key},))")
+                        with script.gen_if(f"{object_var} is None"):
+                            script.add_line(
+                                f'raise Exception(f"A row of {self.name} matches {{({unique_key},)!r}} by '
+                                f'({", ".join(constraint.column_names)}) but with other values, its key cannot be adopted")'
+                            )
+                        for (c, v) in zip(primary_columns, row_vars):
+                            script.add_line(f"{object_var}.{c.name} = {c.data_type.gen_from_key_value(v)}")
+            script.add_line(f"{cursor_var}.{Config.SqlConnector.Methods.cursor_close}()")
+
+    def gen_dfd(self, script: PythonScript):
+        if self.primary_constraint is None:
+            return
+        primary_columns = list(self.get_column(c_name) for c_name in self.primary_constraint.column_names)
+        keys_param = PythonVariable(
+            name=Config.ParamName.DeleteFromDatabase.keys,
+            type=IterablePythonType(TuplePythonType(list(c.make_type() for c in primary_columns))),
+        )
+        connection_param = SqlTable.get_connection_param(imports=script.imports)
+        with script.gen_static_method_decl(
+            method_name=Config.MethodName.Table.delete_from_database,
+            params=[keys_param, connection_param, SqlTable.get_batch_size_param()],
+            return_type=NonePythonType(),
+        ):
+            values_var = PythonVariable(name=Config.VariableName.AddToDatabase.values)
+            key_var = PythonVariable(name=Config.VariableName.AddToDatabase.key)
+            script.add_aligned_line(
+                start=f"{values_var} = list([",
+                separator=",",
+                values=(
+                    c.gen_get_sql_value(column_var_name=f"{key_var}[{i}]")
+                    for (i, c) in enumerate(primary_columns)
+                ),
+                end=f"] for {key_var} in {keys_param})",
+            )
+            with script.gen_if(f"len({values_var}) == 0"):
+                script.add_line("return")
+            statement_var = PythonVariable(name=Config.VariableName.AddToDatabase.statement)
+            script.add_line(
+                f'{statement_var} = "DELETE FROM {self.name} WHERE '
+                + " AND ".join(f"{c.name} = %s" for c in primary_columns)
+                + '"'
+            )
+            SqlTable.gen_execute_batches(
+                script=script,
+                connection_param=connection_param,
+                statement_var=statement_var,
+                values_var=values_var,
+            )
+
+    def gen_atd_parallel(self, script: PythonScript):
+        if self.primary_constraint is None or len(self.primary_constraint.column_names) != 1:
+            return
+        if self.get_auto_increment_column() is not None or len(self.get_deferred_columns()) > 0:
+            return
+        objects_param = PythonVariable(
+            name=Config.ParamName.AddToDatabase.objects, type=IterablePythonType(self.class_type)
+        )
+        connections_param = PythonVariable(
+            name=Config.ParamName.AddToDatabase.connections,
+            type=ListPythonType(SqlTable.get_connection_param(imports=script.imports).type),
+        )
+        by_range_param = PythonVariable(
+            name=Config.ParamName.AddToDatabase.by_range, type=BoolPythonType(), initial_litteral=False
+        )
+        independent_commit_param = PythonVariable(
+            name=Config.ParamName.AddToDatabase.independent_commit,
+            type=BoolPythonType(),
+            initial_litteral=False,
+        )
+        with script.gen_static_method_decl(
+            method_name=Config.MethodName.Table.add_to_database_parallel,
+            params=[objects_param, connections_param, by_range_param, independent_commit_param],
+            return_type=NonePythonType(),
+        ):
+            object_var = PythonVariable(name=Config.VariableName.AddToDatabase.object)
+            primary_column = self.get_column(self.primary_constraint.column_names[0])
+            script.add_aligned_line(
+                start=f"{Config.FunctionName.add_partitions_to_database}(",
+                end=")",
+                separator=",",
+                values=[
+                    f"{Config.ParamName.AddPartitions.add_to_database}="
+                    f"{self.class_type.gen_type(imports=script.imports)}"
+                    f".{Config.MethodName.Table.add_to_database}",
+                    f"{Config.ParamName.AddPartitions.partitions}="
+                    f"{Config.FunctionName.partition_objects}("
+                    f"{Config.ParamName.PartitionObjects.objects}={objects_param}, "
+                    f"{Config.ParamName.PartitionObjects.key}=lambda {object_var}: "
+                    f"{primary_column.gen_get_sql_value(f'{object_var}.{primary_column.name}')}, "
+                    f"{Config.ParamName.PartitionObjects.n_partitions}=len({connections_param}), "
+                    f"{Config.ParamName.PartitionObjects.by_range}={by_range_param})",
+                    f"{Config.ParamName.AddPartitions.connections}={connections_param}",
+                    f"{Config.ParamName.AddPartitions.independent_commit}={independent_commit_param}",
+                ],
+            )
+
+    def get_reconcile_primary_column(self):
+        if self.primary_constraint is None or len(self.primary_constraint.column_names) != 1:
+            return None
+        primary_column = self.get_column(self.primary_constraint.column_names[0])
+        if primary_column.data_type.is_referrence():
+            return None
+        return primary_column
+
+    def gen_checksum_sql(self):
+        return (
+            f"CRC32(CONCAT_WS('{Config.Constant.checksum_separator}', "
+            + ", ".join(
+                f"{c.data_type.gen_checksum_sql_value(c.name)}, ISNULL({c.name})" for c in self.columns.values()
+            )
+            + "))"
+        )
+
+    def gen_row_checksum(self, script: PythonScript):
+        script.imports.add_import(module="zlib", object="crc32")
+        object_param = PythonVariable(name=Config.VariableName.AddToDatabase.object, type=self.class_type)
+        with script.gen_static_method_decl(
+            method_name=Config.MethodName.Table.row_checksum,
+            params=[object_param],
+            return_type=IntPythonType(),
+        ):
+            values: list[str] = list()
+            for c in self.columns.values():
+                column_access = f"{object_param}.{c.name}"
+                text = f'{c.data_type.gen_checksum_text(column_access)}, b"0"'
+                if c.optional:
+                    values.append(f'*(({text}) if {column_access} is not None else (b"1",))')
+                else:
+                    values.append(text)
+            script.add_aligned_line(
+                start=f'return crc32(b"{Config.Constant.checksum_separator}".join([',
+                end="]))",
+                separator=",",
+                values=values,
+            )
+
+    def get_identifying_columns(self):
+        '''Columns by which an upserted object finds the row it replaces'''
+        if self.primary_constraint is not None:
+            return list(self.columns[c_name] for c_name in self.get_primary_column_names())
+        if len(self.unique_constraints) > 0:
+            return list(self.columns[c_name] for c_name in self.unique_constraints[0].column_names)
+        return []
+
+    def gen_replaced_checksum(self, script: PythonScript):
+        '''Count and checksum of the rows that upserting the objects replaces, so that verification can
+        take them out of the table checksum'''
+        identifying_columns = self.get_identifying_columns()
+        if len(identifying_columns) == 0:
+            return
+        objects_param = PythonVariable(
+            name=Config.ParamName.AddToDatabase.objects, type=ListPythonType(self.class_type)
+        )
+        connection_param = SqlTable.get_connection_param(imports=script.imports)
+        batch_size_param = SqlTable.get_batch_size_param()
+        with script.gen_static_method_decl(
+            method_name=Config.MethodName.Table.replaced_checksum,
+            params=[objects_param, connection_param, batch_size_param],
+            return_type=ListPythonType(IntPythonType()),
+        ):
+            cursor_var = PythonVariable(name=Config.VariableName.AddToDatabase.cursor)
+            keys_var = PythonVariable(name=Config.VariableName.Verify.keys)
+            count_var = PythonVariable(name=Config.VariableName.Verify.count)
+            checksum_var = PythonVariable(name=Config.VariableName.Verify.checksum)
+            replaced_var = PythonVariable(name=Config.ParamName.AddToDatabase.replaced)
+            index_var = PythonVariable(name=Config.VariableName.AddToDatabase.index)
+            object_var = PythonVariable(name=Config.VariableName.AddToDatabase.object)
+            key_var = PythonVariable(name=Config.VariableName.AddToDatabase.key)
+            script.add_aligned_line(
+                start=f"{keys_var} = [(",
+                end=f",) for {object_var} in {objects_param}]",
+                separator=", ",
+                values=(c.gen_get_sql_value(f"{object_var}.{c.name}") for c in identifying_columns),
+            )
+            script.add_line(f"{keys_var} = [{key_var} for {key_var} in {keys_var} if None not in {key_var}]")
+            script.add_line(f"{replaced_var} = [0, 0]")
+            script.add_line(
+                f"{cursor_var} = {connection_param}.{Config.SqlConnector.Methods.connection_new_cursor}()"
+            )
+            row_marker = f"({', '.join('%s' for _ in identifying_columns)})"
+            with script.gen_for(
+                variables=[index_var], iterable=f"range(0, len({keys_var}), {batch_size_param})"
+            ):
+                script.add_line(
+                    f"{cursor_var}.{Config.SqlConnector.Methods.cursor_execute}("
+                    f'"SELECT COUNT(*), BIT_XOR({self.gen_checksum_sql()}) FROM {self.name} '
+                    f'WHERE ({", ".join(c.name for c in identifying_columns)}) IN (" '
+                    f'+ ", ".join([{repr(row_marker)}] * len({keys_var}[{index_var}:{index_var} + {batch_size_param}])) + ")", '
+                    f"[v for {key_var} in {keys_var}[{index_var}:{index_var} + {batch_size_param}] for v in {key_var}])"
+                )
+                script.add_line(
+                    f"(({count_var}, {checksum_var}),) = "
+                    f"{cursor_var}.{Config.SqlConnector.Methods.cursor_fetch_all}()"
+                )
+                script.add_line(f"{replaced_var}[0] += int({count_var})")
+                script.add_line(f"{replaced_var}[1] ^= int({checksum_var})")
+            script.add_line(f"{cursor_var}.{Config.SqlConnector.Methods.cursor_close}()")
+            script.add_line(f"return {replaced_var}")
+
+    def gen_table_checksum(self, script: PythonScript):
+        connection_param = SqlTable.get_connection_param(imports=script.imports)
+        with script.gen_static_method_decl(
+            method_name=Config.MethodName.Table.table_checksum,
+            params=[connection_param],
+            return_type=TuplePythonType([IntPythonType(), IntPythonType()]),
+        ):
+            cursor_var = PythonVariable(name=Config.VariableName.AddToDatabase.cursor)
+            count_var = PythonVariable(name=Config.VariableName.Verify.count)
+            checksum_var = PythonVariable(name=Config.VariableName.Verify.checksum)
+            script.add_line(
+                f"{cursor_var} = {connection_param}.{Config.SqlConnector.Methods.connection_new_cursor}()"
+            )
+            script.add_line(
+                f"{cursor_var}.{Config.SqlConnector.Methods.cursor_execute}("
+                f'"SELECT COUNT(*), BIT_XOR({self.gen_checksum_sql()}) FROM {self.name}")'
+            )
+            script.add_line(
+                f"(({count_var}, {checksum_var}),) = "
+                f"{cursor_var}.{Config.SqlConnector.Methods.cursor_fetch_all}()"
+            )
+            script.add_line(f"{cursor_var}.{Config.SqlConnector.Methods.cursor_close}()")
+            script.add_line(f"return int({count_var}), int({checksum_var})")
+
+    def gen_count_missing_references(self, script: PythonScript):
+        '''Counts, for each foreign constraint, the given rows whose parent is missing'''
+        if len(self.foreign_constraints) == 0:
+            return
+        objects_param = PythonVariable(
+            name=Config.ParamName.AddToDatabase.objects, type=ListPythonType(self.class_type)
+        )
+        connection_param = SqlTable.get_connection_param(imports=script.imports)
+        batch_size_param = SqlTable.get_batch_size_param()
+        with script.gen_static_method_decl(
+            method_name=Config.MethodName.Table.count_missing_references,
+            params=[objects_param, connection_param, batch_size_param],
+            return_type=DictPythonType(StrPythonType(), IntPythonType()),
+        ):
+            cursor_var = PythonVariable(name=Config.VariableName.AddToDatabase.cursor)
+            missing_var = PythonVariable(name=Config.VariableName.Verify.missing)
+            keys_var = PythonVariable(name=Config.VariableName.Verify.keys)
+            count_var = PythonVariable(name=Config.VariableName.Verify.count)
+            index_var = PythonVariable(name=Config.VariableName.AddToDatabase.index)
+            object_var = PythonVariable(name=Config.VariableName.AddToDatabase.object)
+            key_var = PythonVariable(name=Config.VariableName.AddToDatabase.key)
+            primary_columns = list(self.columns[c_name] for c_name in self.get_primary_column_names())
+            script.add_line(
+                f"{cursor_var} = {connection_param}.{Config.SqlConnector.Methods.connection_new_cursor}()"
+            )
+            script.add_line(f"{missing_var}: dict[str, int] = {{}}")
+            if len(primary_columns) > 0:
+                script.add_aligned_line(
+                    start=f"{keys_var} = [(",
+                    end=f",) for {object_var} in {objects_param}]",
+                    separator=", ",
+                    values=(c.gen_get_sql_value(f"{object_var}.{c.name}") for c in primary_columns),
+                )
+            for fc in self.foreign_constraints:
+                join = " AND ".join(
+                    f"t.{c_name} = r.{r_c_name}"
+                    for (c_name, r_c_name) in zip(fc.column_names, fc.referenced_column_names)
+                )
+                # As MySQL does, a reference with a NULL column is not checked
+                condition = " AND ".join(f"t.{c_name} IS NOT NULL" for c_name in fc.column_names)
+                statement = (
+                    f"SELECT COUNT(*) FROM {self.name} AS t LEFT JOIN {fc.referenced_table_name} AS r ON {join} "
+                    f"WHERE {condition} AND r.{fc.referenced_column_names[0]} IS NULL"
+                )
+                fc_name = repr(", ".join(fc.column_names))
+                if len(primary_columns) == 0:
+                    script.add_line(
+                        f'{cursor_var}.{Config.SqlConnector.Methods.cursor_execute}("{statement}")'
+                    )
+                    script.add_line(
+                        f"(({missing_var}[{fc_name}],),) = "
+                        f"{cursor_var}.{Config.SqlConnector.Methods.cursor_fetch_all}()"
+                    )
+                    continue
+                script.add_line(f"{missing_var}[{fc_name}] = 0")
+                row_marker = f"({', '.join('%s' for _ in primary_columns)})"
+                with script.gen_for(
+                    variables=[index_var], iterable=f"range(0, len({keys_var}), {batch_size_param})"
+                ):
+                    script.add_line(
+                        f"{cursor_var}.{Config.SqlConnector.Methods.cursor_execute}("
+                        f'"{statement} AND ({", ".join(f"t.{c.name}" for c in primary_columns)}) IN (" '
+                        f'+ ", ".join([{repr(row_marker)}] * len({keys_var}[{index_var}:{index_var} + {batch_size_param}])) + ")", '
+                        f"[v for {key_var} in {keys_var}[{index_var}:{index_var} + {batch_size_param}] for v in {key_var}])"
+                    )
+                    script.add_line(
+                        f"(({count_var},),) = {cursor_var}.{Config.SqlConnector.Methods.cursor_fetch_all}()"
+                    )
+                    script.add_line(f"{missing_var}[{fc_name}] += {count_var}")
+            script.add_line(f"{cursor_var}.{Config.SqlConnector.Methods.cursor_close}()")
+            script.add_line(f"return {missing_var}")
+
+    def gen_load_keys(self, script: PythonScript):
+        if self.primary_constraint is None:
+            return
+        key_columns = list(self.columns[c_name] for c_name in self.get_primary_column_names())
+        key_vars = list(f"{Config.VariableName.AddToDatabase.key}{i}" for i in range(len(key_columns)))
+        connection_param = SqlTable.get_connection_param(imports=script.imports)
+        with script.gen_static_method_decl(
+            method_name=Config.MethodName.Table.load_keys,
+            params=[connection_param],
+            return_type=SetPythonType(TuplePythonType(list(c.data_type.key_python_type() for c in key_columns))),
+        ):
+            cursor_var = PythonVariable(name=Config.VariableName.AddToDatabase.cursor)
+            keys_var = PythonVariable(name=Config.VariableName.Verify.keys)
+            script.add_line(
+                f"{cursor_var} = {connection_param}.{Config.SqlConnector.Methods.connection_new_cursor}()"
+            )
+            script.add_line(
+                f"{cursor_var}.{Config.SqlConnector.Methods.cursor_execute}"
+                f'("SELECT {", ".join(c.data_type.gen_key_sql_value(c.name) for c in key_columns)} FROM {self.name}")'
+            )
+            key_values = ", ".join(c.data_type.gen_from_key_value(k) for (c, k) in zip(key_columns, key_vars))
+            script.add_line(
+                f"{keys_var} = set(({key_values},) for ({', '.join(key_vars)},) "
+                f"in {cursor_var}.{Config.SqlConnector.Methods.cursor_fetch_all}())"
+            )
+            script.add_line(f"{cursor_var}.{Config.SqlConnector.Methods.cursor_close}()")
+            script.add_line(f"return {keys_var}")
+
+    def gen_reconcile(self, script: PythonScript):
+        primary_column = self.get_reconcile_primary_column()
+        if primary_column is None:
+            return
+        script.imports.add_import(module="zlib", object="crc32")
+        objects_param = PythonVariable(
+            name=Config.ParamName.Reconcile.objects, type=IterablePythonType(self.class_type)
+        )
+        connection_param = SqlTable.get_connection_param(imports=script.imports)
+        chunk_size_param = PythonVariable(
+            name=Config.ParamName.Reconcile.chunk_size,
+            type=IntPythonType(),
+            initial_litteral=Config.Constant.reconcile_chunk_size,
+        )
+        n_chunks_param = PythonVariable(
+            name=Config.ParamName.Reconcile.n_chunks,
+            type=IntPythonType(),
+            initial_litteral=Config.Constant.reconcile_n_chunks,
+        )
+        key_type = primary_column.make_type()
+        with script.gen_static_method_decl(
+            method_name=Config.MethodName.Table.reconcile,
+            params=[objects_param, connection_param, chunk_size_param, n_chunks_param],
+            return_type=TuplePythonType(
+                [ListPythonType(self.class_type), ListPythonType(TuplePythonType([key_type]))]
+            ),
+        ):
+            names = Config.VariableName.Reconcile
+            object_var = PythonVariable(name=Config.VariableName.AddToDatabase.object)
+            cursor_var = PythonVariable(name=Config.VariableName.AddToDatabase.cursor)
+            key_access = primary_column.gen_get_sql_value(f"{object_var}.{primary_column.name}")
+            is_range = isinstance(primary_column.data_type, SqlIntegerType)
+            if is_range:
+                chunk_of = f"{key_access} // {chunk_size_param}"
+                chunk_sql = f"FLOOR({primary_column.name} / %s)"
+                chunk_param = chunk_size_param
+            else:
+                chunk_of = f"crc32({primary_column.data_type.gen_checksum_text(key_access)}) % {n_chunks_param}"
+                chunk_sql = f"CRC32({primary_column.data_type.gen_checksum_sql_value(primary_column.name)}) % %s"
+                chunk_param = n_chunks_param
+            script.add_line(
+                f"{names.local_chunks}: dict[int, dict[{key_type.gen_type(script.imports)}, "
+                f"{self.class_type.gen_type(script.imports)}]] = {{}}"
+            )
+            with script.gen_for(variables=[object_var], iterable=objects_param.name):
+                script.add_line(
+                    f"{names.local_chunks}.setdefault({chunk_of}, {{}})[{key_access}] = {object_var}"
+                )
+            script.add_line(f"{names.local_checksums}: dict[int, int] = {{}}")
+            with script.gen_for(
+                variables=[PythonVariable(names.chunk), PythonVariable(names.local_rows)],
+                iterable=f"{names.local_chunks}.items()",
+            ):
+                script.add_line(f"{names.local_checksums}[{names.chunk}] = 0")
+                with script.gen_for(variables=[object_var], iterable=f"{names.local_rows}.values()"):
+                    script.add_line(
+                        f"{names.local_checksums}[{names.chunk}] ^= "
+                        f"{self.class_type.gen_type(script.imports)}.{Config.MethodName.Table.row_checksum}({object_var})"
+                    )
+            script.add_line(
+                f"{cursor_var} = {connection_param}.{Config.SqlConnector.Methods.connection_new_cursor}()"
+            )
+            script.add_line(
+                f"{cursor_var}.{Config.SqlConnector.Methods.cursor_execute}("
+                f'"SELECT {chunk_sql}, BIT_XOR({self.gen_checksum_sql()}) FROM {self.name} '
+                f'GROUP BY 1", [{chunk_param}])'
+            )
+            script.add_line(
+                f"{names.remote_checksums} = {{int({names.chunk}): int(checksum) for ({names.chunk}, checksum) "
+                f"in {cursor_var}.{Config.SqlConnector.Methods.cursor_fetch_all}()}}"
+            )
+            script.add_line(f"{names.missing}: list[{self.class_type.gen_type(script.imports)}] = []")
+            script.add_line(f"{names.extra}: list[tuple[{key_type.gen_type(script.imports)}]] = []")
+            with script.gen_for(
+                variables=[PythonVariable(names.chunk)],
+                iterable=f"sorted(set({names.local_checksums}) | set({names.remote_checksums}))",
+            ):
+                with script.gen_if(
+                    f"{names.local_checksums}.get({names.chunk}, 0) == "
+                    f"{names.remote_checksums}.get({names.chunk}, 0)"
+                ):
+                    script.add_line("continue")
+                if is_range:
+                    script.add_line(
+                        f"{cursor_var}.{Config.SqlConnector.Methods.cursor_execute}("
+                        f'"SELECT {primary_column.name}, {self.gen_checksum_sql()} FROM {self.name} '
+                        f'WHERE {primary_column.name} >= %s AND {primary_column.name} < %s", '
+                        f"[{names.chunk} * {chunk_size_param}, ({names.chunk} + 1) * {chunk_size_param}])"
+                    )
+                else:
+                    script.add_line(
+                        f"{cursor_var}.{Config.SqlConnector.Methods.cursor_execute}("
+                        f'"SELECT {primary_column.name}, {self.gen_checksum_sql()} FROM {self.name} '
+                        f'WHERE {chunk_sql} = %s", [{n_chunks_param}, {names.chunk}])'
+                    )
+                script.add_line(
+                    f"{names.remote_rows} = dict({cursor_var}.{Config.SqlConnector.Methods.cursor_fetch_all}())"
+                )
+                script.add_line(f"{names.local_rows} = {names.local_chunks}.get({names.chunk}, {{}})")
+                script.add_aligned_line(
+                    start=f"{names.missing}.extend(",
+                    end=")",
+                    separator="",
+                    values=[
+                        f"{object_var} for ({names.key}, {object_var}) in {names.local_rows}.items()",
+                        f"if {names.remote_rows}.get({names.key}) != "
+                        f"{self.class_type.gen_type(script.imports)}.{Config.MethodName.Table.row_checksum}({object_var})",
+                    ],
+                )
+                script.add_line(
+                    f"{names.extra}.extend(({names.key},) for {names.key} in {names.remote_rows} "
+                    f"if {names.key} not in {names.local_rows})"
+                )
+            script.add_line(f"{cursor_var}.{Config.SqlConnector.Methods.cursor_close}()")
+            script.add_line(f"return {names.missing}, {names.extra}")
+
+    def gen_export(self, script: PythonScript):
+        script.imports.add_import(module="csv", object="writer")
+        connection_param = SqlTable.get_connection_param(imports=script.imports)
+        path_param = PythonVariable(name=Config.ParamName.Export.path, type=StrPythonType())
+        where_param = PythonVariable(
+            name=Config.ParamName.Export.where, type=OptionalPythonType(StrPythonType())
+        )
+        batch_size_param = SqlTable.get_batch_size_param()
+        with script.gen_function_decl(
+            function_name=Config.FunctionName.exporter(self.name),
+            params=[connection_param, path_param, where_param, batch_size_param],
+        ):
+            cursor_var = PythonVariable(name=Config.VariableName.AddToDatabase.cursor)
+            statement_var = PythonVariable(name=Config.VariableName.AddToDatabase.statement)
+            csv_file_var = PythonVariable(name=Config.VariableName.Export.csv_file)
+            csv_writer_var = PythonVariable(name=Config.VariableName.Export.csv_writer)
+            rows_var = PythonVariable(name=Config.VariableName.Export.rows)
+            script.add_line(f'{statement_var} = "SELECT {", ".join(self.columns)} FROM {self.name}"')
+            with script.gen_if(f"{where_param} is not None"):
+                script.add_line(f'{statement_var} += f" WHERE {{{where_param}}}"')
+            script.add_line(
+                f"{cursor_var} = {connection_param}"
+                f".{Config.SqlConnector.Methods.connection_new_cursor}(buffered=False)"
+            )
+            with script.gen_try():
+                script.add_line(
+                    f"{cursor_var}.{Config.SqlConnector.Methods.cursor_execute}({statement_var})"
+                )
+                with script.gen_with(
+                    f'open(file={path_param}, mode="w", newline="", '
+                    f"buffering={Config.Constant.export_buffer_size})",
+                    csv_file_var,
+                ):
+                    script.add_line(
+                        f"{csv_writer_var} = writer({csv_file_var}, "
+                        f"delimiter={repr(Config.Constant.csv_delimiter)})"
+                    )
+                    script.add_line(f"{csv_writer_var}.writerow({repr(list(self.columns))})")
+                    script.add_line(
+                        f"{rows_var} = {cursor_var}.{Config.SqlConnector.Methods.cursor_fetch_many}"
+                        f"({batch_size_param})"
+                    )
+                    with script.gen_while(f"len({rows_var}) > 0"):
+                        script.add_line(f"{csv_writer_var}.writerows({rows_var})")
+                        script.add_line(
+                            f"{rows_var} = {cursor_var}.{Config.SqlConnector.Methods.cursor_fetch_many}"
+                            f"({batch_size_param})"
+                        )
+            with script.gen_finally():
+                script.add_line(f"{cursor_var}.{Config.SqlConnector.Methods.cursor_close}()")
 
     def gen_constant(self, script: PythonScript):
         if self.primary_constraint is None:
@@ -303,6 +1090,17 @@ class SqlTable:
         with script.gen_class_decl(class_type=self.class_type):
             self.gen_ctx(script=script)
             self.gen_atd(script=script)
+            self.gen_atd_parallel(script=script)
+            self.gen_update_references(script=script)
+            self.gen_reserve_ids(script=script)
+            self.gen_adopt_keys(script=script)
+            self.gen_dfd(script=script)
+            self.gen_row_checksum(script=script)
+            self.gen_replaced_checksum(script=script)
+            self.gen_table_checksum(script=script)
+            self.gen_count_missing_references(script=script)
+            self.gen_load_keys(script=script)
+            self.gen_reconcile(script=script)
             self.gen_constant(script=script)
             self.gen_eq(script=script)
             self.gen_hash(script=script)
@@ -315,16 +1113,93 @@ class SqlTable:
             type=ClassPythonType(Config.SqlConnector.Imports.connection_type.name()),
         )
 
+    @staticmethod
+    def get_pool_param(imports: PythonImports):
+        imports.add_import_from_config(Config.SqlConnector.Imports.pool_type)
+        return PythonVariable(
+            name=Config.ParamName.ConnectToDatabase.pool,
+            type=OptionalPythonType(ClassPythonType(Config.SqlConnector.Imports.pool_type.name())),
+        )
+
+    @staticmethod
+    def get_batch_size_param():
+        return PythonVariable(
+            name=Config.ParamName.AddToDatabase.batch_size,
+            type=IntPythonType(),
+            initial_litteral=Config.Constant.batch_size,
+        )
+
+    @staticmethod
+    def get_upsert_param():
+        return PythonVariable(
+            name=Config.ParamName.AddToDatabase.upsert, type=BoolPythonType(), initial_litteral=False
+        )
+
+    @staticmethod
+    def get_sort_by_key_param():
+        return PythonVariable(
+            name=Config.ParamName.AddToDatabase.sort_by_key,
+            type=BoolPythonType(),
+            initial_litteral=Config.Semantic.sort_inserts_by_primary_key,
+        )
+
+    @staticmethod
+    def get_replaced_param():
+        '''Receives the count and checksum of the rows an upsert replaces'''
+        return PythonVariable(
+            name=Config.ParamName.AddToDatabase.replaced,
+            type=OptionalPythonType(ListPythonType(IntPythonType())),
+        )
+
+    @staticmethod
+    def get_update_references_param():
+        return PythonVariable(
+            name=Config.ParamName.AddToDatabase.update_references,
+            type=BoolPythonType(),
+            initial_litteral=True,
+        )
+
     @staticmethod
     def gen_atd_decl(
         script: PythonScript, objects_param: PythonVariable, connection_param: PythonVariable
     ):
         return script.gen_static_method_decl(
             method_name=Config.MethodName.Table.add_to_database,
-            params=[objects_param, connection_param],
+            params=[
+                objects_param,
+                connection_param,
+                SqlTable.get_batch_size_param(),
+                SqlTable.get_upsert_param(),
+                SqlTable.get_sort_by_key_param(),
+                SqlTable.get_update_references_param(),
+                SqlTable.get_replaced_param(),
+            ],
             return_type=NonePythonType(),
         )
 
+    @staticmethod
+    def gen_execute_batches(
+        script: PythonScript,
+        connection_param: PythonVariable,
+        statement_var: PythonVariable,
+        values_var: PythonVariable,
+    ):
+        cursor_var = PythonVariable(name=Config.VariableName.AddToDatabase.cursor)
+        index_var = PythonVariable(name=Config.VariableName.AddToDatabase.index)
+        batch_size_param = SqlTable.get_batch_size_param()
+        script.add_line(
+            f"{cursor_var} = {connection_param}"
+            f".{Config.SqlConnector.Methods.connection_new_cursor}()"
+        )
+        with script.gen_for(
+            variables=[index_var], iterable=f"range(0, len({values_var}), {batch_size_param})"
+        ):
+            script.add_line(
+                f"{cursor_var}.{Config.SqlConnector.Methods.cursor_execute_many}"
+                f"({statement_var}, {values_var}[{index_var}:{index_var} + {batch_size_param}])"
+            )
+        script.add_line(f"{cursor_var}.{Config.SqlConnector.Methods.cursor_close}()")
+
     @staticmethod
     def gen_parent_method(script: PythonScript):
         with script.gen_class_decl(class_type=SqlTable.PARENT_CLASS):
@@ -339,12 +1214,30 @@ class SqlTable:
 class SqlTables(dict[str, SqlTable]):
     def __init__(self, values: Optional[dict[str, SqlTable]] = None):
         super().__init__(values or {})
+        self.__graphs: dict[bool, tuple[tuple[tuple[str, int, int], ...], Graph[str]]] = dict()
 
     def get_graph(self):
+        return self.get_cached_graph(with_deferred=True)
+
+    def get_insertion_graph(self):
+        '''Graph without the deferred references, so that it has no cycle made of nullable references'''
+        return self.get_cached_graph(with_deferred=False)
+
+    def get_cached_graph(self, with_deferred: bool):
+        '''The graph is made again once a table is added, removed or replaced, or one of the tables changed'''
+        state = tuple((t_name, id(table), table.version) for (t_name, table) in self.items())
+        cached = self.__graphs.get(with_deferred)
+        if cached is None or cached[0] != state:
+            cached = (state, self.make_graph(with_deferred=with_deferred))
+            self.__graphs[with_deferred] = cached
+        return cached[1]
+
+    def make_graph(self, with_deferred: bool = True):
         def explorer(t_name: str):
+            deferred_columns = [] if with_deferred else self[t_name].get_deferred_columns()
             for column in self[t_name].columns.values():
                 data_type = column.data_type
-                if isinstance(data_type, SqlReferenceType):
+                if isinstance(data_type, SqlReferenceType) and column not in deferred_columns:
                     yield data_type.table.name
                     for sr in data_type.sub_references:
                         yield sr.name
@@ -386,22 +1279,24 @@ class TableClassPythonType(BaseClassPythonType):
 
 
 class SqlColumn:
-    def __init__(self, name: str, data_type: SqlType, optional: bool, default: Optional[bytes]):
+    def __init__(self, name: str, data_type: SqlType, optional: bool, default: Optional[bytes], 
+                 auto_increment: bool = False):
         self.name = name
         self.optional = optional
         self.data_type = data_type
         self.default = default
+        self.auto_increment = auto_increment
 
     def make_type(self):
         python_type = self.data_type.python_type
-        if self.optional or self.default is not None:
+        if self.optional or self.default is not None or self.auto_increment:
             python_type = OptionalPythonType(python_type)
         return python_type
 
     def get_default_litteral(self):
         if self.default is not None:
             return self.data_type.from_bytes(self.default)
-        elif self.optional:
+        elif self.optional or self.auto_increment:
             return None
         else:
             raise Exception(
@@ -417,6 +1312,7 @@ class SqlColumn:
     def __repr__(self):
         return (
             f"SqlColumn({self.name}, {self.data_type}{', optional' if self.optional else ''}"
+            f"{', auto_increment' if self.auto_increment else ''}"
             f"{f', default({self.data_type.from_bytes(self.default)})' if self.default is not None else ''})"
         )
 
@@ -448,18 +1344,44 @@ class SqlType:
     def gen_get_sql_value(self, column_name: str) -> str:
         return column_name
 
+    def gen_checksum_text(self, column_name: str) -> str:
+        '''Bytes of the value as MySQL prints gen_checksum_sql_value'''
+        return f"str({column_name}).encode()"
+
+    def gen_checksum_sql_value(self, column_name: str) -> str:
+        return column_name
+
+    def key_python_type(self) -> PythonType:
+        return self.python_type
+
+    def gen_key_sql_value(self, column_name: str) -> str:
+        '''Selected value that gen_from_key_value turns into the key held by objects'''
+        return column_name
+
+    def gen_from_key_value(self, value: str) -> str:
+        return value
+
     def __eq__(self, o: object):
         return isinstance(o, type(self))
 
 
 class SqlIntegerType(SqlType):
-    def __init__(self, precision: int):
+    def __init__(self, precision: int, bits: Optional[int] = None, unsigned: bool = False):
         super().__init__()
         self.precision = precision
+        self.bits = bits
+        self.unsigned = unsigned
         self.python_type = IntPythonType()
 
     def __repr__(self) -> str:
-        return f"SqlInteger({self.precision})"
+        return f"SqlInteger({self.precision}{', unsigned' if self.unsigned else ''})"
+
+    def value_range(self) -> Optional[tuple[int, int]]:
+        if self.bits is None:
+            return None
+        if self.unsigned:
+            return (0, (1 << self.bits) - 1)
+        return (-(1 << (self.bits - 1)), (1 << (self.bits - 1)) - 1)
 
     def from_bytes(self, data: bytes) -> int:
         return int(btos(data))
@@ -477,6 +1399,15 @@ class SqlFloatType(SqlType):
     def from_bytes(self, data: bytes) -> float:
         return float(btos(data))
 
+    def gen_checksum_text(self, column_name: str) -> str:
+        return (
+            f"{Config.FunctionName.mysql_double_text}("
+            f"{Config.FunctionName.single_precision}({column_name})).encode()"
+        )
+
+    def gen_checksum_sql_value(self, column_name: str) -> str:
+        return f"CAST({column_name} AS JSON)"
+
 
 class SqlDoubleType(SqlType):
     def __init__(self, precision: int):
@@ -490,6 +1421,12 @@ class SqlDoubleType(SqlType):
     def from_bytes(self, data: bytes) -> float:
         return float(btos(data))
 
+    def gen_checksum_text(self, column_name: str) -> str:
+        return f"{Config.FunctionName.mysql_double_text}({column_name}).encode()"
+
+    def gen_checksum_sql_value(self, column_name: str) -> str:
+        return f"CAST({column_name} AS JSON)"
+
 
 class SqlJsonType(SqlType):
     def __init__(self):
@@ -502,6 +1439,9 @@ class SqlJsonType(SqlType):
     def from_bytes(self, data: bytes) -> str:
         return btos(data)
 
+    def gen_checksum_text(self, column_name: str) -> str:
+        return f"{Config.FunctionName.mysql_json_text}(loads({column_name})).encode()"
+
 
 class SqlStringType(SqlJsonType):
     def __init__(self, char_limit: int = -1):
@@ -511,6 +1451,9 @@ class SqlStringType(SqlJsonType):
     def __repr__(self) -> str:
         return f"SqlString({self.char_limit})"
 
+    def gen_checksum_text(self, column_name: str) -> str:
+        return f"{column_name}.encode()"
+
 
 class SqlDateTimeType(SqlType):
     def __init__(self):
@@ -523,6 +1466,9 @@ class SqlDateTimeType(SqlType):
     def from_bytes(self, data: bytes) -> datetime:
         return datetime.strptime(btos(data), "%Y-%m-%d %H:%M:%S")
 
+    def gen_checksum_text(self, column_name: str) -> str:
+        return f'{column_name}.strftime("%Y-%m-%d %H:%M:%S").encode()'
+
 
 class SqlTimeType(SqlType):
     def __init__(self):
@@ -547,6 +1493,9 @@ class SqlDateType(SqlType):
     def from_bytes(self, data: bytes) -> datetime:
         raise NotImplementedError()
 
+    def gen_checksum_text(self, column_name: str) -> str:
+        return f'{column_name}.strftime("%Y-%m-%d").encode()'
+
 
 class SqlBlobType(SqlType):
     def __init__(self, char_limit: int):
@@ -560,6 +1509,9 @@ class SqlBlobType(SqlType):
     def from_bytes(self, data: bytes) -> bytes:
         return data
 
+    def gen_checksum_text(self, column_name: str) -> str:
+        return column_name
+
 
 class SqlEnumType(SqlJsonType):
     def __init__(self, values: list[str]):
@@ -576,6 +1528,19 @@ class SqlEnumType(SqlJsonType):
             raise Exception(f"Cannot convert {data} to {self}")
         return value
 
+    def gen_checksum_text(self, column_name: str) -> str:
+        indexes = {v: str(i + 1).encode() for (i, v) in enumerate(self.values)}
+        return f"{indexes}[{column_name}]"
+
+    def gen_checksum_sql_value(self, column_name: str) -> str:
+        return f"{column_name} + 0"
+
+    def gen_key_sql_value(self, column_name: str) -> str:
+        return f"{column_name} + 0"
+
+    def gen_from_key_value(self, value: str) -> str:
+        return f"{tuple(self.values)}[{value} - 1]"
+
 
 class SqlReferenceType(SqlType):
     def __init__(
@@ -614,6 +1579,21 @@ class SqlReferenceType(SqlType):
             + referenced_column.data_type.gen_get_sql_value(referenced_column.name)
         )
 
+    def gen_checksum_text(self, column_name: str) -> str:
+        return self.column.data_type.gen_checksum_text(self.gen_get_sql_value(column_name))
+
+    def gen_checksum_sql_value(self, column_name: str) -> str:
+        return self.column.data_type.gen_checksum_sql_value(column_name)
+
+    def key_python_type(self) -> PythonType:
+        return self.column.data_type.key_python_type()
+
+    def gen_key_sql_value(self, column_name: str) -> str:
+        return self.column.data_type.gen_key_sql_value(column_name)
+
+    def gen_from_key_value(self, value: str) -> str:
+        return self.column.data_type.gen_from_key_value(value)
+
 
 class SqlUniqueConstraint:
     def __init__(self, column_names: list[str]):
@@ -0,0 +1,91 @@
+'''In-memory stand-in for a MySQL connection, covering the statements written by generated importers'''
+from __future__ import annotations
+from copy import deepcopy
+import re
+from typing import Any, Optional
+
+INSERT = re.compile(r"INSERT INTO (\w+) \(([^)]*)\) VALUES \([^)]*\)(?: ON DUPLICATE KEY UPDATE (.*))?$")
+MAX_ID = re.compile(r"SELECT COALESCE\(MAX\((\w+)\), 0\), @@transaction_isolation FROM (\w+) FOR UPDATE$")
+SELECT_IN = re.compile(r"SELECT (.+) FROM (\w+) WHERE \(([^)]*)\) IN \(")
+
+
+class Crash(BaseException):
+    '''Stops the process right after a commit, as a kill would'''
+
+
+class MemoryDatabase:
+    def __init__(self, keys: dict[str, list[list[str]]], crash_after_commits: Optional[int] = None):
+        '''keys: primary then unique column names of each table'''
+        self.keys = keys
+        self.rows: dict[str, list[dict[str, Any]]] = {t_name: [] for t_name in keys}
+        self.crash_after_commits = crash_after_commits
+        self.n_commits = 0
+
+    def connect(self, pool: Any = None) -> MemoryConnection:
+        return MemoryConnection(self)
+
+
+class MemoryConnection:
+    def __init__(self, database: MemoryDatabase):
+        self.database = database
+        self.rows = deepcopy(database.rows)
+
+    def cursor(self) -> MemoryCursor:
+        return MemoryCursor(self)
+
+    def commit(self):
+        self.database.rows = deepcopy(self.rows)
+        self.database.n_commits += 1
+        if self.database.n_commits == self.database.crash_after_commits:
+            raise Crash()
+
+    def rollback(self):
+        self.rows = deepcopy(self.database.rows)
+
+    def close(self):
+        pass
+
+
+class MemoryCursor:
+    def __init__(self, connection: MemoryConnection):
+        self.connection = connection
+        self.results: list[tuple[Any, ...]] = []
+
+    def execute(self, statement: str, params: Any = None):
+        rows = self.connection.rows
+        if (match := MAX_ID.match(statement)) is not None:
+            ids = [row[match[1]] for row in rows[match[2]]]
+            self.results = [(max(ids, default=0), "REPEATABLE-READ")]
+        elif (match := SELECT_IN.match(statement)) is not None:
+            selected = [c_name.strip() for c_name in match[1].split(",")]
+            where = [c_name.strip() for c_name in match[3].split(",")]
+            wanted = set(tuple(params[i:i + len(where)]) for i in range(0, len(params), len(where)))
+            self.results = [tuple(row[c_name] for c_name in selected) for row in rows[match[2]]
+                            if tuple(row[c_name] for c_name in where) in wanted]
+        else:
+            raise NotImplementedError(statement)
+
+    def executemany(self, statement: str, values: list[list[Any]]):
+        match = INSERT.match(statement)
+        if match is None:
+            raise NotImplementedError(statement)
+        t_name = match[1]
+        c_names = [c_name.strip() for c_name in match[2].split(",")]
+        updated = [] if match[3] is None else [u.split("=")[0].strip() for u in match[3].split(", ")]
+        for value in values:
+            new_row = dict(zip(c_names, value))
+            existing = next((row for row in self.connection.rows[t_name]
+                             if any(all(row[c_name] == new_row[c_name] for c_name in key)
+                                    for key in self.connection.database.keys[t_name])), None)
+            if existing is None:
+                self.connection.rows[t_name].append(new_row)
+            elif match[3] is None:
+                raise Exception(f"Duplicate entry {value!r} in {t_name}")
+            else:
+                existing.update((c_name, new_row[c_name]) for c_name in updated)
+
+    def fetchall(self) -> list[tuple[Any, ...]]:
+        return self.results
+
+    def close(self):
+        pass
@@ -0,0 +1,46 @@
+from typing import Callable, cast
+
+import pytest
+
+from code_gen_config import Config
+from objects_generator import gen_checksum_functions
+from python_script import PythonScript
+
+# (value, expected text) pairs printed by MySQL 8 for CAST(... AS JSON)
+MYSQL_JSON_TEXTS: list[tuple[object, str]] = [
+    (2.0, "2.0"),
+    (100.0, "100.0"),
+    (0.1, "0.1"),
+    (-1.5, "-1.5"),
+    (123.456, "123.456"),
+    (1e20, "1e20"),
+    (1.5e300, "1.5e300"),
+    (0.0, "0.0"),
+    (42, "42"),
+    (True, "true"),
+    (None, "null"),
+    ("é\"\n", '"é\\"\\n"'),
+    ([1, 2.0, "x"], '[1, 2.0, "x"]'),
+    ({"b": 1, "aa": None, "a": [True]}, '{"a": [true], "b": 1, "aa": null}'),
+]
+
+
+@pytest.fixture(scope="module")
+def checksum_functions():
+    script = PythonScript()
+    gen_checksum_functions(script=script)
+    namespace: dict[str, object] = {}
+    exec(script.get_script(), namespace)
+    return namespace
+
+
+@pytest.mark.parametrize("value, expected", MYSQL_JSON_TEXTS)
+def test_mysql_json_text(checksum_functions, value, expected):
+    mysql_json_text = cast(Callable[[object], str], checksum_functions[Config.FunctionName.mysql_json_text])
+    assert mysql_json_text(value) == expected
+
+
+def test_single_precision(checksum_functions):
+    mysql_json_text = cast(Callable[[object], str], checksum_functions[Config.FunctionName.mysql_json_text])
+    single_precision = cast(Callable[[float], float], checksum_functions[Config.FunctionName.single_precision])
+    assert mysql_json_text(single_precision(0.1)) == "0.10000000149011612"
@@ -0,0 +1,95 @@
+from typing import Any
+
+import pytest
+
+from csv_addon.csv_profile import CSV_COLUMN_OP, CSV_NO_COLUMN_OP, CsvProfile, NormalCsv, TableProfile
+from csv_addon.importer_creator import gen_import_functions
+from database import Database
+from memory_db import Crash, MemoryDatabase
+from objects_generator import generate_objects_code
+from operations import OperationChain, UUID4_GENERATOR
+from python_script import PythonScript
+from sql_objects import SqlColumn, SqlForeignConstraint, SqlIntegerType, SqlPrimaryConstraint, SqlStringType, \
+    SqlTable, SqlTables, SqlUniqueConstraint
+
+# Cities and tags of the first batches come back after the crash, and the last person is committed before it
+CSV_LINES = [
+    "id;name;city;tag",
+    "p1;Ann;Paris;red",
+    "p2;Bob;Lyon;blue",
+    "p3;Cid;Nice;red",
+    "p4;Dan;Paris;green",
+    "p5;Eve;Lyon;blue",
+    "p6;Fay;Rome;red",
+    "p1;Ann;Paris;red",
+]
+
+
+def make_tables() -> SqlTables:
+    city = SqlTable("city")
+    city.add_column(SqlColumn("id", SqlIntegerType(10), False, None, auto_increment=True))
+    city.add_column(SqlColumn("name", SqlStringType(20), False, None))
+    city.add_primary_constraint(SqlPrimaryConstraint(["id"]))
+    city.add_unique_constraint(SqlUniqueConstraint(["name"]))
+    tag = SqlTable("tag")
+    tag.add_column(SqlColumn("id", SqlStringType(36), False, None))
+    tag.add_column(SqlColumn("label", SqlStringType(20), False, None))
+    tag.add_primary_constraint(SqlPrimaryConstraint(["id"]))
+    tag.add_unique_constraint(SqlUniqueConstraint(["label"]))
+    person = SqlTable("person")
+    person.add_column(SqlColumn("id", SqlStringType(8), False, None))
+    person.add_column(SqlColumn("name", SqlStringType(20), False, None))
+    person.add_column(SqlColumn("city_id", SqlIntegerType(10), False, None))
+    person.add_column(SqlColumn("tag_id", SqlStringType(36), False, None))
+    person.add_primary_constraint(SqlPrimaryConstraint(["id"]))
+    tables = SqlTables({"city": city, "tag": tag, "person": person})
+    person.add_foreign_constraint(SqlForeignConstraint(["city_id"], "city", ["id"]), city)
+    person.add_foreign_constraint(SqlForeignConstraint(["tag_id"], "tag", ["id"]), tag)
+    return tables
+
+
+@pytest.fixture
+def importer() -> dict[str, Any]:
+    tables = make_tables()
+    city, tag, person = tables["city"], tables["tag"], tables["person"]
+    profile = CsvProfile([
+        NormalCsv(city, TableProfile({
+            city.columns["name"]: OperationChain([CSV_COLUMN_OP.make_instance(["city"])])})),
+        NormalCsv(tag, TableProfile({
+            tag.columns["id"]: OperationChain([CSV_NO_COLUMN_OP.make_instance(), UUID4_GENERATOR.make_instance()]),
+            tag.columns["label"]: OperationChain([CSV_COLUMN_OP.make_instance(["tag"])])})),
+        NormalCsv(person, TableProfile({
+            person.columns["id"]: OperationChain([CSV_COLUMN_OP.make_instance(["id"])]),
+            person.columns["name"]: OperationChain([CSV_COLUMN_OP.make_instance(["name"])])})),
+    ])
+    script = PythonScript()
+    generate_objects_code(script, tables, Database("host", "password", "user", "name"))
+    gen_import_functions(script, profile, tables)
+    namespace: dict[str, Any] = {}
+    exec(script.get_script(), namespace)
+    return namespace
+
+
+def test_resume_after_crash_loses_and_duplicates_nothing(importer, tmp_path):
+    csv_path = tmp_path / "people.csv"
+    csv_path.write_text("\n".join(CSV_LINES) + "\n")
+    checkpoint_path = str(tmp_path / "checkpoint")
+    database = MemoryDatabase(keys={"city": [["id"], ["name"]], "tag": [["id"], ["label"]], "person": [["id"]]},
+                              crash_after_commits=2)
+    importer["connect_to_database"] = database.connect
+    importer["argv"] = ["importer", str(csv_path)]
+
+    with pytest.raises(Crash):
+        importer["import_csv"](commit_every_rows=2, checkpoint_path=checkpoint_path)
+    assert len(database.rows["person"]) == 4
+    importer["import_csv"](commit_every_rows=2, checkpoint_path=checkpoint_path)
+
+    cities = {row["id"]: row["name"] for row in database.rows["city"]}
+    tags = {row["id"]: row["label"] for row in database.rows["tag"]}
+    people = {row["id"]: (row["name"], cities.get(row["city_id"]), tags.get(row["tag_id"]))
+              for row in database.rows["person"]}
+    assert sorted(cities.values()) == ["Lyon", "Nice", "Paris", "Rome"]
+    assert sorted(tags.values()) == ["blue", "green", "red"]
+    assert len(database.rows["person"]) == len(people)
+    assert people == {line.split(";")[0]: tuple(line.split(";")[1:]) for line in CSV_LINES[1:]}
+    assert not (tmp_path / "checkpoint").exists() and not (tmp_path / "checkpoint.keys").exists()
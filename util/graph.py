@@ -7,6 +7,13 @@ class Graph(Generic[T]):
     def __init__(self, nodes: list[T], explorer: Callable[[T], Iterable[T]]):
         self.nodes = nodes
         self.explorer = explorer
+        self.__successors: dict[T, list[T]] = dict()
+        self.__levels: Optional[list[list[T]]] = None
+
+    def successors(self, node: T) -> list[T]:
+        if node not in self.__successors:
+            self.__successors[node] = list(dict.fromkeys(self.explorer(node)))
+        return self.__successors[node]
 
     def reachable_nodes_from(self, nodes: Iterable[T], validator: Callable[[T, Optional[T]], bool]):
         explored: set[T] = set()
@@ -17,22 +24,112 @@ class Graph(Generic[T]):
             if current not in explored:
                 explored.add(current)
                 if validator(current, origin):
-                    to_explore.extend(((n, current) for n in self.explorer(current)))
+                    to_explore.extend(((n, current) for n in self.successors(current)))
+
+    def levels(self) -> list[list[T]]:
+        # Kahn's algorithm, a node only depends on nodes of lower levels
+        if self.__levels is not None:
+            return self.__levels
+        n_successors = {n: len(self.successors(n)) for n in self.nodes}
+        predecessors: dict[T, list[T]] = {n: list() for n in self.nodes}
+        for node in self.nodes:
+            for successor in self.successors(node):
+                if successor in predecessors:
+                    predecessors[successor].append(node)
+        levels: list[list[T]] = list()
+        level = [n for n in self.nodes if n_successors[n] == 0]
+        while len(level) > 0:
+            levels.append(level)
+            next_level: list[T] = list()
+            for node in level:
+                for predecessor in predecessors[node]:
+                    n_successors[predecessor] -= 1
+                    if n_successors[predecessor] == 0:
+                        next_level.append(predecessor)
+            level = next_level
+        if sum(len(level) for level in levels) != len(n_successors):
+            self.raise_cycle_error()
+        self.__levels = levels
+        return levels
+
+    def topological_order(self) -> list[T]:
+        return [n for level in self.levels() for n in level]
 
     def sink_to_source_exploration(self):
-        explored: set[T] = set()
-        not_explored = set(self.nodes)
-        while len(not_explored) > 0:
-            for node in list(not_explored):
-                if explored.issuperset(self.explorer(node)):
-                    yield node
-                    explored.add(node)
-                    not_explored.remove(node)
-                    break
-            else:
-                raise Exception("Graph contains a cycle")
+        yield from self.topological_order()
 
+    def strongly_connected_components(self) -> list[list[T]]:
+        # Iterative Tarjan's algorithm, components are listed from sinks to sources
+        node_set = set(self.nodes)
+        index: dict[T, int] = dict()
+        low_link: dict[T, int] = dict()
+        stack: list[T] = list()
+        on_stack: set[T] = set()
+        components: list[list[T]] = list()
+        for root in self.nodes:
+            if root in index:
+                continue
+            index[root] = low_link[root] = len(index)
+            stack.append(root)
+            on_stack.add(root)
+            work: list[tuple[T, Iterable[T]]] = [(root, iter(self.successors(root)))]
+            while len(work) > 0:
+                node, successors = work[-1]
+                for successor in successors:
+                    if successor not in node_set:
+                        continue
+                    if successor not in index:
+                        index[successor] = low_link[successor] = len(index)
+                        stack.append(successor)
+                        on_stack.add(successor)
+                        work.append((successor, iter(self.successors(successor))))
+                        break
+                    if successor in on_stack:
+                        low_link[node] = min(low_link[node], index[successor])
+                else:
+                    work.pop()
+                    if len(work) > 0:
+                        parent = work[-1][0]
+                        low_link[parent] = min(low_link[parent], low_link[node])
+                    if low_link[node] == index[node]:
+                        component: list[T] = list()
+                        while True:
+                            member = stack.pop()
+                            on_stack.remove(member)
+                            component.append(member)
+                            if member == node:
+                                break
+                        components.append(component)
+        return components
 
+    def is_cyclic_component(self, component: list[T]):
+        return len(component) > 1 or component[0] in self.successors(component[0])
 
-                
+    def find_cycle(self) -> Optional[list[T]]:
+        for component in self.strongly_connected_components():
+            if not self.is_cyclic_component(component):
+                continue
+            members = set(component)
+            start = component[0]
+            parents: dict[T, T] = dict()
+            to_explore: Deque[T] = deque([start])
+            while len(to_explore) > 0:
+                current = to_explore.popleft()
+                for successor in self.successors(current):
+                    if successor == start:
+                        path = [current]
+                        while path[-1] != start:
+                            path.append(parents[path[-1]])
+                        return path[::-1] + [start]
+                    if successor in members and successor not in parents:
+                        parents[successor] = current
+                        to_explore.append(successor)
+        return None
 
+    def raise_cycle_error(self):
+        cycle = self.find_cycle()
+        if cycle is None:
+            node_set = set(self.nodes)
+            unknowns = set(s for n in self.nodes for s in self.successors(n) if s not in node_set)
+            raise Exception(f"Graph depends on unknown nodes: {', '.join(map(str, unknowns))}")
+        raise Exception(f"Graph contains a cycle: {' -> '.join(map(str, cycle))}")